@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+#
+#  Call me:
+#  PYTHONPATH=`pwd` ./bin/benchmark_normalizer.py  --which [train|test|val]
+#
+#  Compares the per-question cost of normalizing the passages with the Normalizer (str.replace per punctuation
+#  mark), with a single str.translate table and with the PassageNormalizer cache (once per passage).
+#
+
+import argparse
+import timeit
+
+from src.datafile_parser import DatafileParser
+from src.normalizer import Normalizer, PassageNormalizer
+
+
+TRANSLATION = str.maketrans({c: " " for c in "\n,.:-_!?/*()"})
+
+
+def normalize_by_translating(a_text: str) -> str:
+    ret = a_text.lower().translate(TRANSLATION)
+    while "  " in ret:
+        ret = ret.replace("  ", " ")
+    return ret
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--which", type=str, default="val", choices={"train", "test", "val"})
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs, the best one is reported")
+    parsed_args = parser.parse_args()
+
+    dataset = DatafileParser.get_resource(parsed_args.which)
+
+    def run_replacing():
+        normalizer = Normalizer()
+        return [normalizer.normalize(item.passage) for item in dataset]
+
+    def run_translating():
+        return [normalize_by_translating(item.passage) for item in dataset]
+
+    def run_cached():
+        normalizer = PassageNormalizer()
+        return [normalizer.normalize(item.id, item.passage) for item in dataset]
+
+    assert run_replacing() == run_translating() == run_cached()
+
+    print(f"Questions = {len(dataset)}, passages = {len({item.id for item in dataset})}")
+    for name, run in [("Normalizer per question", run_replacing), ("str.translate per question", run_translating),
+                      ("PassageNormalizer per question", run_cached)]:
+        best_time = min(timeit.repeat(run, number=1, repeat=parsed_args.repeat))
+        print(f"{name:32} = {1000 * best_time / len(dataset):.4f} ms")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+#
+#  Call me:
+#  PYTHONPATH=`pwd` ./bin/benchmark_pipeline_import.py  [--budget 0.3]
+#
+#  Measures the import time of every module of src.pipeline in a fresh interpreter (python -X importtime),
+#  e.g. to check the cost of a new answerer; tests/test_import_time.py checks the heavy dependencies.
+#
+
+import argparse
+import os
+import subprocess
+import sys
+
+from src.get_root import get_root
+
+# imports every module of src.pipeline, then reports which heavy dependencies came along
+IMPORT_ALL_PIPELINE_MODULES = """
+import importlib, pkgutil, sys
+print("--- start ---", file=sys.stderr, flush=True)
+import src.pipeline, src.pipeline.answerers
+for package in (src.pipeline, src.pipeline.answerers):
+    for module in pkgutil.iter_modules(package.__path__):
+        importlib.import_module(f"{package.__name__}.{module.name}")
+print(" ".join(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+HEAVY_DEPENDENCIES = ["inflect", "nltk", "numpy", "pandas", "pyinflect", "torch", "tqdm", "transformers"]
+
+
+def import_pipeline_in_subprocess():
+    """
+    :return: the heavy dependencies imported along, total import time in seconds (as reported by -X importtime)
+    """
+    env = dict(os.environ, PYTHONPATH=get_root())
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_ALL_PIPELINE_MODULES]
+                               + HEAVY_DEPENDENCIES, cwd=get_root(), env=env, capture_output=True, text=True,
+                               check=True)
+
+    report = completed.stderr.split("--- start ---", 1)[1]
+    total_us = 0
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # top-level imports only, their cumulative time includes the nested ones
+            total_us += int(cumulative)
+    return completed.stdout.split(), total_us / 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    # importing the whole src.pipeline takes ~0.1s, nltk alone would add ~0.3s
+    parser.add_argument("--budget", type=float, default=0.3, help="Import time budget in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs, the best one is reported")
+    parsed_args = parser.parse_args()
+
+    runs = [import_pipeline_in_subprocess() for _ in range(parsed_args.repeat)]
+    heavy_imported = runs[0][0]
+    best_time = min(import_time for _, import_time in runs)
+
+    print(f"Heavy dependencies imported = {' '.join(heavy_imported) if heavy_imported else 'none'}")
+    print(f"src.pipeline import time    = {best_time:.3f} s (budget {parsed_args.budget:.3f} s)")
+    if heavy_imported or best_time > parsed_args.budget:
+        sys.exit(1)
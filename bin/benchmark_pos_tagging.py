@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+#
+#  Call me:
+#  PYTHONPATH=`pwd` ./bin/benchmark_pos_tagging.py  --which [train|test|val]
+#
+#  Compares the per-question cost of nltk.pos_tag with the batched, process-wide PosTagger
+#  on the question tokens used by the event ordering answerer.
+#
+
+import argparse
+import timeit
+
+import nltk
+
+from src.fetch_resources import fetch_linguistic_resources
+from src.pipeline.answerers.event_ordering_v2 import QuestionAnswererEventOrdering
+from src.pos_tagger import PosTagger
+from src.unpack_data import convert_train_data, convert_val_data, convert_test_data, rewrite_to_list_of_questions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--which", type=str, default="val", choices={"train", "test", "val"})
+    parser.add_argument("--limit_recipes", type=int, default=None)
+    parsed_args = parser.parse_args()
+
+    fetch_linguistic_resources()
+    loaders = {"train": convert_train_data, "val": convert_val_data, "test": convert_test_data}
+    recipes = loaders[parsed_args.which](False, limit_recipes=parsed_args.limit_recipes)
+    questions = rewrite_to_list_of_questions(recipes)
+    sentences = [QuestionAnswererEventOrdering._question_tokens(question.question) for question in questions]
+
+    start_time = timeit.default_timer()
+    before = [nltk.pos_tag(tokens) for tokens in sentences]
+    before_time = timeit.default_timer() - start_time
+
+    tagger = PosTagger()
+    start_time = timeit.default_timer()
+    after = tagger.tag_sents(sentences)
+    after_time = timeit.default_timer() - start_time
+
+    start_time = timeit.default_timer()
+    memoized = [tagger.tag(tokens) for tokens in sentences]
+    memoized_time = timeit.default_timer() - start_time
+
+    assert before == after == memoized
+    print(f"Questions = {len(sentences)}")
+    print(f"nltk.pos_tag per question     = {1000 * before_time / len(sentences):.3f} ms")
+    print(f"PosTagger batched per question = {1000 * after_time / len(sentences):.3f} ms")
+    print(f"PosTagger memoized per question = {1000 * memoized_time / len(sentences):.3f} ms")
@@ -1,4 +1,9 @@
 #!/usr/bin/env python
+#
+#  Call me:
+#  PYTHONPATH=`pwd` ./bin/calculate_dataset_metrics.py --which val --workers 4
+
+import argparse
 import pprint
 
 from src.data_question_class_statistics import QuestionClassStatistics
@@ -6,24 +11,28 @@ from src.data_statistics import PassageStatsCalculator, QuestionsAnswersMinMaxAv
 from src.data_statistics_closed_set_answers import ClosedSetAnswerChecker
 from src.data_statistics_extractive_answer import ExtractiveAnswerChecker
 from src.data_statistics_extractive_answer import RecoverableAnswerChecker, AppendHandler
+from src.data_statistics_runner import run_statistics
 from src.datafile_parser import DatafileParser
 from src.get_root import get_root
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--which", type=str, default="val", choices={"train", "test", "val"},
+                        help="Which dataset to analyze (train / test/ val)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Number of worker processes, each one analyzing whole passages (0 = no workers)")
+    parsed_args = parser.parse_args()
 
     rec = RecoverableAnswerChecker()
     handler = AppendHandler()
     rec.handler_on_non_recoverable_items.append(handler)
     qcc = QuestionClassStatistics()
 
-    dataset = DatafileParser.get_resource("val")
+    dataset = DatafileParser.get_resource(parsed_args.which)
     checkers = [PassageStatsCalculator(), QuestionsAnswersMinMaxAvgStats(), ExtractiveAnswerChecker(), rec,
-                ClosedSetAnswerChecker(), QuestionClassStatistics(), qcc]
+                ClosedSetAnswerChecker(), qcc]
 
-    ret = {}
-    for checker in checkers:
-        metrics = checker.calc_statistics(dataset)
-        ret.update(metrics)
+    ret = run_statistics(checkers, dataset, num_workers=parsed_args.workers)
     pprint.pprint(ret)
 
     qcc.save_to_excel_workbook_per_class(f"{get_root()}/resources/")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+#
+#  Call me:
+#  PYTHONPATH=`pwd` ./bin/merge_prediction_shards.py --which val --num_shards 4
+#
+#  Combines the results of run_end_to_end_prediction.py --shard_index i --num_shards N (i = 0 ... N-1)
+#  into the same files and metrics as a single run
+
+import argparse
+import json
+import os.path
+
+from src.get_root import get_root
+from src.pipeline.sharding import merge_metric_partials, merge_predictions, recipe_order
+
+
+def merge(parsed_args: argparse.Namespace) -> None:
+    prefix = os.path.join(get_root(), "results", f"r2vq_pred__SRPOL_{parsed_args.which}")
+    shard_prefixes = [f"{prefix}.shard-{i}-of-{parsed_args.num_shards}" for i in range(parsed_args.num_shards)]
+
+    predictions, partials = [], []
+    for shard_prefix in shard_prefixes:
+        with open(f"{shard_prefix}.json", "r", encoding="utf-8") as f:
+            predictions.append(json.load(f))
+        with open(f"{shard_prefix}.metrics.json", "r", encoding="utf-8") as f:
+            partials.append(json.load(f))
+
+    with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+        json.dump(merge_predictions(predictions, recipe_order(partials)), f, indent=1, ensure_ascii=False)
+
+    metrics = merge_metric_partials(partials)
+    with open(f"{prefix}.metrics_summary.json", "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=1)
+
+    print(f"F1 = {metrics['F1']}")
+    print(f"Exact match = {metrics['Exact match']}")
+    for row in metrics["per_category"]:
+        print(f"Cat {row['Category']} // Count {row['Count']} // F1 = {row['F1']} // EM = {row['Exact match']}")
+    print(f"Merged {parsed_args.num_shards} shards into {prefix}.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--which", type=str, default="train", choices={"train", "test", "val"},
+                        help="Which dataset was predicted (train / test/ val)")
+    parser.add_argument("--num_shards", "--num-shards", type=int, required=True,
+                        help="Number of shards of the run")
+    parsed_args = parser.parse_args()
+
+    merge(parsed_args)
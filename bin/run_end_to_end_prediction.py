@@ -6,31 +6,42 @@
 #
 
 import argparse
+import asyncio
 import os.path
+import sys
+import timeit
+
+_SCRIPT_START_TIME = timeit.default_timer()
 
 from src.fetch_resources import fetch_linguistic_resources
 from src.get_root import get_root
-from src.pipeline.answerers.counting_actions import QuestionAnswererCountingActions
-from src.pipeline.answerers.counting_times import QuestionAnswererCountingTimes
-from src.pipeline.answerers.counting_uses import QuestionAnswererCountingUses
-from src.pipeline.answerers.ellipsis_v2 import QuestionAnswererEllipsisV2
-from src.pipeline.answerers.event_ordering_v2 import QuestionAnswererEventOrdering
-from src.pipeline.answerers.lifespan_how import QuestionAnswererLifespanHow
-from src.pipeline.answerers.lifespan_what import QuestionAnswererLifespanWhat
-from src.pipeline.answerers.location_change import QuestionAnswererLocationChange
-from src.pipeline.answerers.location_crl import QuestionAnswererLocationCrl
-from src.pipeline.answerers.method import QuestionAnswererMethod
-from src.pipeline.answerers.method_preheat import QuestionAnswererMethodPreheat
-from src.pipeline.answerers.universal_srl import QuestionAnswererUniversalSrl
 from src.pipeline.deterministic_qa_engine import QuestionAnswererNA
 from src.pipeline.end_to_end_prediction import EndToEndQuestionAnsweringPrediction
 from src.pipeline.extractive_qa import ExtractiveQuestionAnswererFactory
 from src.pipeline.handler_metrics import HandlerF1, HandlerExactMatch
 from src.pipeline.handler_metrics_per_category import HandlerMetricsPerCategory
+from src.pipeline.qa_service import QuestionAnsweringService, QuestionAnsweringHttpServer
+from src.pipeline.sharding import HandlerMetricPartials
 from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.pipeline.streaming_prediction import stream_predictions
+from src.shared_resources import warm_up_linguistic_resources
 
 
 def get_dispatching_engine() -> QuestionAnsweringDispatcher:
+    # the answerers (and what they depend on) are imported when the engine is built, not at the script start
+    from src.pipeline.answerers.counting_actions import QuestionAnswererCountingActions
+    from src.pipeline.answerers.counting_times import QuestionAnswererCountingTimes
+    from src.pipeline.answerers.counting_uses import QuestionAnswererCountingUses
+    from src.pipeline.answerers.ellipsis_v2 import QuestionAnswererEllipsisV2
+    from src.pipeline.answerers.event_ordering_v2 import QuestionAnswererEventOrdering
+    from src.pipeline.answerers.lifespan_how import QuestionAnswererLifespanHow
+    from src.pipeline.answerers.lifespan_what import QuestionAnswererLifespanWhat
+    from src.pipeline.answerers.location_change import QuestionAnswererLocationChange
+    from src.pipeline.answerers.location_crl import QuestionAnswererLocationCrl
+    from src.pipeline.answerers.method import QuestionAnswererMethod
+    from src.pipeline.answerers.method_preheat import QuestionAnswererMethodPreheat
+    from src.pipeline.answerers.universal_srl import QuestionAnswererUniversalSrl
+
     dispatching_rules = {
         "counting_times": QuestionAnswererCountingTimes(),
         "counting_actions": QuestionAnswererCountingActions(),
@@ -72,20 +83,117 @@ def get_dispatching_engine() -> QuestionAnsweringDispatcher:
     return QuestionAnsweringDispatcher(dispatching_rules)
 
 
+def benchmark_startup(parsed_args: argparse.Namespace) -> None:
+    """
+    Prints the time to the first answer and its parts: resources check, building the answerers, the optional
+    warm-up, loading the first recipe and answering its first question; nothing is saved
+    """
+    timings = {}
+    start_time = timeit.default_timer()
+    fetch_linguistic_resources()
+    timings["resources check"] = timeit.default_timer() - start_time
+
+    start_time = timeit.default_timer()
+    ExtractiveQuestionAnswererFactory.set_default_engine(parsed_args.which, parsed_args.rc_model)
+    dispatching_engine = get_dispatching_engine()
+    timings["building answerers"] = timeit.default_timer() - start_time
+
+    if parsed_args.warm_up:
+        start_time = timeit.default_timer()
+        warm_up_linguistic_resources()
+        timings["warm-up"] = timeit.default_timer() - start_time
+
+    start_time = timeit.default_timer()
+    engine = EndToEndQuestionAnsweringPrediction(parsed_args.which, False, dispatching_engine)
+    questions = engine.load_dataset(limit_recipes=1)
+    timings["loading first recipe"] = timeit.default_timer() - start_time
+    if not questions:
+        raise ValueError(f"No questions in the first recipe of the {parsed_args.which} set, nothing to answer")
+
+    for i, question in enumerate(questions[:2]):
+        start_time = timeit.default_timer()
+        dispatching_engine.predict_answer(question)
+        timings["first answer" if i == 0 else "second answer"] = timeit.default_timer() - start_time
+        if i == 0:
+            time_to_first_answer = timeit.default_timer() - _SCRIPT_START_TIME
+
+    for name, elapsed in timings.items():
+        print(f"{name:<22} = {1000 * elapsed:9.1f} ms")
+    print(f"time to first answer   = {1000 * time_to_first_answer:9.1f} ms (including the imports)")
+
+
+def serve(parsed_args: argparse.Namespace) -> None:
+    """
+    Answers the questions sent over HTTP (see src/pipeline/qa_service.py) until interrupted
+    """
+    fetch_linguistic_resources()
+
+    ExtractiveQuestionAnswererFactory.set_default_engine(parsed_args.which, parsed_args.rc_model)
+    if parsed_args.warm_up:
+        warm_up_linguistic_resources()
+
+    service = QuestionAnsweringService(get_dispatching_engine, num_workers=parsed_args.workers,
+                                       cache_size=parsed_args.cache_size, max_batch_size=parsed_args.max_batch_size)
+    server = QuestionAnsweringHttpServer(service, parsed_args.host, parsed_args.port)
+    print(f"Serving on http://{parsed_args.host}:{parsed_args.port}/predict")
+    if not parsed_args.rc_model:
+        print(f"No --rc_model: Reading Comprehension answers only for the recipes of the {parsed_args.which} set")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+def stream(parsed_args: argparse.Namespace) -> None:
+    """
+    Answers the recipes of the --stream file (or stdin), one JSON line per question on stdout
+    """
+    output = sys.stdout
+    sys.stdout = sys.stderr  # keep stdout for the predictions only
+
+    fetch_linguistic_resources()
+
+    ExtractiveQuestionAnswererFactory.set_default_engine(parsed_args.which, parsed_args.rc_model)
+    if parsed_args.warm_up:
+        warm_up_linguistic_resources()
+
+    if parsed_args.stream == "-":
+        stream_predictions(sys.stdin, output, get_dispatching_engine, num_workers=parsed_args.workers)
+    else:
+        with open(parsed_args.stream, "r", encoding="utf-8") as f:
+            stream_predictions(f, output, get_dispatching_engine, num_workers=parsed_args.workers)
+
+
 def launch(parsed_args: argparse.Namespace) -> None:
     fetch_linguistic_resources()
 
-    ExtractiveQuestionAnswererFactory.set_default_engine(parsed_args.which)
+    ExtractiveQuestionAnswererFactory.set_default_engine(parsed_args.which, parsed_args.rc_model)
+    if parsed_args.warm_up:
+        warm_up_linguistic_resources()
+
+    if not 0 <= parsed_args.shard_index < parsed_args.num_shards:
+        raise ValueError(f"Incorrect shard {parsed_args.shard_index} of {parsed_args.num_shards}")
+    suffix = f".shard-{parsed_args.shard_index}-of-{parsed_args.num_shards}" if parsed_args.num_shards > 1 else ""
+    output_prefix = os.path.join(get_root(), "results", f"r2vq_pred__SRPOL_{parsed_args.which}{suffix}")
 
     engine = EndToEndQuestionAnsweringPrediction(parsed_args.which, parsed_args.with_postprocessing,
-                                                 get_dispatching_engine())
+                                                 get_dispatching_engine(), output_json_filename=f"{output_prefix}.json")
     engine.limit_recipes = None
     engine.use_tqdm = True
+    engine.checkpoint_path = parsed_args.checkpoint if parsed_args.checkpoint else f"{output_prefix}.checkpoint.jsonl"
+    engine.resume = parsed_args.resume
+    engine.shard_index = parsed_args.shard_index
+    engine.num_shards = parsed_args.num_shards
     # append custom post processor handlers here:
     engine.add_qa_handler(HandlerF1())
     engine.add_qa_handler(HandlerExactMatch())
-    prefix = os.path.join(get_root(), "results", "per_category", parsed_args.which)
-    engine.add_qa_handler(HandlerMetricsPerCategory(prefix))
+    engine.add_qa_handler(HandlerMetricPartials(f"{output_prefix}.metrics.json", parsed_args.shard_index,
+                                                parsed_args.num_shards))
+    prefix = os.path.join(get_root(), "results", "per_category", parsed_args.which + suffix)
+    engine.add_qa_handler(HandlerMetricsPerCategory(prefix, output_formats=parsed_args.report_formats,
+                                                    num_workers=parsed_args.report_workers))
 
     more_info = {"use_tqdm": True}
     questions, answers = engine.run_prediction(more_info)
@@ -100,6 +208,45 @@ if __name__ == "__main__":
                              "Note that 'test' doesn't contain answers!")
     parser.add_argument("--with_postprocessing", action='store_true',
                         help="Add this argument if need Bert NA postprocessing on val and test set")
+    parser.add_argument("--report_formats", nargs="+", default=["xlsx"], choices=["csv", "xlsx"],
+                        help="Formats of the per category reports: csv (fast) and / or xlsx")
+    parser.add_argument("--report_workers", type=int, default=1,
+                        help="Number of processes writing the per category reports")
+    parser.add_argument("--rc_model", type=str, default=None,
+                        help="Reading Comprehension model used online for the questions missing in "
+                             "data/model_predictions_{which}_set.json")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="Log of the answered questions "
+                             "(default: results/r2vq_pred__SRPOL_{which}.checkpoint.jsonl)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Do not answer again the questions found in the checkpoint of an interrupted run")
+    parser.add_argument("--shard_index", "--shard-index", type=int, default=0,
+                        help="Answer only the recipes of this shard (0 ... num_shards - 1)")
+    parser.add_argument("--num_shards", "--num-shards", type=int, default=1,
+                        help="Number of shards: the recipes are split by the hash of their id, "
+                             "see bin/merge_prediction_shards.py to combine the results")
+    parser.add_argument("--warm_up", action="store_true",
+                        help="Load WordNet, the POS tagger and the inflection tables before answering")
+    parser.add_argument("--benchmark_startup", action="store_true",
+                        help="Only measure the time to the first answer (on the first recipe) and exit")
+    parser.add_argument("--serve", action="store_true",
+                        help="Answer the questions sent to the HTTP endpoint POST /predict instead of a dataset")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="--serve: address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="--serve: port to listen on")
+    parser.add_argument("--stream", type=str, default=None, metavar="PATH",
+                        help="Answer the recipes of this file (- for stdin) and write JSON lines to stdout")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="--serve / --stream: number of answering processes (0 = answer in the main process)")
+    parser.add_argument("--cache_size", type=int, default=128, help="--serve: parsed recipes kept per worker")
+    parser.add_argument("--max_batch_size", type=int, default=32,
+                        help="--serve: maximal number of questions of a category answered together")
     parsed_args = parser.parse_args()
 
-    launch(parsed_args)
+    if parsed_args.benchmark_startup:
+        benchmark_startup(parsed_args)
+    elif parsed_args.serve:
+        serve(parsed_args)
+    elif parsed_args.stream:
+        stream(parsed_args)
+    else:
+        launch(parsed_args)
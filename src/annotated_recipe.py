@@ -1,4 +1,4 @@
-from typing import List, Set, Union, Optional
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple, Union, Optional
 
 
 class AnnotatedToken:
@@ -64,7 +64,7 @@ class AnnotatedToken:
         return ret
 
     def is_equal_to_any_verb_id(self, id: int) -> bool:
-        return id in [self.where_is_my_verb_explicit, self.where_is_my_verb_implicit]
+        return self.where_is_my_verb_explicit == id or self.where_is_my_verb_implicit == id
 
     def __str__(self):
         return f"{self.raw_token}|{self.id}|{self.relation1}|{self.relation2}"
@@ -73,6 +73,18 @@ class AnnotatedToken:
         return str(self)
 
 
+class SrlSpan(NamedTuple):
+    """
+    Tokens annotated with B-X and the following I-X, e.g. "the olive oil" for B-Patient I-Patient I-Patient
+    """
+    position: int  # index of the B-X token in the sentence
+    token: AnnotatedToken  # the B-X token
+    raw_words: Tuple[str, ...]  # lowercase
+    normalized_words: Tuple[str, ...]  # lowercase
+    raw: str
+    normalized: str
+
+
 class AnnotatedSentence:
     def __init__(self, list_of_tokens: List[AnnotatedToken], raw_sentence: str):
         self.annotated_tokens: List[AnnotatedToken] = list_of_tokens
@@ -80,6 +92,67 @@ class AnnotatedSentence:
         self.paragraph_id: str = None
         self.sentence_id: str = None
         self.sentence_position_in_paragraph: int = None
+        self._srl_spans: Dict[Tuple[Optional[int], Tuple[str, ...]], List[SrlSpan]] = {}
+
+        # verb id -> positions of the tokens depending on it (explicitly or implicitly),
+        # semantic roles column -> positions of the tokens having a role there
+        self._positions_by_verb_id: Dict[int, List[int]] = {}
+        self._positions_by_column: Dict[int, List[int]] = {}
+        for position, token in enumerate(list_of_tokens):
+            for verb_id in {token.where_is_my_verb_explicit, token.where_is_my_verb_implicit} - {None}:
+                self._positions_by_verb_id.setdefault(verb_id, []).append(position)
+            for column, role in enumerate(token.semantic_roles):
+                if role:
+                    self._positions_by_column.setdefault(column, []).append(position)
+
+    def verb_dependents(self, verb_id: int) -> List[AnnotatedToken]:
+        """
+        :param verb_id: id of the verb token
+        :return: the tokens for which token.is_equal_to_any_verb_id(verb_id), in the sentence order
+        """
+        return [self.annotated_tokens[p] for p in self._positions_by_verb_id.get(verb_id, ())]
+
+    def related_tokens(self, verb_id: int, columns: Iterable[int]) -> List[AnnotatedToken]:
+        """
+        :param verb_id: id of the verb token
+        :param columns: semantic roles columns
+        :return: the dependents of the verb and the tokens with a semantic role in any of the columns,
+        in the sentence order
+        """
+        positions = set(self._positions_by_verb_id.get(verb_id, ()))
+        for column in columns:
+            positions.update(self._positions_by_column.get(column, ()))
+        return [self.annotated_tokens[p] for p in sorted(positions)]
+
+    def srl_spans(self, column: Optional[int], labels: Union[str, Tuple[str, ...]]) -> List[SrlSpan]:
+        """
+        Spans of the tokens annotated with B-label, extended with the subsequent I-label tokens (an I-label token
+        goes to the last B-label span, even if other tokens are in between). Computed once per sentence, column and
+        labels; the tokens are not expected to change afterwards.
+        :param column: index of the semantic roles column, None for role_in_recipe
+        :param labels: e.g. "V", or a tuple of labels sharing the spans
+        :return: spans in the sentence order
+        """
+        labels = (labels,) if isinstance(labels, str) else tuple(labels)
+        key = (column, labels)
+        if key in self._srl_spans:
+            return self._srl_spans[key]
+
+        b_roles = {f"B-{label}" for label in labels}
+        i_roles = {f"I-{label}" for label in labels}
+        spans = []
+        for position, token in enumerate(self.annotated_tokens):
+            role = token.role_in_recipe if column is None else token.semantic_roles[column]
+            if role in b_roles:
+                spans.append((position, token, [token.raw_token.lower()], [token.normalized_token.lower()]))
+            elif spans and role in i_roles:
+                spans[-1][2].append(token.raw_token.lower())
+                spans[-1][3].append(token.normalized_token.lower())
+
+        ret = [SrlSpan(position, token, tuple(raw), tuple(normalized), " ".join(raw), " ".join(normalized))
+               for position, token, raw, normalized in spans]
+        self._srl_spans[key] = ret
+        return ret
 
     @staticmethod
     def parse_sentence_from_lines(lines: List[str], sentence_offset: int = 0, token_offset: int = 0):
@@ -117,6 +190,29 @@ class AnnotatedRecipe:
         self.num_ingredients: int = None
         self.cluster: Union[int, str] = None
 
+        # lookup tables, the sentences are not expected to change after the recipe is built
+        self._positions_by_sentence_id: Dict[str, List[int]] = {}
+        self._positions_by_paragraph_id: Dict[str, List[int]] = {}
+        for position, sentence in enumerate(annotated_sentences):
+            self._positions_by_sentence_id.setdefault(sentence.sentence_id, []).append(position)
+            self._positions_by_paragraph_id.setdefault(sentence.paragraph_id, []).append(position)
+        self.sentences_by_id: Dict[str, AnnotatedSentence] = \
+            {key: annotated_sentences[positions[0]] for key, positions in self._positions_by_sentence_id.items()}
+        self.sentences_by_paragraph: Dict[str, List[AnnotatedSentence]] = \
+            {key: [annotated_sentences[p] for p in positions]
+             for key, positions in self._positions_by_paragraph_id.items()}
+
+    def sentences_in(self, steps: Iterable[str], by_paragraph: bool = False) -> List[AnnotatedSentence]:
+        """
+        Same as [s for s in annotated_sentences if s.sentence_id in steps], without scanning the whole recipe
+        :param steps: sentence ids (paragraph ids if by_paragraph)
+        :param by_paragraph: True to select the sentences by their paragraph_id
+        :return: the selected sentences, in the recipe order
+        """
+        index = self._positions_by_paragraph_id if by_paragraph else self._positions_by_sentence_id
+        positions = sorted(p for step in set(steps) for p in index.get(step, ()))
+        return [self.annotated_sentences[p] for p in positions]
+
     @staticmethod
     def parse_recipe_from_lines(lines: List[str]) -> "AnnotatedRecipe":
         list_of_sentences = AnnotatedRecipe._collect_sentences(lines)
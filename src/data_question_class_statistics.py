@@ -16,10 +16,9 @@ class QuestionClassStatistics(DataStatistics):
         :param data: Data items to be analyzed
         :return: Number of questions in category (for categories 0-18)
         """
+        return super().calc_statistics(data)
 
-        for item in data:
-            self.process_item(item)
-
+    def get_statistics(self) -> Dict[str, Any]:
         return {
             f"question_class_{question_key}": len(self.questions[question_key])
             for question_key in self.questions.keys()
@@ -31,6 +30,10 @@ class QuestionClassStatistics(DataStatistics):
             raise ValueError(f"Bad Question class {question_class} // item = {data_item}")
         self.questions[question_class].append(data_item)
 
+    def merge(self, other: "QuestionClassStatistics") -> None:
+        for key, items in other.questions.items():
+            self.questions[key].extend(items)
+
     def save_to_excel_workbook_per_class(self, prefix: str = f"{get_root()}/resources/"):
         for key, items in self.questions.items():
             filename = f"{prefix}/question_category_{key}.xls"
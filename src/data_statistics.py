@@ -7,8 +7,28 @@ from src.datafile_parser import DataItem
 class DataStatistics:
     INF = 1_000_000_000
 
+    def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:
+        for item in data:
+            self.process_item(item)
+
+        return self.get_statistics()
+
+    @abc.abstractmethod
+    def process_item(self, item: DataItem) -> None:  # pragma: nocover
+        pass
+
+    @abc.abstractmethod
+    def get_statistics(self) -> Dict[str, Any]:  # pragma: nocover
+        """
+        :return: the statistics of the items processed so far
+        """
+        pass
+
     @abc.abstractmethod
-    def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:  # pragma: nocover
+    def merge(self, other: "DataStatistics") -> None:  # pragma: nocover
+        """
+        Adds the items processed by other (of the same class) to this one, as if this one processed them after its own
+        """
         pass
 
 
@@ -53,10 +73,9 @@ class QuestionsAnswersMinMaxAvgStats(DataStatistics):
 
     def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:
         self.reset()
+        return super().calc_statistics(data)
 
-        for item in data:
-            self.process_item(item)
-
+    def get_statistics(self) -> Dict[str, Any]:
         return {
             "num_questions": self.num_questions,
             "num_answers": self.num_answers,
@@ -99,6 +118,24 @@ class QuestionsAnswersMinMaxAvgStats(DataStatistics):
             self.min_answer_len = min(ans_len, self.min_answer_len)
             self.max_answer_len = max(ans_len, self.max_answer_len)
 
+    def merge(self, other: "QuestionsAnswersMinMaxAvgStats") -> None:
+        self.num_questions += other.num_questions
+
+        self.num_answers += other.num_answers
+        self.num_empty_answers += other.num_empty_answers
+        self.num_textual_answers += other.num_textual_answers
+        self.num_na_answers += other.num_na_answers
+        self.num_integer_answers += other.num_integer_answers
+        self.num_first_second_event_answers += other.num_first_second_event_answers
+
+        self.min_question_len = min(self.min_question_len, other.min_question_len)
+        self.max_question_len = max(self.max_question_len, other.max_question_len)
+        self.sum_question_len += other.sum_question_len
+
+        self.min_answer_len = min(self.min_answer_len, other.min_answer_len)
+        self.max_answer_len = max(self.max_answer_len, other.max_answer_len)
+        self.sum_answer_len += other.sum_answer_len
+
 
 class PassageStatsCalculator(DataStatistics):
 
@@ -113,10 +150,7 @@ class PassageStatsCalculator(DataStatistics):
         self.sum_passage_lines = 0
         self.unique_passages: Set[str] = set()
 
-    def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:
-        for item in data:
-            self.process_item(item)
-
+    def get_statistics(self) -> Dict[str, Any]:
         return {
             "num_passages": self.num_passages,
             "num_unique_passages": len(self.unique_passages),
@@ -147,3 +181,14 @@ class PassageStatsCalculator(DataStatistics):
         self.min_passage_lines = min(self.min_passage_lines, passage_lines)
         self.max_passage_lines = max(self.max_passage_lines, passage_lines)
         self.sum_passage_lines += passage_lines
+
+    def merge(self, other: "PassageStatsCalculator") -> None:
+        self.num_passages += other.num_passages
+        self.min_passage_chars = min(self.min_passage_chars, other.min_passage_chars)
+        self.max_passage_chars = max(self.max_passage_chars, other.max_passage_chars)
+        self.sum_passage_chars += other.sum_passage_chars
+
+        self.min_passage_lines = min(self.min_passage_lines, other.min_passage_lines)
+        self.max_passage_lines = max(self.max_passage_lines, other.max_passage_lines)
+        self.sum_passage_lines += other.sum_passage_lines
+        self.unique_passages |= other.unique_passages
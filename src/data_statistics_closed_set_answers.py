@@ -12,29 +12,30 @@ class ClosedSetAnswerChecker(DataStatistics):
     def __init__(self, closed_answers: List[str] = DEFAULT_ANSWERS):
         self.normalizer = Normalizer()
         self.closed_answers = closed_answers
+        self.normalized_closed_answers = [self.normalizer.normalize(item) for item in self.closed_answers]
         self.found_answers: Dict[str, int] = {}
 
         for item in self.closed_answers:
             self.__reset_counter(item)
         self.found_answers["closed_answers_remaining_answers"] = 0
 
-    def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:
-        for item in data:
-            self.process_item(item)
-
+    def get_statistics(self) -> Dict[str, Any]:
         return self.found_answers
 
     def process_item(self, item: DataItem):
         answer = item.answer
 
-        for item in self.closed_answers:
-            closed_answer = self.normalizer.normalize(item)
-            if closed_answer == answer:
-                self.__increment_counter(item)
+        for closed_answer, normalized_closed_answer in zip(self.closed_answers, self.normalized_closed_answers):
+            if normalized_closed_answer == answer:
+                self.__increment_counter(closed_answer)
                 return
 
         self.found_answers["closed_answers_remaining_answers"] += 1
 
+    def merge(self, other: "ClosedSetAnswerChecker") -> None:
+        for key, count in other.found_answers.items():
+            self.found_answers[key] = self.found_answers.get(key, 0) + count
+
     def __increment_counter(self, phrase: str):
         phrase = phrase.replace(" ", "_")
         key = f"closed_answers_{phrase}"
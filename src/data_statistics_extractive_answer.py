@@ -5,24 +5,21 @@ import pandas
 
 from src.data_statistics import DataStatistics, DataItem
 from src.data_statistics_closed_set_answers import ClosedSetAnswerChecker
-from src.normalizer import Normalizer
+from src.normalizer import Normalizer, PassageNormalizer
 
 
 class ExtractiveAnswerChecker(DataStatistics):
 
     def __init__(self):
         self.normalizer = Normalizer()
+        self.passage_normalizer = PassageNormalizer(self.normalizer.normalize)
         self.num_extractive_and_nonextractive_answers = 0  # not N/As and not integers
         self.num_extractive_answers = 0
         self.num_non_extractive_answers = 0
         self.turns_extractive_after_removing_article = 0
         self.turns_extractive_after_removing_heading_conjunction = 0
 
-    def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:
-
-        for item in data:
-            self.process_item(item)
-
+    def get_statistics(self) -> Dict[str, Any]:
         ret = {
             "num_extractive_and_nonextractive_answers": self.num_extractive_and_nonextractive_answers,
             "num_extractive_answers": self.num_extractive_answers,
@@ -37,7 +34,7 @@ class ExtractiveAnswerChecker(DataStatistics):
             return
         self.num_extractive_and_nonextractive_answers += 1
 
-        passage = self.normalizer.normalize(item.passage)
+        passage = self.passage_normalizer.normalize(item.id, item.passage)
         answer = self.normalizer.normalize(item.answer)
 
         if passage.find(answer) != -1:
@@ -45,6 +42,11 @@ class ExtractiveAnswerChecker(DataStatistics):
         else:
             self.num_non_extractive_answers += 1
 
+    def merge(self, other: "ExtractiveAnswerChecker") -> None:
+        self.num_extractive_and_nonextractive_answers += other.num_extractive_and_nonextractive_answers
+        self.num_extractive_answers += other.num_extractive_answers
+        self.num_non_extractive_answers += other.num_non_extractive_answers
+
     @staticmethod
     def is_textual_answer(text: str) -> bool:
         return text is not None \
@@ -63,6 +65,9 @@ class AppendHandler:
         for item in self.append_items:
             print(f"{item.question}\t\t{item.answer}", file=outstream)
 
+    def merge(self, other: "AppendHandler") -> None:
+        self.append_items.extend(other.append_items)
+
     def dump_to_excel(self, filename: str):
         df = pandas.DataFrame([item.to_dataframe_dict() for item in self.append_items], columns=DataItem.COLUMNS)
         df.to_excel(filename)
@@ -72,6 +77,8 @@ class RecoverableAnswerChecker(DataStatistics):
 
     def __init__(self):
         self.normalizer = Normalizer()
+        self.passage_normalizer = PassageNormalizer(self.normalizer.normalize)
+        self.article_free_passages = PassageNormalizer(self._remove_articles_from_text)
         self.recoverable__analysed_answers = 0
         self.recoverable__after_removing_article = 0
         self.recoverable__after_removing_heading_by = 0
@@ -87,11 +94,7 @@ class RecoverableAnswerChecker(DataStatistics):
         for prefix in self.prefixes:
             self.__reset_counter(prefix)
 
-    def calc_statistics(self, data: List[DataItem]) -> Dict[str, Any]:
-
-        for item in data:
-            self.process_item(item)
-
+    def get_statistics(self) -> Dict[str, Any]:
         ret = {
             "recoverable__skipped_answers": self.recoverable__skipped_answers,
             "recoverable__analysed_answers": self.recoverable__analysed_answers,
@@ -108,7 +111,7 @@ class RecoverableAnswerChecker(DataStatistics):
             self.recoverable__skipped_answers += 1
             return
 
-        passage = self.normalizer.normalize(item.passage)
+        passage = self.passage_normalizer.normalize(item.id, item.passage)
         answer = self.normalizer.normalize(item.answer)
 
         if ClosedSetAnswerChecker.is_closed_aswer(answer) or passage.find(answer) != -1:
@@ -119,7 +122,8 @@ class RecoverableAnswerChecker(DataStatistics):
 
         self._handle_analysed_item(item)
 
-        answer, passage = self._remove_articles(answer, passage)
+        answer = self._remove_articles_from_text(answer)
+        passage = self.article_free_passages.normalize(item.id, passage)
 
         if passage.find(answer) != -1:
             self.recoverable__after_removing_article += 1
@@ -142,13 +146,24 @@ class RecoverableAnswerChecker(DataStatistics):
         for handler in self.handler_on_non_recoverable_items:
             handler.handle(item)
 
-    def _remove_articles(self, answer, passage):
+    def _remove_articles_from_text(self, text: str) -> str:
         for article in ["a", "an", "the"]:
-            answer = answer.replace(article, " ")
-            passage = passage.replace(article, " ")
-        answer = self.normalizer.normalize(answer)
-        passage = self.normalizer.normalize(passage)
-        return answer, passage
+            text = text.replace(article, " ")
+        return self.normalizer.normalize(text)
+
+    def merge(self, other: "RecoverableAnswerChecker") -> None:
+        self.recoverable__analysed_answers += other.recoverable__analysed_answers
+        self.recoverable__after_removing_article += other.recoverable__after_removing_article
+        self.recoverable__non_recoverable += other.recoverable__non_recoverable
+        self.recoverable__skipped_answers += other.recoverable__skipped_answers
+        for key, count in other.recoverable_dict.items():
+            self.recoverable_dict[key] = self.recoverable_dict.get(key, 0) + count
+
+        for handler, other_handler in zip(self.handler_on_analysed_items, other.handler_on_analysed_items):
+            handler.merge(other_handler)
+        for handler, other_handler in zip(self.handler_on_non_recoverable_items,
+                                          other.handler_on_non_recoverable_items):
+            handler.merge(other_handler)
 
     def __increment_counter(self, phrase: str):
         phrase = phrase.replace(" ", "_")
@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from src.data_statistics import DataStatistics, DataItem
+from src.normalizer import PassageNormalizer
+
+
+def group_by_passage(data: List[DataItem]) -> List[List[DataItem]]:
+    """
+    :return: the runs of consecutive items with the same passage id, in the order of data
+    """
+    groups = []
+    for item in data:
+        if groups and groups[-1][0].id == item.id:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+    return groups
+
+
+def split_by_passage(data: List[DataItem], num_chunks: int) -> List[List[DataItem]]:
+    """
+    :return: at most num_chunks consecutive parts of data of similar size; the questions of a passage stay together
+    """
+    target_size = len(data) / num_chunks
+    chunks = [[]]
+    for group in group_by_passage(data):
+        if chunks[-1] and len(chunks) < num_chunks and len(chunks[-1]) + len(group) / 2 > target_size:
+            chunks.append([])
+        chunks[-1].extend(group)
+    return [chunk for chunk in chunks if chunk]
+
+
+def _process_chunk(checkers: List[DataStatistics], data: List[DataItem]) -> List[DataStatistics]:
+    for item in data:
+        for checker in checkers:
+            checker.process_item(item)
+    return checkers
+
+
+def run_statistics(checkers: List[DataStatistics], data: List[DataItem], num_workers: int = 0) -> Dict[str, Any]:
+    """
+    Computes the statistics of all the checkers in a single pass over the data; the result is the same as
+    updating a dict with checker.calc_statistics(data) for every checker.
+    The checkers share the normalized passages, normalized once per passage.
+    :param checkers: new (not used yet) checkers
+    :param data: items to be analyzed
+    :param num_workers: number of worker processes (each one gets whole passages), 0 = run in this process
+    :return: statistics of all the checkers
+    """
+    if num_workers < 0:
+        raise ValueError(f"Incorrect number of workers = {num_workers}")
+    if len({id(checker) for checker in checkers}) != len(checkers):
+        raise ValueError("A checker is given more than once")
+
+    passage_normalizer = PassageNormalizer()
+    for checker in checkers:
+        if isinstance(getattr(checker, "passage_normalizer", None), PassageNormalizer):
+            checker.passage_normalizer = passage_normalizer
+
+    if num_workers == 0:
+        _process_chunk(checkers, data)
+    else:
+        with ProcessPoolExecutor(num_workers) as executor:
+            futures = [executor.submit(_process_chunk, checkers, chunk)
+                       for chunk in split_by_passage(data, num_workers)]
+            for future in futures:
+                for checker, processed in zip(checkers, future.result()):
+                    checker.merge(processed)
+
+    ret = {}
+    for checker in checkers:
+        ret.update(checker.get_statistics())
+    return ret
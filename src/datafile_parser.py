@@ -1,6 +1,7 @@
-from typing import List, TextIO
+from typing import List, Optional, TextIO
 
 from src.get_root import get_root
+from src.unpack_data import Q_A, Recipe, cached_per_recipe, load_recipes
 
 
 class DataItem:
@@ -25,6 +26,54 @@ class DataItem:
                f"P = {self.passage}"
 
 
+@cached_per_recipe
+def recipe_passage(recipe: Recipe) -> str:
+    """
+    :return: the passage of the recipe, as built by DatafileParser (the "# text =" lines); the same object for all
+    the questions of the recipe
+    """
+    texts = []
+    for line in recipe.new_pars_str.split("\n"):
+        line = line.strip()
+        if line.find("# text =") == 0:
+            texts.append(line[line.find("=") + 1:].strip())
+    return "\n".join(texts)
+
+
+class RecipeDataItem(DataItem):
+    """
+    DataItem view of a question of a parsed Recipe: nothing is copied, the passage is built when first used
+    """
+
+    def __init__(self, recipe: Recipe, qa: Q_A):
+        self.recipe = recipe
+        self.qa = qa
+
+    @property
+    def passage(self) -> str:
+        return recipe_passage(self.recipe)
+
+    @property
+    def question(self) -> str:
+        return self.qa.q
+
+    @property
+    def id(self) -> str:
+        return self.recipe.id
+
+    @property
+    def answer(self) -> Optional[str]:
+        return self.qa.a
+
+    @property
+    def subid(self) -> str:
+        return self.qa.id
+
+    def __reduce__(self):
+        # sent to other processes as a plain DataItem, without the parsed recipe
+        return DataItem, (self.passage, self.question, self.id, self.answer, self.subid)
+
+
 class DatafileParser:
 
     def __init__(self):
@@ -109,8 +158,20 @@ class DatafileParser:
         self.current_subids = []
         return ret
 
+    @staticmethod
+    def items_of_recipes(recipes: List[Recipe]) -> List[DataItem]:
+        """
+        :return: the questions of the recipes as DataItems (views, see RecipeDataItem)
+        """
+        return [RecipeDataItem(recipe, qa) for recipe in recipes for qa in recipe.q_a]
+
     @staticmethod
     def get_resource(which: str) -> List[DataItem]:
+        """
+        :param which: train / val / test
+        :return: the questions of the dataset, derived from the recipes shared with the prediction pipeline
+        (the file is parsed once per process, see load_recipes)
+        """
         if which not in ["test", "train", "val"]:
             raise ValueError(f"Bad dataset name = {which}")
 
@@ -120,5 +181,4 @@ class DatafileParser:
             "test": f"{get_root()}/modules/recipe2video/data/test/test_WITH_ANSWERS.csv",
         }
 
-        engine = DatafileParser()
-        return engine.parse_from_file(filenames[which])
+        return DatafileParser.items_of_recipes(load_recipes(filenames[which]))
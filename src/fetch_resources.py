@@ -1,8 +1,18 @@
-import nltk
 import os
 
+_resources_checked = False
+
 
 def fetch_linguistic_resources() -> None:  # pragma: nocover
+    """
+    Downloads the missing nltk resources; once all of them are available, later calls return immediately
+    """
+    global _resources_checked
+    if _resources_checked:
+        return
+
+    import nltk
+
     nltk_resources = {
         "corpora": (
             "omw-1.4",
@@ -16,9 +26,11 @@ def fetch_linguistic_resources() -> None:  # pragma: nocover
         )
     }
 
+    all_available = True
     for category, resources in nltk_resources.items():
         for resource in resources:
             try:
                 nltk.data.find(os.path.join(category, resource))
             except LookupError:
-                nltk.download(resource)
+                all_available = nltk.download(resource) and all_available
+    _resources_checked = all_available
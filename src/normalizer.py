@@ -1,3 +1,6 @@
+from typing import Callable, Dict, Optional, Tuple
+
+
 class Normalizer:
 
     def normalize(self, a_text: str) -> str:
@@ -13,3 +16,25 @@ class Normalizer:
             ret = ret.replace("  ", " ")
 
         return ret
+
+
+class PassageNormalizer:
+    """
+    Normalizes a passage once for all its questions: the result is cached per passage id
+    (and recomputed if another passage comes with the same id). The questions of a recipe share the passage object,
+    so a cache hit costs no comparison of the texts
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = None):
+        """
+        :param normalize: the normalization, default: Normalizer().normalize
+        """
+        self.normalize_text = normalize if normalize else Normalizer().normalize
+        self.passages: Dict[Optional[str], Tuple[str, str]] = {}
+
+    def normalize(self, passage_id: Optional[str], passage: str) -> str:
+        cached = self.passages.get(passage_id)
+        if cached is None or (cached[0] is not passage and cached[0] != passage):
+            cached = (passage, self.normalize_text(passage))
+            self.passages[passage_id] = cached
+        return cached[1]
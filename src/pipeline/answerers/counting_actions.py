@@ -1,17 +1,26 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 
-import nltk
 import io
+from src.pipeline.fuzzy_index import FuzzyKeyIndex
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
-from src.unpack_data import QuestionAnswerRecipe
+from src.unpack_data import QuestionAnswerRecipe, Recipe, cached_per_recipe
 from src.putty_lemmatizer import PuttyLemmatizer
-import inflect
+from src.shared_resources import get_inflect_engine
 
 
 def construct_map_with_i_and_h_columns(question: QuestionAnswerRecipe) -> Dict[str, int]:
+    return dict(relations_index(question.recipe).occurrences)
+
+
+@cached_per_recipe
+def relations_index(recipe: Recipe) -> FuzzyKeyIndex:
+    """
+    Occurrences of the Drop / Tool / Habitat / Result / Shadow entries and relation2 in the recipe,
+    built once per recipe
+    """
     tools_and_habitats_map = {}
-    for sentence in question.recipe.annotated_recipe.annotated_sentences:
+    for sentence in recipe.annotated_recipe.annotated_sentences:
         for token in sentence.annotated_tokens:
             words = []
             if token.relation1:
@@ -28,14 +37,14 @@ def construct_map_with_i_and_h_columns(question: QuestionAnswerRecipe) -> Dict[s
                     tools_and_habitats_map[w] += 1
                 else:
                     tools_and_habitats_map[w] = 1
-    return tools_and_habitats_map
+    return FuzzyKeyIndex(tools_and_habitats_map)
 
 
-def find_occurrences(question_noun, tools_and_habitats_map):
+def find_occurrences(question_noun, tools_and_habitats_map: Union[Dict[str, int], FuzzyKeyIndex]):
     question_noun = question_noun.strip().replace(" ", "_")
-    result = [(key, value) for key, value in tools_and_habitats_map.items() if
-              nltk.edit_distance(key.split(".")[0], question_noun) < 2]
-    return result
+    if not isinstance(tools_and_habitats_map, FuzzyKeyIndex):
+        tools_and_habitats_map = FuzzyKeyIndex(tools_and_habitats_map)
+    return tools_and_habitats_map.find(question_noun, max_distance=1)  # edit distance < 2
 
 
 def count_raw_occurences(question_noun, question):
@@ -66,9 +75,8 @@ class QuestionAnswererCountingActions(QuestionAnsweringBase):
     """
 
     def __init__(self):
-        self.lemmatizer = PuttyLemmatizer()
-        self.inflect_engine = inflect.engine()
-        self.inflect_engine.classical()
+        self.lemmatizer = PuttyLemmatizer.get()
+        self.inflect_engine = get_inflect_engine(classical=True)
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
@@ -79,7 +87,7 @@ class QuestionAnswererCountingActions(QuestionAnsweringBase):
         the_object = self.get_object_from_question(question)
         print(f"Object = {the_object}", file=outstream)
 
-        relations_map = construct_map_with_i_and_h_columns(question)
+        relations_map = relations_index(question.recipe)
         list_singular = find_occurrences(the_object, relations_map)
         print(f"Singular = {list_singular}", file=outstream)
 
@@ -1,19 +1,121 @@
 import io
-from typing import Dict, Any, List
+from collections import defaultdict
+from typing import Dict, Any, List, Tuple
 
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
 from src.putty_lemmatizer import PuttyLemmatizer
 from src.annotated_recipe import AnnotatedToken, AnnotatedSentence
-import inflect
+from src.unpack_data import Recipe, cached_per_recipe
+from src.shared_resources import get_inflect_engine
+
+
+def sentence_multiplicity(sentence: AnnotatedSentence) -> int:
+    """
+    :return: how many times the objects of the sentence are used, e.g. 2 for "use two pans"
+    """
+    str_to_int = {
+        "two": 2,
+        "three": 3,
+        "four": 4,
+        "five": 5
+    }
+
+    scalar = 1
+    for token in sentence.annotated_tokens:
+        if token.part_of_speech != "NUM":
+            continue
+        semantic_roles = set(token.semantic_roles)
+        allowed_roles = {"I-Theme", "B-Theme", "I-Location", "B-Location", "B-Destination", "B-Destination"}
+        if semantic_roles.intersection(allowed_roles):
+            scalar = str_to_int.get(token.normalized_token.lower(), 1)
+    return scalar
+
+
+def valid_relations1(token: AnnotatedToken) -> List[str]:
+    relations = token.get_whole_entry_from_relation1("Habitat") \
+                + token.get_whole_entry_from_relation1("Tool") \
+                + token.get_whole_entry_from_relation1("Drop") \
+                + token.get_whole_entry_from_relation1("Result") \
+                + token.get_whole_entry_from_relation1("Shadow")
+    return relations
+
+
+class CorefIndex:
+    """
+    Inverted indexes over the coreference entries (relation2 and the valid relation1 entries) of a recipe:
+    - every suffix of an entry -> (token, multiplicity of its sentence), to find the uses of a coref id,
+    - relation1 entry prefix ending before a "." -> entry, and lowercased raw token -> positions, to find aliases.
+    Lookups return the same results in the same order as scanning all the tokens of the recipe.
+    """
+
+    def __init__(self, recipe: Recipe):
+        self._sentences = [sentence.annotated_tokens for sentence in recipe.annotated_recipe.annotated_sentences]
+        self._tokens_by_suffix: Dict[str, List[Tuple[AnnotatedToken, int]]] = defaultdict(list)
+        self._positions_by_word: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._relations1_by_prefix: Dict[str, List[Tuple[int, int, int, str]]] = defaultdict(list)
+
+        for sentence_index, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
+            multiplicity = sentence_multiplicity(sentence)
+            tokens = sentence.annotated_tokens
+            for position, token in enumerate(tokens):
+                relations1 = valid_relations1(token)
+                entries = ([token.relation2] if token.relation2 else []) + relations1
+                for entry in entries:
+                    for i in range(len(entry) + 1):
+                        self._tokens_by_suffix[entry[i:]].append((token, multiplicity))
+
+                start = token.id - 1
+                if 0 <= start < len(tokens):
+                    self._positions_by_word[tokens[start].raw_token.lower()].append((sentence_index, position))
+
+                for k, r in enumerate(relations1):
+                    for i, c in enumerate(r):
+                        if c == ".":
+                            self._relations1_by_prefix[r[:i]].append((sentence_index, position, k, r))
+
+    def tokens_with_coref_id(self, coref_id: str) -> List[AnnotatedToken]:
+        """
+        :param coref_id: e.g. "2.1.1" for "pan.2.1.1"
+        :return: the tokens having a coreference entry ending with coref_id, repeated by the sentence multiplicity
+        """
+        ret = []
+        for token, multiplicity in self._tokens_by_suffix.get(coref_id, ()):
+            ret.extend([token] * multiplicity)
+        return ret
+
+    def alias_candidates(self, phrase: str) -> List[str]:
+        """
+        :param phrase: e.g. "olive_oil"
+        :return: relation2 of the tokens of the phrase occurrences in the text and the relation1 entries of
+        the form phrase.*, in the order of the recipe, possibly with duplicates
+        """
+        words = phrase.lower().split("_")
+        found = []
+        for sentence_index, position in self._positions_by_word.get(words[0], ()):
+            tokens = self._sentences[sentence_index]
+            start = tokens[position].id - 1
+            window = tokens[start:start + len(words)]
+            if [t.raw_token.lower() for t in window] == words:
+                found.append((sentence_index, position, -1, [t.relation2 for t in window if t.relation2]))
+        for sentence_index, position, k, r in self._relations1_by_prefix.get(phrase, ()):
+            found.append((sentence_index, position, k, [r]))
+
+        found.sort(key=lambda f: f[:3])
+        return [alias for f in found for alias in f[3]]
+
+
+@cached_per_recipe
+def coref_index(recipe: Recipe) -> CorefIndex:
+    return CorefIndex(recipe)
 
 
 class QuestionAnswererCountingTimes(QuestionAnsweringBase):
     DESCRIPTION = "QuestionAnswerer: HowManyTimes X is used?"
 
     def __init__(self):
-        self.lemmatizer = PuttyLemmatizer()
-        self.inflection_engine = inflect.engine()
+        self.lemmatizer = PuttyLemmatizer.get()
+        self.inflection_engine = get_inflect_engine()
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
@@ -66,76 +168,25 @@ class QuestionAnswererCountingTimes(QuestionAnsweringBase):
         if not alias:
             return []
 
-        ret = []
         coref_id = ".".join(alias.split(".")[1:])
-
-        for sentence in question.recipe.annotated_recipe.annotated_sentences:
-            for token in sentence.annotated_tokens:
-                multiplicity = self.search_for_duplication(sentence)
-
-                found_in_rel2 = bool(token.relation2 and token.relation2.endswith(coref_id))
-                if found_in_rel2:
-                    ret.extend([token] * multiplicity)
-
-                for r in self.get_valid_relaitons1(token):
-                    if r.endswith(coref_id):
-                        ret.extend([token] * multiplicity)
-
-                # TODO handle duplications
-        return ret
+        # TODO handle duplications
+        return coref_index(question.recipe).tokens_with_coref_id(coref_id)
 
     def search_for_duplication(self, sentence: AnnotatedSentence) -> int:
-
-        str_to_int = {
-            "two": 2,
-            "three": 3,
-            "four": 4,
-            "five": 5
-        }
-
-        scalar = 1
-        for token in sentence.annotated_tokens:
-            if token.part_of_speech != "NUM":
-                continue
-            semantic_roles = set(token.semantic_roles)
-            allowed_roles = {"I-Theme", "B-Theme", "I-Location", "B-Location", "B-Destination", "B-Destination"}
-            if semantic_roles.intersection(allowed_roles):
-                scalar = str_to_int.get(token.normalized_token.lower(), 1)
-        return scalar
+        return sentence_multiplicity(sentence)
 
     def get_valid_relaitons1(self, token: AnnotatedToken) -> List[str]:
-        relations = token.get_whole_entry_from_relation1("Habitat") \
-                    + token.get_whole_entry_from_relation1("Tool") \
-                    + token.get_whole_entry_from_relation1("Drop") \
-                    + token.get_whole_entry_from_relation1("Result") \
-                    + token.get_whole_entry_from_relation1("Shadow")
-        return relations
+        return valid_relations1(token)
 
     def find_aliases(self, an_object: str, question: QuestionAnswerRecipe) -> List[str]:
         normalized = self.normalize_singular_plural_form(an_object)
+        index = coref_index(question.recipe)
         ret = []
 
         for normalized_phrase in normalized:
-            objects_as_list = normalized_phrase.lower().split("_")
-            l = len(objects_as_list)
-
-            for sentence in question.recipe.annotated_recipe.annotated_sentences:
-                for token in sentence.annotated_tokens:
-                    i = token.id - 1
-                    tokens = sentence.annotated_tokens[i:i + l] \
-                        if i + l < len(sentence.annotated_tokens) else sentence.annotated_tokens[i:]
-                    words = [t.raw_token.lower() for t in tokens]
-
-                    if words == objects_as_list:
-                        aliases = [t.relation2 for t in tokens if t.relation2]
-                        aliases = [a for a in aliases if a]
-                        for a in aliases:
-                            if a not in ret:
-                                ret.append(a)
-
-                    for r in self.get_valid_relaitons1(token):
-                        if r.startswith(normalized_phrase + ".") and r not in ret:
-                            ret.append(r)
+            for a in index.alias_candidates(normalized_phrase):
+                if a not in ret:
+                    ret.append(a)
         return ret
 
     def normalize_singular_plural_form(self, phrase: str) -> List[str]:
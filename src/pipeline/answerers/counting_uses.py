@@ -1,14 +1,14 @@
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
-import nltk
 import io
 
+from src.pipeline.fuzzy_index import FuzzyKeyIndex
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
 from src.putty_lemmatizer import PuttyLemmatizer
-from src.unpack_data import QuestionAnswerRecipe
-import inflect
+from src.unpack_data import QuestionAnswerRecipe, Recipe, cached_per_recipe
+from src.shared_resources import get_inflect_engine
 
 
 def constuct_map_with_i_and_h_columns_tools(question: QuestionAnswerRecipe):
@@ -20,8 +20,16 @@ def constuct_map_with_i_and_h_columns_habitats(question: QuestionAnswerRecipe):
 
 
 def construct_map(question: QuestionAnswerRecipe, rel1: str, role_in_recipe: str) -> Dict[str, int]:
+    return dict(occurrences_index(question.recipe, rel1, role_in_recipe).occurrences)
+
+
+@cached_per_recipe
+def occurrences_index(recipe: Recipe, rel1: str, role_in_recipe: str) -> FuzzyKeyIndex:
+    """
+    Occurrences of the rel1 entries and role_in_recipe relations in the recipe, built once per recipe
+    """
     ret = {}
-    for sentence in question.recipe.annotated_recipe.annotated_sentences:
+    for sentence in recipe.annotated_recipe.annotated_sentences:
         for token in sentence.annotated_tokens:
             words = []
             if token.relation1:
@@ -35,14 +43,14 @@ def construct_map(question: QuestionAnswerRecipe, rel1: str, role_in_recipe: str
                     ret[w] += 1
                 else:
                     ret[w] = 1
-    return ret
+    return FuzzyKeyIndex(ret)
 
 
-def find_occurrences(question_noun, tools_and_habitats_map):
+def find_occurrences(question_noun, tools_and_habitats_map: Union[Dict[str, int], FuzzyKeyIndex]):
     question_noun = question_noun.strip().replace(" ", "_")
-    result = [(key, value) for key, value in tools_and_habitats_map.items() if
-              nltk.edit_distance(key.split(".")[0], question_noun) <= 1]
-    return result
+    if not isinstance(tools_and_habitats_map, FuzzyKeyIndex):
+        tools_and_habitats_map = FuzzyKeyIndex(tools_and_habitats_map)
+    return tools_and_habitats_map.find(question_noun, max_distance=1)
 
 
 def count_raw_occurences(question_noun, question):
@@ -79,9 +87,8 @@ class QuestionAnswererCountingUses(QuestionAnsweringBase):
     """
 
     def __init__(self):
-        self.inflect_engine = inflect.engine()
-        self.inflect_engine.classical()
-        self.lemmatizer = PuttyLemmatizer()
+        self.inflect_engine = get_inflect_engine(classical=True)
+        self.lemmatizer = PuttyLemmatizer.get()
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
@@ -97,11 +104,11 @@ class QuestionAnswererCountingUses(QuestionAnsweringBase):
 
         # question_noun = question_noun.replace('``', "\"").lower().strip()
         last_rule = "Exact match"
-        tools_map = constuct_map_with_i_and_h_columns_tools(question)
-        habitats_map = constuct_map_with_i_and_h_columns_habitats(question)
+        tools_map = occurrences_index(question.recipe, "Tool", "TOOL")
+        habitats_map = occurrences_index(question.recipe, "Habitat", "HABITAT")
 
-        print(f"Tools = {tools_map}", file=outstream)
-        print(f"Habitats = {habitats_map}", file=outstream)
+        print(f"Tools = {tools_map.occurrences}", file=outstream)
+        print(f"Habitats = {habitats_map.occurrences}", file=outstream)
 
         list_singular_tools = find_occurrences(singular_object, tools_map)
         list_plural_tools = find_occurrences(plural_object, tools_map)
@@ -1,10 +1,10 @@
 from typing import Dict, Any, List, Optional
 
-import nltk
 from conllu.models import TokenList
 
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
+from src.putty_lemmatizer import PuttyLemmatizer
 
 
 class QuestionAnswererEllipsisV1(QuestionAnsweringBase):
@@ -114,10 +114,12 @@ class QuestionAnswererEllipsisV1(QuestionAnsweringBase):
         more_info_for_answer = {"source": self.DESCRIPTION}
 
         # We have checked that all questions have the "what should be pp *" form
-        q_words = nltk.tokenize.word_tokenize(question.question)
+        from nltk.tokenize import word_tokenize
+
+        q_words = word_tokenize(question.question)
         q_v_participle = q_words[3]
 
-        q_v_lemma = nltk.stem.WordNetLemmatizer().lemmatize(q_v_participle, pos='v')
+        q_v_lemma = PuttyLemmatizer.get().lemmatizer.lemmatize(q_v_participle, pos='v')
 
         answer_by_patient = self._get_patients_from_annotated_recipe(
             question.recipe.annotated_recipe.annotated_sentences, q_v_lemma)
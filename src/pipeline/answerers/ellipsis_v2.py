@@ -1,12 +1,11 @@
 from typing import Dict, List, Any, Tuple
 
-import inflect
-import nltk
-
 from src.annotated_recipe import AnnotatedSentence
 from src.pipeline.interface_question_answering import QuestionAnswerRecipe, QuestionAnsweringBase, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
+from src.putty_lemmatizer import PuttyLemmatizer
 from src.unpack_data import Recipe
+from src.shared_resources import get_inflect_engine
 
 
 class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
@@ -17,7 +16,7 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
         self.answer_annotations = answer_annotations
         self.answer_relations = answer_relations
 
-        self.inflection = inflect.engine()
+        self.inflection = get_inflect_engine()
 
     @staticmethod
     def concat_words(sentence: AnnotatedSentence, annotation_column: int, possible_answer: str, raw: bool = False,
@@ -33,39 +32,10 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
         :return: a dictionary indexed by (sentence id, paragraph id, token index) with corresponding words
         """
 
-        words = {}
-        extra_idx = None
-        b_answer_found = False
-        ingredient_verb_token_idx = None
-        ingredient_semantic_roles = None
-
-        for token_idx, token in enumerate(sentence.annotated_tokens):
-            value = token.raw_token.lower() if raw else token.normalized_token.lower()
-
-            semantic_role = token.semantic_roles[annotation_column] if verb_search else token.role_in_recipe
-
-            if semantic_role is None:
-                continue
-
-            searched_annotations_b = [f"B-{possible_answer}"] if singular \
-                else ["B-EXPLICITINGREDIENT", "B-IMPLICITINGREDIENT"]
-            searched_annotations_i = [f"I-{possible_answer}"] if singular \
-                else ["I-EXPLICITINGREDIENT", "I-IMPLICITINGREDIENT"]
-
-            # First we look for f"B-{possible_answer}
-            if semantic_role in searched_annotations_b:
-                b_answer_found = True
-                extra_idx = token.id
-                ingredient_verb_token_idx = token.where_is_my_verb_explicit
-                ingredient_semantic_roles = tuple(token.semantic_roles)
-                words[(sentence.sentence_id, sentence.paragraph_id, extra_idx, ingredient_verb_token_idx, ingredient_semantic_roles)] = [value]
-
-            # If f"B-{possible_answer}" has been found, we append f"I-{possible_answer}"s if we find them
-            elif b_answer_found and semantic_role in searched_annotations_i:
-                words[(sentence.sentence_id, sentence.paragraph_id, extra_idx, ingredient_verb_token_idx, ingredient_semantic_roles)].append(value)
-
-        words = {key: " ".join(value) for key, value in words.items()}
-        return words
+        labels = possible_answer if singular else ("EXPLICITINGREDIENT", "IMPLICITINGREDIENT")
+        return {(sentence.sentence_id, sentence.paragraph_id, span.token.id, span.token.where_is_my_verb_explicit,
+                 tuple(span.token.semantic_roles)): span.raw if raw else span.normalized
+                for span in sentence.srl_spans(annotation_column if verb_search else None, labels)}
 
     def words_from_paragraph(self, recipe: Recipe, paragraph: str, used_column: int,
                              searched_word: str, raw: bool, verb_search: bool, singular: bool) -> Dict[tuple, str]:
@@ -74,24 +44,23 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
         """
 
         words_in_paragraph = {}
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.sentence_id == paragraph:
+        for sentence in recipe.annotated_recipe.sentences_in([paragraph]):
+            words_in_paragraph.update(self.concat_words(
+                sentence=sentence,
+                annotation_column=used_column,
+                possible_answer=searched_word,
+                raw=raw,
+                verb_search=verb_search,
+                singular=singular
+            ))
+            if verb_search:
                 words_in_paragraph.update(self.concat_words(
                     sentence=sentence,
                     annotation_column=used_column,
-                    possible_answer=searched_word,
+                    possible_answer="EVENT",
                     raw=raw,
-                    verb_search=verb_search,
-                    singular=singular
+                    singular=True
                 ))
-                if verb_search:
-                    words_in_paragraph.update(self.concat_words(
-                        sentence=sentence,
-                        annotation_column=used_column,
-                        possible_answer="EVENT",
-                        raw=raw,
-                        singular=True
-                    ))
         return words_in_paragraph
 
     def cut_rows_and_answer(self, verb, recipe: Recipe, steps: List[str], iter_type: str, answer_relations: str = "",
@@ -102,36 +71,34 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
         if not answer_relations:
             answer_relations = self.answer_relations
 
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-
-            part_identifier = sentence.sentence_id if iter_type == "sentence" else sentence.paragraph_id
-
-            if part_identifier in steps:
-                relation1_column_values = self.search_relation1_column(
-                    recipe=recipe,
-                    verb=verb,
-                    verb_steps=steps,
-                    iter_type=iter_type
-                )
-                for relation1_column_value in relation1_column_values:
-                    for answer_relation in answer_relations:
-                        if relation1_column_value and (answer_relation in relation1_column_value):
-                            relation1_value = self.make_use_of_relation1(
-                                relation=answer_relation,
-                                relation_column_value=relation1_column_value,
-                                make_singular=False
-                            )
+        sentences = recipe.annotated_recipe.sentences_in(steps, by_paragraph=iter_type != "sentence")
+        # the same for all the sentences
+        relation1_column_values = self.search_relation1_column(
+            recipe=recipe,
+            verb=verb,
+            verb_steps=steps,
+            iter_type=iter_type
+        ) if sentences else []
+        for sentence in sentences:
+            for relation1_column_value in relation1_column_values:
+                for answer_relation in answer_relations:
+                    if relation1_column_value and (answer_relation in relation1_column_value):
+                        relation1_value = self.make_use_of_relation1(
+                            relation=answer_relation,
+                            relation_column_value=relation1_column_value,
+                            make_singular=False
+                        )
 
-                            if relation1_value:
-                                if ingredients and ingredients[1] == sentence.sentence_id:
-                                    if ingredients[0] not in relation1_value:
-                                        answer = f"{ingredients[0]}, {relation1_value}"
-                                        answer = answer.rsplit(",", 1)
-                                        answer = " and".join(answer)
-                                        return f"the {answer}"
-                                relation1_value = relation1_value.rsplit(",", 1)
-                                relation1_value = " and".join(relation1_value)
-                                return f"the {relation1_value}"
+                        if relation1_value:
+                            if ingredients and ingredients[1] == sentence.sentence_id:
+                                if ingredients[0] not in relation1_value:
+                                    answer = f"{ingredients[0]}, {relation1_value}"
+                                    answer = answer.rsplit(",", 1)
+                                    answer = " and".join(answer)
+                                    return f"the {answer}"
+                            relation1_value = relation1_value.rsplit(",", 1)
+                            relation1_value = " and".join(relation1_value)
+                            return f"the {relation1_value}"
 
         return ""
 
@@ -153,6 +120,7 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
                     example_steps = [idx[1] for idx, example_value in semantic_role_examples.items() if
                                      example_value == example]
 
+                example_steps = set(example_steps)
                 intersection = [value for value in verb_steps if value in example_steps]
                 if intersection and intersection[0]:
                     answer = self.cut_rows_and_answer(
@@ -173,12 +141,10 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
         Get value from drop column for verb
         """
         relations = []
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            part_identifier = sentence.sentence_id if iter_type == "sentence" else sentence.paragraph_id
-            if part_identifier in verb_steps:
-                for token in recipe.annotated_recipe.annotated_sentences[sentence_idx].annotated_tokens:
-                    if token.normalized_token.lower() in verb and token.relation1:
-                        relations.append(token.relation1)
+        for sentence in recipe.annotated_recipe.sentences_in(verb_steps, by_paragraph=iter_type != "sentence"):
+            for token in sentence.annotated_tokens:
+                if token.normalized_token.lower() in verb and token.relation1:
+                    relations.append(token.relation1)
         return relations
 
     def make_use_of_relation1(self, relation: str, relation_column_value: str, make_singular: bool) -> str:
@@ -387,7 +353,7 @@ class QuestionAnswererEllipsisV2(QuestionAnsweringBase):
         """
         question = question.replace("?", "")
         question = question.split()
-        question[3] = nltk.stem.WordNetLemmatizer().lemmatize(question[3], pos='v')
+        question[3] = PuttyLemmatizer.get().lemmatizer.lemmatize(question[3], pos='v')
         question = " ".join(question)
         return question
 
@@ -1,10 +1,13 @@
 import re
-from typing import Dict, Any, Union, Tuple
+from typing import Dict, Any, Union, Tuple, List
 
 import jellyfish
 
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
+from src.unpack_data import Recipe, cached_per_recipe
+
+_ARTICLE_PATTERNS = [re.compile(r'(?:\b(?:a|an|the|le)\b)'), re.compile(r'^\b(a|an|the|le)\b')]
 
 
 class QuestionAnswererEventOrderingV1(QuestionAnsweringBase):
@@ -28,13 +31,10 @@ class QuestionAnswererEventOrderingV1(QuestionAnsweringBase):
 
 
 def _return_answer(question, threshold: float) -> Union[str, None]:
-    first_compare = []
-    second_compare = []
     q_first, q_second = _separate_first_and_second_question_part(question.question)
-    for k, v in question.recipe.new_pars.items():
-        if 'step' in k:
-            first_compare.append(_distance_scores(q_first, v[0].metadata['text']))
-            second_compare.append(_distance_scores(q_second, v[0].metadata['text']))
+    cleaned_steps = _cleaned_recipe_steps(question.recipe)
+    first_compare = _distance_scores_to_all(q_first, cleaned_steps)
+    second_compare = _distance_scores_to_all(q_second, cleaned_steps)
     f_nr = first_compare.index(min(first_compare))
     s_nr = second_compare.index(min(second_compare))
     answer = None
@@ -67,8 +67,28 @@ def _distance_scores(item_first: str, item_second: str) -> float:
     return edit_distance_fn(_clean(item_first), _clean(item_second))
 
 
+def _distance_scores_to_all(query: str, cleaned_items: Tuple[str, ...]) -> List[float]:
+    """
+    Batched version of _distance_scores: scores one query against many already cleaned texts
+    :param query: raw query text (cleaned once here)
+    :param cleaned_items: texts already passed through _clean (e.g. from _cleaned_recipe_steps)
+    :return: one score per item, maximum distance (1.0), best(0.0)
+    """
+    cleaned_query = _clean(query)
+    return [1 - jellyfish.jaro_similarity(cleaned_query, item) for item in cleaned_items]
+
+
+@cached_per_recipe
+def _cleaned_recipe_steps(recipe: Recipe) -> Tuple[str, ...]:
+    """
+    :param recipe: recipe whose steps are compared with the question (cached in the recipe)
+    :return: cleaned texts of the recipe steps, in recipe order
+    """
+    return tuple(_clean(v[0].metadata['text']) for k, v in recipe.new_pars.items() if 'step' in k)
+
+
 def _clean(str_to_clean: str) -> str:
     str_to_clean = str_to_clean.lower()
-    for token in [r'(?:\b(?:a|an|the|le)\b)', r'^\b(a|an|the|le)\b']:
-        str_to_clean = re.sub(token, '', str_to_clean)
+    for pattern in _ARTICLE_PATTERNS:
+        str_to_clean = pattern.sub('', str_to_clean)
     return str_to_clean.replace(' - ', ' ')
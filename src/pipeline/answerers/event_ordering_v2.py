@@ -1,12 +1,11 @@
 import io
 from typing import Dict, Any, List
 
-import nltk
-
 from src.pipeline.answerers.event_ordering_v1 import _return_answer
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
 from src.pipeline.verb_object_habitat import VerbPatientHabitat
+from src.pos_tagger import PosTagger
 from src.putty_lemmatizer import PuttyLemmatizer
 
 
@@ -60,7 +59,7 @@ class QuestionAnswererEventOrdering(QuestionAnsweringBase):
     DESCRIPTION = "QuestionAnswerer: A,B Which comes first? (Event Based)"
 
     def __init__(self):
-        self.lemmatizer = PuttyLemmatizer()
+        self.lemmatizer = PuttyLemmatizer.get()
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
@@ -261,10 +260,22 @@ class QuestionAnswererEventOrdering(QuestionAnsweringBase):
     def avg(self, t1):
         return sum(t1) / len(t1) if t1 else None
 
-    def split_question_into_events(self, question: str) -> List[List[str]]:
+    def warm_up(self, questions: List[QuestionAnswerRecipe]) -> None:
+        """
+        Tags the questions, then their event segments, in two batched passes
+        """
+        tagger = PosTagger.get()
+        tagger.tag_sents([self._question_tokens(question.question) for question in questions])
+        tagger.tag_sents([segment for question in questions
+                          for segment in self.split_question_into_events(question.question)])
+
+    @staticmethod
+    def _question_tokens(question: str) -> List[str]:
         q = question.replace("which comes first?", "").replace(",", " ").lower()
-        as_array = [x for x in q.split(" ") if x]
-        lemmatized = nltk.pos_tag(as_array)
+        return [x for x in q.split(" ") if x]
+
+    def split_question_into_events(self, question: str) -> List[List[str]]:
+        lemmatized = PosTagger.get().tag(self._question_tokens(question))
 
         ret: List[List[str]] = []
         current: List[str] = []
@@ -287,7 +298,7 @@ class QuestionAnswererEventOrdering(QuestionAnsweringBase):
         lemmatized_verb = self.lemmatizer.lemmatize_verb(segment[0])
 
         rets = []
-        pos_tagged = nltk.pos_tag(segment)
+        pos_tagged = PosTagger.get().tag(segment)
         prev_modifiers = []
         for token, pos in pos_tagged:
             if pos in {"NN", "NNS", "PRP"}:
@@ -1,13 +1,11 @@
 import re
 from typing import Dict, Any, Tuple, List
 
-import inflect
-from pyinflect import getInflection
-
 from src.annotated_recipe import AnnotatedRecipe
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
 from src.putty_lemmatizer import PuttyLemmatizer
+from src.shared_resources import get_inflect_engine
 
 
 class AnswerClass:
@@ -24,9 +22,8 @@ class QuestionAnswererLifespanHow(QuestionAnsweringBase):
     DESCRIPTION = "QuestionAnswerer for class LifespanHow"
 
     def __init__(self):
-        self.lemmatizer = PuttyLemmatizer()
-        self.inflect_engine = inflect.engine()
-        self.inflect_engine.classical()
+        self.lemmatizer = PuttyLemmatizer.get()
+        self.inflect_engine = get_inflect_engine(classical=True)
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
@@ -266,4 +263,6 @@ class QuestionAnswererLifespanHow(QuestionAnsweringBase):
                 if verb_token == k:
                     return [v]
         else:
+            from pyinflect import getInflection  # slow to import, only loaded when needed
+
             return getInflection(verb_token, 'VBG', inflect_oov=True)
@@ -3,18 +3,17 @@ from typing import Dict, Any, Tuple, List
 from src.annotated_recipe import AnnotatedRecipe, AnnotatedToken
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
-import inflect
 
 from src.putty_lemmatizer import PuttyLemmatizer
+from src.shared_resources import get_inflect_engine
 
 
 class QuestionAnswererLifespanWhat(QuestionAnsweringBase):
     DESCRIPTION = "QuestionAnswerer: What_is_in?"
 
     def __init__(self):
-        self.inflect_engine = inflect.engine()
-        self.inflect_engine.classical()
-        self.lemmatizer = PuttyLemmatizer()
+        self.inflect_engine = get_inflect_engine(classical=True)
+        self.lemmatizer = PuttyLemmatizer.get()
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
@@ -11,7 +11,7 @@ class QuestionAnswererLocationChange(QuestionAnsweringBase):
     DESCRIPTION = "QuestionAnswerer: Where was X before Y?"
 
     def __init__(self):
-        self.lemmatizer = PuttyLemmatizer()
+        self.lemmatizer = PuttyLemmatizer.get()
         self.outstream = io.StringIO()
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
@@ -12,7 +12,7 @@ class QuestionAnswererLocationCrl(QuestionAnsweringBase):
     DESCRIPTION = "QuestionAnswerer: Where should you?"
 
     def __init__(self):
-        self.lemmatizer = PuttyLemmatizer()
+        self.lemmatizer = PuttyLemmatizer.get()
         self.outstream = io.StringIO()
 
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
@@ -25,6 +25,14 @@ class QuestionAnswererMethod(QuestionAnsweringBase):
         self.goal_semantic_roles = goal_semantic_roles
         self.goal_answer_annotations = goal_answer_annotations
 
+        # built once rather than for every question
+        self.tool_answerer = QuestionAnswererMethodTool(tool_semantic_roles, tool_answer_annotations)
+        self.instrument_answerer = QuestionAnswererMethodInstrument(instrument_semantic_roles,
+                                                                    instrument_answer_annotations)
+        self.attribute_answerer = QuestionAnswererMethodAttribute(attribute_semantic_roles,
+                                                                  attribute_answer_annotations)
+        self.goal_answerer = QuestionAnswererMethodGoal(goal_semantic_roles, goal_answer_annotations)
+
     def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
                           more_info: Dict[str, Any] = {}) -> PredictedAnswer:
         """
@@ -43,40 +51,36 @@ class QuestionAnswererMethod(QuestionAnsweringBase):
         last = question.question.replace("?", "").split()[-1]
 
         if verb in ["use", "cool"]:
-            answer_goal, more_info_for_answer_goal = QuestionAnswererMethodGoal(
-                self.goal_semantic_roles, self.goal_answer_annotations).answer_method_goal_question(question)
+            answer_goal, more_info_for_answer_goal = self.goal_answerer.answer_method_goal_question(question)
             if answer_goal:
                 answers.append(answer_goal)
 
         elif verb in ["fry", "stir"] or last in ["minutes", "well", "gently"]:
-            answer_instrument, more_info_for_answer_instrument = QuestionAnswererMethodInstrument(
-                self.instrument_semantic_roles, self.instrument_answer_annotations).answer_class_method_instrument_question(question)
+            answer_instrument, more_info_for_answer_instrument = \
+                self.instrument_answerer.answer_class_method_instrument_question(question)
             if answer_instrument:
                 answers.append(answer_instrument)
 
         elif (verb in ["mix", "beat", "stir"] and last == "bowl") or last in ["mixture", "bowl"]:
-            answer_tool, more_info_for_answer_tool = QuestionAnswererMethodTool(
-                self.tool_semantic_roles, self.tool_answer_annotations).answer_method_tool_question(question)
+            answer_tool, more_info_for_answer_tool = self.tool_answerer.answer_method_tool_question(question)
             if answer_tool:
                 answers.append(answer_tool)
 
-        answer_attribute, more_info_for_answer_attribute = QuestionAnswererMethodAttribute(
-            self.attribute_semantic_roles, self.attribute_answer_annotations).answer_method_attribute_question(question)
+        answer_attribute, more_info_for_answer_attribute = \
+            self.attribute_answerer.answer_method_attribute_question(question)
         if answer_attribute:
             answers.append(answer_attribute)
 
-        answer_instrument, more_info_for_answer_instrument = QuestionAnswererMethodInstrument(
-            self.instrument_semantic_roles, self.instrument_answer_annotations).answer_class_method_instrument_question(question)
+        answer_instrument, more_info_for_answer_instrument = \
+            self.instrument_answerer.answer_class_method_instrument_question(question)
         if answer_instrument:
             answers.append(answer_instrument)
 
-        answer_goal, more_info_for_answer_goal = QuestionAnswererMethodGoal(
-            self.goal_semantic_roles, self.goal_answer_annotations).answer_method_goal_question(question)
+        answer_goal, more_info_for_answer_goal = self.goal_answerer.answer_method_goal_question(question)
         if answer_goal:
             answers.append(answer_goal)
 
-        answer_tool, more_info_for_answer_tool = QuestionAnswererMethodTool(
-            self.tool_semantic_roles, self.tool_answer_annotations).answer_method_tool_question(question)
+        answer_tool, more_info_for_answer_tool = self.tool_answerer.answer_method_tool_question(question)
         if answer_tool:
             answers.append(answer_tool)
 
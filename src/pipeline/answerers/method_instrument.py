@@ -2,8 +2,8 @@ from src.pipeline.interface_question_answering import QuestionAnswerRecipe
 from src.annotated_recipe import AnnotatedSentence
 from src.unpack_data import Recipe
 from typing import Dict, List, Tuple
-import inflect
 from src.utils_class_method import WordMistakesRepair
+from src.shared_resources import get_inflect_engine
 
 
 class QuestionAnswererMethodInstrument:
@@ -13,7 +13,7 @@ class QuestionAnswererMethodInstrument:
         self.semantic_roles = semantic_roles
         self.answer_annotations = answer_annotations
 
-        self.inflection = inflect.engine()
+        self.inflection = get_inflect_engine()
         self.mistakes = WordMistakesRepair()
 
     @staticmethod
@@ -28,29 +28,8 @@ class QuestionAnswererMethodInstrument:
         :return: a dictionary indexed by (sentence id, paragraph id, token index) with corresponding words
         """
 
-        words = {}
-        extra_idx = None
-        b_answer_found = False
-
-        for token_idx, token in enumerate(sentence.annotated_tokens):
-            value = token.raw_token.lower() if raw else token.normalized_token.lower()
-            semantic_role = token.semantic_roles[annotation_column]
-
-            if semantic_role is None:
-                continue
-
-            # First we look for f"B-{possible_answer}
-            if semantic_role == f"B-{possible_answer}":
-                b_answer_found = True
-                extra_idx = token.id
-                words[(sentence.sentence_id, sentence.paragraph_id, extra_idx)] = [value]
-
-            # If f"B-{possible_answer}" has been found, we append f"I-{possible_answer}"s if we find them
-            elif b_answer_found and semantic_role == f"I-{possible_answer}":
-                words[(sentence.sentence_id, sentence.paragraph_id, extra_idx)].append(value)
-
-        words = {key: " ".join(value) for key, value in words.items()}
-        return words
+        return {(sentence.sentence_id, sentence.paragraph_id, span.token.id): span.raw if raw else span.normalized
+                for span in sentence.srl_spans(annotation_column, possible_answer)}
 
     def words_from_paragraph(self, recipe: Recipe, paragraph: str, used_column: int,
                              searched_word: str, raw: bool) -> Dict[tuple, str]:
@@ -59,9 +38,8 @@ class QuestionAnswererMethodInstrument:
         """
 
         words_in_paragraph = {}
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.sentence_id == paragraph:
-                words_in_paragraph.update(self.concat_words(sentence, used_column, searched_word, raw))
+        for sentence in recipe.annotated_recipe.sentences_in([paragraph]):
+            words_in_paragraph.update(self.concat_words(sentence, used_column, searched_word, raw))
 
         return words_in_paragraph
 
@@ -73,13 +51,12 @@ class QuestionAnswererMethodInstrument:
         if not answer_annotations:
             answer_annotations = self.answer_annotations
 
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.sentence_id in steps:
-                for annotation in answer_annotations:
-                    answer_dict = self.concat_words(sentence, column, annotation, True)
-                    if answer_dict:
-                        answer = list(answer_dict.values())[0]
-                        return f"{verb} {v_object} {answer}"
+        for sentence in recipe.annotated_recipe.sentences_in(steps):
+            for annotation in answer_annotations:
+                answer_dict = self.concat_words(sentence, column, annotation, True)
+                if answer_dict:
+                    answer = list(answer_dict.values())[0]
+                    return f"{verb} {v_object} {answer}"
         return ""
 
     def semantic_iteration(self, verb: str, semantic_role_examples: Dict[tuple, str], used_column: int,
@@ -92,6 +69,7 @@ class QuestionAnswererMethodInstrument:
                 example_steps = [idx[0] for idx, example_value in semantic_role_examples.items() if
                                  example_value == example]
 
+                example_steps = set(example_steps)
                 intersection = [value for value in verb_steps if value in example_steps]
 
                 if intersection and intersection[0]:
@@ -107,11 +85,10 @@ class QuestionAnswererMethodInstrument:
         Get value from drop column for verb
         """
         relations = []
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.sentence_id in verb_steps:
-                for token in recipe.annotated_recipe.annotated_sentences[sentence_idx].annotated_tokens:
-                    if token.normalized_token.lower() in verb and token.relation1:
-                        relations.append(token.relation1)
+        for sentence in recipe.annotated_recipe.sentences_in(verb_steps):
+            for token in sentence.annotated_tokens:
+                if token.normalized_token.lower() in verb and token.relation1:
+                    relations.append(token.relation1)
         return relations
 
     def make_use_of_drop(self, drop_column: str) -> str:
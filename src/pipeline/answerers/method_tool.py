@@ -2,8 +2,8 @@ from src.pipeline.interface_question_answering import QuestionAnswerRecipe
 from src.unpack_data import Recipe
 from typing import Dict, List, Tuple
 from src.annotated_recipe import AnnotatedSentence
-import inflect
 from src.putty_lemmatizer import PuttyLemmatizer
+from src.shared_resources import get_inflect_engine
 
 
 class QuestionAnswererMethodTool:
@@ -13,8 +13,8 @@ class QuestionAnswererMethodTool:
         self.semantic_roles = semantic_roles
         self.answer_annotations = answer_annotations
 
-        self.inflection = inflect.engine()
-        self.lemmatizer = PuttyLemmatizer()
+        self.inflection = get_inflect_engine()
+        self.lemmatizer = PuttyLemmatizer.get()
 
     def concat_words(self, sentence: AnnotatedSentence, annotation_column: int,
                      possible_answer: str, raw: bool = False, verb: bool = False) -> Dict[tuple, str]:
@@ -29,31 +29,11 @@ class QuestionAnswererMethodTool:
         """
 
         words = {}
-        extra_idx = None
-        b_answer_found = False
-        b_where_is_my_verb = None
-
-        for token_idx, token in enumerate(sentence.annotated_tokens):
-            value = token.raw_token.lower() if raw else token.normalized_token.lower()
-            semantic_role = token.semantic_roles[annotation_column] if verb else token.role_in_recipe
-
-            if semantic_role is None:
-                continue
-
-            # First we look for f"B-{possible_answer}
-            if semantic_role == f"B-{possible_answer}":
-                b_answer_found = True
-                extra_idx = token.id
-                b_where_is_my_verb = token.where_is_my_verb_explicit
-                words[(sentence.sentence_id, sentence.paragraph_id, extra_idx, b_where_is_my_verb)] = [value]
-
-            # If f"B-{possible_answer}" has been found, we append f"I-{possible_answer}"s if we find them
-            elif b_answer_found and semantic_role == f"I-{possible_answer}":
-                if self.inflection.singular_noun(value):
-                    value = self.inflection.singular_noun(value)
-                words[(sentence.sentence_id, sentence.paragraph_id, extra_idx, b_where_is_my_verb)].append(value)
-
-        words = {key: " ".join(value) for key, value in words.items()}
+        for span in sentence.srl_spans(annotation_column if verb else None, possible_answer):
+            values = span.raw_words if raw else span.normalized_words
+            values = [values[0]] + [self.inflection.singular_noun(value) or value for value in values[1:]]
+            words[(sentence.sentence_id, sentence.paragraph_id, span.token.id,
+                   span.token.where_is_my_verb_explicit)] = " ".join(values)
         return words
 
     def words_from_paragraph(self, recipe: Recipe, paragraph: str, used_column: int,
@@ -63,11 +43,10 @@ class QuestionAnswererMethodTool:
         """
 
         words_in_paragraph = {}
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.paragraph_id == paragraph:
-                words_in_paragraph.update(self.concat_words(sentence, used_column, searched_word, raw, verb))
-                if verb:
-                    words_in_paragraph.update(self.concat_words(sentence, used_column, "EVENT", raw))
+        for sentence in recipe.annotated_recipe.sentences_by_paragraph.get(paragraph, []):
+            words_in_paragraph.update(self.concat_words(sentence, used_column, searched_word, raw, verb))
+            if verb:
+                words_in_paragraph.update(self.concat_words(sentence, used_column, "EVENT", raw))
         return words_in_paragraph
 
     def cut_rows_and_answer(self, verb, recipe: Recipe, steps: List[str], column: int,
@@ -78,20 +57,19 @@ class QuestionAnswererMethodTool:
         if not answer_annotations:
             answer_annotations = self.answer_annotations
 
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.sentence_id in steps:
-                for annotation in answer_annotations:
-                    answer_dict = self.concat_words(sentence, column, annotation, True, verb_search)
-                    if answer_dict and list(answer_dict.keys())[0][3] == verb_idx:
-                        answer = list(answer_dict.values())[0]
-                        return answer
+        for sentence in recipe.annotated_recipe.sentences_in(steps):
+            for annotation in answer_annotations:
+                answer_dict = self.concat_words(sentence, column, annotation, True, verb_search)
+                if answer_dict and list(answer_dict.keys())[0][3] == verb_idx:
+                    answer = list(answer_dict.values())[0]
+                    return answer
 
-                tool_column_values = self.search_relation1_column(recipe, verb, steps)
-                for tool_column_value in tool_column_values:
-                    if tool_column_value and ("Tool" in tool_column_value):
-                        tool_value = self.make_use_of_relation1("Tool", tool_column_value)
-                        if tool_value:
-                            return tool_value
+            tool_column_values = self.search_relation1_column(recipe, verb, steps)
+            for tool_column_value in tool_column_values:
+                if tool_column_value and ("Tool" in tool_column_value):
+                    tool_value = self.make_use_of_relation1("Tool", tool_column_value)
+                    if tool_value:
+                        return tool_value
 
         return ""
 
@@ -106,6 +84,7 @@ class QuestionAnswererMethodTool:
                 example_steps = [idx[0] for idx, example_value in semantic_role_examples.items() if
                                  example_value == example if idx[3] == verb_idx]
 
+                example_steps = set(example_steps)
                 intersection = [value for value in verb_steps if value in example_steps]
                 if intersection and intersection[0]:
                     answer = self.cut_rows_and_answer(verb, recipe, intersection, used_column,
@@ -121,11 +100,10 @@ class QuestionAnswererMethodTool:
         Get value from drop column for verb
         """
         relations = []
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-            if sentence.sentence_id in verb_steps:
-                for token in recipe.annotated_recipe.annotated_sentences[sentence_idx].annotated_tokens:
-                    if token.normalized_token.lower() in verb and token.relation1:
-                        relations.append(token.relation1)
+        for sentence in recipe.annotated_recipe.sentences_in(verb_steps):
+            for token in sentence.annotated_tokens:
+                if token.normalized_token.lower() in verb and token.relation1:
+                    relations.append(token.relation1)
         return relations
 
     def make_use_of_relation1(self, relation: str, relation_column: str) -> str:
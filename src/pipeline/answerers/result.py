@@ -1,9 +1,10 @@
-import nltk
 from typing import Dict, Any, List, Tuple
 
 from src.annotated_recipe import AnnotatedSentence
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.pipeline.question_category import QuestionCategory
+from src.pos_tagger import PosTagger
+from src.putty_lemmatizer import PuttyLemmatizer
 
 
 class QuestionAnswererResultV1(QuestionAnsweringBase):
@@ -45,21 +46,41 @@ class QuestionAnswererResultV1(QuestionAnsweringBase):
         """
         keywords = []
 
-        question_words = nltk.tokenize.word_tokenize(question)
-
-        verb_index = question_words.index("you") + 1
-        verb = question_words[verb_index].lower()
+        span_with_nouns = self.span_from_verb(question)
+        verb = span_with_nouns[0].lower()
 
         keywords.append(verb)
 
-        span_with_nouns = question_words[verb_index:]
-
-        for word, pos in nltk.pos_tag(span_with_nouns):
+        for word, pos in PosTagger.get().tag(span_with_nouns):
             if pos == "NN":
-                keywords.append(nltk.stem.WordNetLemmatizer().lemmatize(word, pos='v').lower())
+                keywords.append(PuttyLemmatizer.get().lemmatizer.lemmatize(word, pos='v').lower())
 
         return keywords
 
+    @staticmethod
+    def span_from_verb(question: str) -> List[str]:
+        """
+        :param question: the question string, "... do you <verb> ..."
+        :return: the question words starting from the verb
+        """
+        from nltk.tokenize import word_tokenize
+
+        question_words = word_tokenize(question)
+        verb_index = question_words.index("you") + 1
+        return question_words[verb_index:]
+
+    def warm_up(self, questions: List[QuestionAnswerRecipe]) -> None:
+        """
+        Tags the spans of all the questions in a single batched pass
+        """
+        spans = []
+        for question in questions:
+            try:
+                spans.append(self.span_from_verb(question.question))
+            except ValueError:
+                continue
+        PosTagger.get().tag_sents(spans)
+
     def find_sentences_with_until(self, sentences: List[AnnotatedSentence]) -> List[AnnotatedSentence]:
         """
         Filters sentences with "until" token and its synonyms
@@ -2,8 +2,8 @@ from src.annotated_recipe import AnnotatedSentence
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, QuestionAnswerRecipe, PredictedAnswer
 from src.unpack_data import Recipe
 from src.pipeline.question_category import QuestionCategory
+from src.shared_resources import get_inflect_engine
 from typing import Dict, List, Any, Optional
-import inflect
 
 
 class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
@@ -15,7 +15,7 @@ class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
         self.answer_annotations = answer_annotations
         self.reversed_paragraphs = reversed_paragraphs
 
-        self.inflection = inflect.engine()
+        self.inflection = get_inflect_engine()
 
     @staticmethod
     def concat_words(sentence: AnnotatedSentence, annotation_column: int,
@@ -40,34 +40,10 @@ class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
         :return: a dictionary indexed by (sentence id, paragraph id, token index) with corresponding words
         """
 
-        words_dict = {}
-        b_role_idx = None  # Index of the token having the f"B-{possible_answer}" semantic role
         sentence_id = sentence.sentence_id
         paragraph_id = sentence.paragraph_id
-        b_answer_found = False
-
-        for token_idx, token in enumerate(sentence.annotated_tokens):
-
-            # If raw take the raw token value, else normalized; then take lowercase
-            value = token.raw_token.lower() if raw else token.normalized_token.lower()
-            # Only look at semantic roles indexed with annotation_column
-            semantic_role = token.semantic_roles[annotation_column]
-
-            # First we look for f"B-{possible_answer}"
-            if semantic_role == f"B-{possible_answer}":
-                b_answer_found = True
-                b_role_idx = token_idx
-                words_dict[(sentence_id, paragraph_id, b_role_idx)] = [value]
-
-            # When subsequent f"I-{possible_answer}s are found, append the values to the dictionary entry,
-            # using the f"B-{possible_answer}" token index found previously
-            elif b_answer_found and semantic_role == f"I-{possible_answer}":
-                words_dict[(sentence_id, paragraph_id, b_role_idx)].append(value)
-
-        # Words having the same dictionary index are further concatenated and presented as string
-        words_dict = {key: " ".join(value) for key, value in words_dict.items()}
-
-        return words_dict
+        return {(sentence_id, paragraph_id, span.position): span.raw if raw else span.normalized
+                for span in sentence.srl_spans(annotation_column, possible_answer)}
 
     def words_from_paragraph(self, recipe: Recipe, paragraph: str, annotation_column: int,
                              searched_role: str, raw: bool) -> Dict[tuple, str]:
@@ -77,9 +53,8 @@ class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
         """
 
         words_in_paragraph = {}
-        for sentence in recipe.annotated_recipe.annotated_sentences:
-            if sentence.paragraph_id == paragraph:
-                words_in_paragraph.update(self.concat_words(sentence, annotation_column, searched_role, raw))
+        for sentence in recipe.annotated_recipe.sentences_by_paragraph.get(paragraph, []):
+            words_in_paragraph.update(self.concat_words(sentence, annotation_column, searched_role, raw))
 
         return words_in_paragraph
 
@@ -91,16 +66,12 @@ class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
         if not answer_annotations:
             answer_annotations = self.answer_annotations
 
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-
-            part_identifier = sentence.sentence_id if iter_type == "sentence" else sentence.paragraph_id
-
-            if part_identifier in steps:
-                for annotation in answer_annotations:
-                    answer_dict = self.concat_words(sentence, column, annotation, True)
-                    if answer_dict:
-                        answer = list(answer_dict.values())[0]
-                        return answer
+        for sentence in recipe.annotated_recipe.sentences_in(steps, by_paragraph=iter_type != "sentence"):
+            for annotation in answer_annotations:
+                answer_dict = self.concat_words(sentence, column, annotation, True)
+                if answer_dict:
+                    answer = list(answer_dict.values())[0]
+                    return answer
         return ""
 
     def semantic_iteration(self, semantic_role_examples: Dict[tuple, str], annotation_column: int,
@@ -118,6 +89,7 @@ class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
                     example_steps = [idx[1] for idx, example_value in semantic_role_examples.items() if
                                      example_value == example]
 
+                example_steps = set(example_steps)
                 intersection = [value for value in verb_steps if value in example_steps]
 
                 if intersection and intersection[0]:
@@ -132,13 +104,10 @@ class QuestionAnswererUniversalSrl(QuestionAnsweringBase):
         """
         Get value from drop column for verb
         """
-        for sentence_idx, sentence in enumerate(recipe.annotated_recipe.annotated_sentences):
-
-            part_identifier = sentence.sentence_id if iter_type == "sentence" else sentence.paragraph_id
-            if part_identifier in verb_steps:
-                for token in recipe.annotated_recipe.annotated_sentences[sentence_idx].annotated_tokens:
-                    if token.normalized_token == verb:
-                        return token.relation1
+        for sentence in recipe.annotated_recipe.sentences_in(verb_steps, by_paragraph=iter_type != "sentence"):
+            for token in sentence.annotated_tokens:
+                if token.normalized_token == verb:
+                    return token.relation1
         return ""
 
     def make_use_of_drop(self, drop_column: str) -> str:
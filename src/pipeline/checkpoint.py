@@ -0,0 +1,90 @@
+import json
+import os
+import timeit
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from src.pipeline.interface_question_answering import PredictedAnswer
+from src.unpack_data import QuestionAnswerRecipe
+
+
+def question_key(question: QuestionAnswerRecipe) -> Tuple[str, str]:
+    """
+    :return: (recipe id, question id)
+    """
+    return question.recipe.id, question.question_class
+
+
+class PredictionCheckpoint:
+    """
+    Append-only log of the answered questions (JSON lines), so that a crashed or killed prediction run can be resumed
+    without answering them again. The first line describes the run; a resumed run must match it.
+    The log is flushed every flush_interval seconds (and when closed): a crash loses at most that much work.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, run_description: Dict[str, Any], resume: bool = False,
+                 flush_interval: float = 5.0):
+        """
+        :param path: the log file
+        :param run_description: what identifies the run, e.g. {"which": "val", "with_postprocessing": False}
+        :param resume: True = load the answers of the log and append to it, False = start a new log
+        :param flush_interval: seconds between two flushes of the log
+        """
+        self.path = path
+        self.run_description = dict(run_description, checkpoint_version=PredictionCheckpoint.VERSION)
+        self.flush_interval = flush_interval
+        self.completed: Dict[Tuple[str, str], PredictedAnswer] = {}
+
+        if resume and os.path.isfile(path) and os.path.getsize(path) > 0:
+            self._load()
+            self._file: TextIO = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write(self.run_description)
+            self._file.flush()
+        self._last_flush = timeit.default_timer()
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            header = f.readline()
+            if json.loads(header) != self.run_description:
+                raise ValueError(f"Cannot resume from {self.path}: it was written by another run = {header.strip()}"
+                                 f", expecting {self.run_description}")
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # the last line written when the run was killed
+                self.completed[(record["recipe_id"], record["question_id"])] = PredictedAnswer(
+                    record["answer"], raw_question=record["question"], confidence=record["confidence"],
+                    more_info=record["more_info"])
+
+        # drop the truncated line (if any), the next records are appended after the complete ones
+        with open(self.path, "rb+") as f:
+            content = f.read()
+            if not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def get(self, question: QuestionAnswerRecipe) -> Optional[PredictedAnswer]:
+        """
+        :return: the answer recorded for the question or None
+        """
+        return self.completed.get(question_key(question))
+
+    def record(self, question: QuestionAnswerRecipe, answer: PredictedAnswer) -> None:
+        """
+        Appends the answer to the log, flushed periodically
+        """
+        recipe_id, question_id = question_key(question)
+        self._write({"recipe_id": recipe_id, "question_id": question_id, "question": answer.raw_question,
+                     "answer": answer.answer, "confidence": answer.confidence, "more_info": answer.more_info})
+        if timeit.default_timer() - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = timeit.default_timer()
+
+    def close(self) -> None:
+        self._file.close()
@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Tuple
 
 from src.get_root import get_root
+from src.pipeline.checkpoint import PredictionCheckpoint
 from src.pipeline.handlers import InterfaceHandler, HandlerSaveToJson
 from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher, PredictedAnswer
 from src.unpack_data import QuestionAnswerRecipe, convert_train_data, convert_val_data, convert_test_data, \
@@ -23,6 +24,10 @@ class EndToEndQuestionAnsweringPrediction:
         self.qa_handlers: List[InterfaceHandler] = []
         self.limit_recipes: int = None
         self.use_tqdm = False
+        self.checkpoint_path: str = None  # log of the answered questions, see PredictionCheckpoint
+        self.resume = False  # True = do not answer again the questions found in the checkpoint
+        self.shard_index = 0  # answer only the recipes of this shard (see unpack_data.recipe_shard) ...
+        self.num_shards = 1  # ... out of that many
         self.add_qa_handler(HandlerSaveToJson(self.output_json_filename))
 
     def add_qa_handler(self, a_handler) -> None:
@@ -42,16 +47,39 @@ class EndToEndQuestionAnsweringPrediction:
             "val": convert_val_data,
             "test": convert_test_data
         }
-        list_of_recipes = loaders[self.which_dataset](self.use_tqdm, limit_recipes=limit_recipes)
+        shard = (self.shard_index, self.num_shards) if self.num_shards > 1 else None
+        list_of_recipes = loaders[self.which_dataset](self.use_tqdm, limit_recipes=limit_recipes, shard=shard)
         return rewrite_to_list_of_questions(list_of_recepies=list_of_recipes)
 
     def run_prediction(self, more_info: Dict[str, Any] = {}) \
             -> Tuple[List[QuestionAnswerRecipe], List[PredictedAnswer]]:
         questions = self.load_dataset(self.limit_recipes)
-        predicted_answers = self.dispatching_engine.predict_answers(self.which_dataset, self.with_postprocessing,
-                                                                    questions, more_info)
+        if self.checkpoint_path:
+            predicted_answers = self._predict_with_checkpoint(questions, more_info)
+        else:
+            predicted_answers = self.dispatching_engine.predict_answers(self.which_dataset, self.with_postprocessing,
+                                                                        questions, more_info)
 
         for handler in self.qa_handlers:
             handler.handle_questions_answers(questions, predicted_answers, more_info)
 
         return questions, predicted_answers
+
+    def _predict_with_checkpoint(self, questions: List[QuestionAnswerRecipe],
+                                 more_info: Dict[str, Any]) -> List[PredictedAnswer]:
+        """
+        Answers the questions missing in the checkpoint (all of them unless resuming), recording every answer
+        :return: answers of all the questions, in their order
+        """
+        checkpoint = PredictionCheckpoint(self.checkpoint_path, {"which": self.which_dataset,
+                                                                 "with_postprocessing": self.with_postprocessing},
+                                          resume=self.resume)
+        try:
+            missing = [q for q in questions if checkpoint.get(q) is None]
+            if len(missing) < len(questions):
+                print(f"Resuming from {self.checkpoint_path}: {len(questions) - len(missing)} questions answered")
+            new_answers = iter(self.dispatching_engine.predict_answers(self.which_dataset, self.with_postprocessing,
+                                                                       missing, more_info, checkpoint.record))
+        finally:
+            checkpoint.close()
+        return [checkpoint.get(q) or next(new_answers) for q in questions]
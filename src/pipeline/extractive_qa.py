@@ -1,6 +1,9 @@
+import hashlib
 import json
 import os
-from typing import Dict, Any
+import timeit
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 
 from src.get_root import get_root
 from src.pipeline.interface_question_answering import QuestionAnsweringBase, PredictedAnswer
@@ -52,6 +55,10 @@ class ExtractiveQuestionAnswerer(QuestionAnsweringBase):
         more_info_for_answer = {"source": ExtractiveQuestionAnswerer.DESCRIPTION}
 
         qa_id = f"{question.recipe.id}-{question.question_class}"
+        if qa_id not in self.all_predictions:
+            # not a recipe of the precomputed set: no answer, refine_prediction() keeps the rule-based one
+            more_info_for_answer["details_for_excel"] = "No precomputed RC prediction"
+            return PredictedAnswer(answer=None, raw_question=question.question, more_info=more_info_for_answer)
         best_prediction = self.all_predictions[qa_id][0]
 
         return PredictedAnswer(
@@ -62,15 +69,175 @@ class ExtractiveQuestionAnswerer(QuestionAnsweringBase):
         )
 
 
+def prediction_key(question: QuestionAnswerRecipe) -> str:
+    """
+    :return: key of the online prediction of the question: hash of the recipe passage and of the question text,
+        so that a recipe sent again with the same id but another text is predicted again
+    """
+    return hashlib.sha1(f"{question.recipe.new_pars_str}\n{question.question}".encode("utf-8")).hexdigest()
+
+
+class OnlineExtractiveQuestionAnswerer(QuestionAnsweringBase):
+    DESCRIPTION = "Online Extractive QuestionAnswerer"
+
+    # Models loaded so far (the least recently used first), shared by all the answerers:
+    # (model_name_or_path, config_path) -> ReadingComprehension
+    _engines: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+    max_engines = 2
+
+    def __init__(self, model_name_or_path: str,
+                 config_path: str = "src/reading_comprehension/configs/predict_val_set_config.yml",
+                 include_ingredients: bool = True, which_dataset: str = "", predictions_path: Optional[str] = None,
+                 max_online_predictions: int = 10000):
+        """
+        Runs the Reading Comprehension model in-process, for the questions missing in the precomputed predictions.
+        :param model_name_or_path: fine-tuned model, loaded once per process
+        :param config_path: Reading Comprehension config (max_seq_length, n_best_size, dynamic_padding etc.)
+        :param include_ingredients: whether the model was trained with the ingredients in the context
+        :param which_dataset: train / val / test - use the precomputed data/model_predictions_{which}_set.json
+        :param predictions_path: precomputed predictions to use (if exist) before running the model
+        :param max_online_predictions: the n-best lists computed online are kept for that many recent questions
+        """
+        if max_online_predictions < 1:
+            raise ValueError(f"Incorrect number of online predictions = {max_online_predictions}, expecting at least 1")
+        if which_dataset:
+            predictions_path = f"data/model_predictions_{which_dataset}_set.json"
+
+        self.all_predictions = {}  # precomputed, by qa_id
+        if predictions_path and os.path.isfile(os.path.join(get_root(), predictions_path)):
+            with open(os.path.join(get_root(), predictions_path), "r") as f:
+                self.all_predictions = json.load(f)
+
+        self.model_name_or_path = model_name_or_path
+        self.config_path = config_path
+        self.include_ingredients = include_ingredients
+        self.max_online_predictions = max_online_predictions
+        self.online_predictions: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()  # by prediction_key()
+        self.batch_latencies: List[float] = []  # seconds spent in the model, per batch
+
+    def _get_engine(self):
+        engines = OnlineExtractiveQuestionAnswerer._engines
+        key = (self.model_name_or_path, self.config_path)
+        if key in engines:
+            engines.move_to_end(key)
+        else:
+            from src.reading_comprehension.extractive_qa_engine import ReadingComprehension  # torch is heavy
+
+            engines[key] = ReadingComprehension(
+                config_path=self.config_path, model_name_or_path=self.model_name_or_path,
+                include_ingredients=self.include_ingredients, load_datasets=False
+            )
+        while len(engines) > OnlineExtractiveQuestionAnswerer.max_engines:
+            engines.popitem(last=False)
+        return engines[key]
+
+    def _cached_prediction(self, question: QuestionAnswerRecipe) -> Optional[List[Dict[str, Any]]]:
+        """
+        :return: the precomputed n-best of the question if its recipe was read from a dataset file (the precomputed
+            predictions are only valid for the dataset texts), else the recent online one, None if not predicted yet
+        """
+        qa_id = f"{question.recipe.id}-{question.question_class}"
+        if question.recipe.position is not None and qa_id in self.all_predictions:
+            return self.all_predictions[qa_id]
+
+        key = prediction_key(question)
+        if key in self.online_predictions:
+            self.online_predictions.move_to_end(key)
+            return self.online_predictions[key]
+        return None
+
+    def _predict(self, questions: List[QuestionAnswerRecipe]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Runs the model on the questions as a single batch and stores the n-best predictions.
+        :return: the n-best predictions of the questions, by prediction_key()
+        """
+        from src.reading_comprehension.processors import SemEvalProcessor
+
+        engine = self._get_engine()
+        start_time = timeit.default_timer()
+        # by content: questions of different recipes having the same id may be batched together
+        unique_questions = {prediction_key(question): question for question in questions}
+        examples = SemEvalProcessor.create_examples_for_questions(
+            list(unique_questions.values()), self.include_ingredients, qas_ids=list(unique_questions)
+        )
+        nbest_per_key = engine.predict_examples(examples)
+
+        predictions = {key: [dict(prediction) for prediction in nbest_per_key[key]] for key in unique_questions}
+        for key, nbest in predictions.items():
+            self.online_predictions[key] = nbest
+            self.online_predictions.move_to_end(key)
+        while len(self.online_predictions) > self.max_online_predictions:
+            self.online_predictions.popitem(last=False)
+
+        self.batch_latencies.append(timeit.default_timer() - start_time)
+        return predictions
+
+    def warm_up(self, questions: List[QuestionAnswerRecipe]) -> None:
+        """
+        Runs the model once for all the questions missing in the precomputed and the recent online predictions
+        """
+        missing = [question for question in questions if self._cached_prediction(question) is None]
+        if missing:
+            self._predict(missing)
+
+    def answer_a_question(self, question: QuestionAnswerRecipe, question_category: QuestionCategory,
+                          more_info: Dict[str, Any] = {}) -> PredictedAnswer:
+        return self.batch_answer_questions([question], [question_category], more_info)[0]
+
+    def batch_answer_questions(self, questions: List[QuestionAnswerRecipe], categories: List[QuestionCategory],
+                               more_info: Dict[str, Any] = {}) -> List[PredictedAnswer]:
+        """
+        Answers from the precomputed predictions, the remaining questions go through the model in one batch.
+        :param questions: questions to be answered
+        :param categories: ignored, one per question
+        :param more_info: ignored
+        :return: answers; more_info["batch_latency"] holds the model time of the batch (seconds) if it was run
+        """
+        if len(questions) != len(categories):
+            raise ValueError(f"Mismatching questions vs categories = {len(questions)} vs {len(categories)}")
+
+        nbest_per_question = [self._cached_prediction(question) for question in questions]
+        batch_latency = None
+        missing = [question for question, nbest in zip(questions, nbest_per_question) if nbest is None]
+        if missing:
+            predictions = self._predict(missing)
+            batch_latency = self.batch_latencies[-1]
+            nbest_per_question = [nbest if nbest is not None else predictions[prediction_key(question)]
+                                  for question, nbest in zip(questions, nbest_per_question)]
+
+        answers = []
+        for question, nbest in zip(questions, nbest_per_question):
+            more_info_for_answer = {"source": OnlineExtractiveQuestionAnswerer.DESCRIPTION}
+            if batch_latency is not None:
+                more_info_for_answer["batch_latency"] = batch_latency
+            best_prediction = nbest[0]
+            answers.append(PredictedAnswer(
+                answer=best_prediction["text"],
+                raw_question=question.question,
+                confidence=best_prediction["probability"],
+                more_info=more_info_for_answer
+            ))
+        return answers
+
+
 class ExtractiveQuestionAnswererFactory:
 
     set_type = None
+    model_name_or_path = None
 
     @staticmethod
-    def set_default_engine(set_type: str) -> None:
+    def set_default_engine(set_type: str, model_name_or_path: Optional[str] = None) -> None:
+        """
+        :param set_type: train / val / test
+        :param model_name_or_path: if given, questions missing in the precomputed predictions are answered online
+        """
         assert set_type in ["train", "val", "test"]
         ExtractiveQuestionAnswererFactory.set_type = set_type
+        ExtractiveQuestionAnswererFactory.model_name_or_path = model_name_or_path
 
     @staticmethod
-    def get_extractive_answerer() -> ExtractiveQuestionAnswerer:
+    def get_extractive_answerer() -> QuestionAnsweringBase:
+        if ExtractiveQuestionAnswererFactory.model_name_or_path:
+            return OnlineExtractiveQuestionAnswerer(ExtractiveQuestionAnswererFactory.model_name_or_path,
+                                                    which_dataset=ExtractiveQuestionAnswererFactory.set_type)
         return ExtractiveQuestionAnswerer(ExtractiveQuestionAnswererFactory.set_type)
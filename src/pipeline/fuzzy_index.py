@@ -0,0 +1,48 @@
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+
+def _deletion_variants(word: str) -> Set[str]:
+    """
+    :return: the word itself and all the words obtained by deleting one of its characters
+    """
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class FuzzyKeyIndex:
+    """
+    Symmetric deletion index over the keys of an occurrences map (e.g. {"pan.1.3": 2}), matching the keys on their
+    part before the first "." Two words within edit distance 1 always share a deletion variant, so a lookup only
+    checks the few keys sharing a variant with the query instead of all of them.
+    """
+
+    def __init__(self, occurrences: Dict[str, int]):
+        """
+        :param occurrences: map key -> number of occurrences; it is not copied, do not modify it afterwards
+        """
+        self.occurrences = occurrences
+        self._positions = {key: position for position, key in enumerate(occurrences)}
+        self._keys_by_variant: Dict[str, List[str]] = defaultdict(list)
+        for key in occurrences:
+            for variant in _deletion_variants(key.split(".")[0]):
+                self._keys_by_variant[variant].append(key)
+
+    def find(self, word: str, max_distance: int = 1) -> List[Tuple[str, int]]:
+        """
+        Same as [(key, value) for key, value in occurrences.items() if edit_distance(key.split(".")[0], word) <= 1]
+        :param word: word to look for
+        :param max_distance: maximal edit distance, 0 or 1
+        :return: matching (key, number of occurrences), in the order of the map
+        """
+        if max_distance not in (0, 1):
+            raise ValueError(f"Unsupported max_distance = {max_distance}, expecting 0 or 1")
+
+        from nltk import edit_distance
+
+        candidates = set()
+        for variant in _deletion_variants(word):
+            candidates.update(self._keys_by_variant.get(variant, ()))
+
+        matching = [key for key in candidates if edit_distance(key.split(".")[0], word) <= max_distance]
+        matching.sort(key=self._positions.__getitem__)
+        return [(key, self.occurrences[key]) for key in matching]
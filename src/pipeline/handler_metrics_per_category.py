@@ -1,15 +1,37 @@
+import csv
 import os
 import pathlib
 import sys
-from typing import Any, Dict, List, TextIO
-
-import pandas
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, TextIO
 
 from src.get_root import get_root
 from src.pipeline.handler_metrics import HandlerF1, HandlerExactMatch
 from src.pipeline.handlers import InterfaceHandler, PredictedAnswer, QuestionAnswerRecipe
 from src.utils import _create_directory_if_not_exist
 
+OUTPUT_FORMATS = ("csv", "xlsx")
+
+
+def _write_table(rows: List[Dict[str, Any]], path_without_extension: str, output_formats: Sequence[str]) -> None:
+    """
+    Writes the rows as a table, once per output format (the extension is added to the path)
+    :param rows: table rows, all having the same keys
+    :param path_without_extension: output path
+    :param output_formats: "csv" (fast) and / or "xlsx"
+    """
+    if "csv" in output_formats:
+        with open(f"{path_without_extension}.csv", "w", newline="") as f:
+            if rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+                writer.writeheader()
+                writer.writerows(rows)
+
+    if "xlsx" in output_formats:
+        import pandas  # only needed for the Excel export
+
+        pandas.DataFrame(rows).to_excel(f"{path_without_extension}.xlsx", engine="openpyxl")
+
 
 class Result:
 
@@ -20,17 +42,28 @@ class Result:
 
 class HandlerMetricsPerCategory(InterfaceHandler):
 
-    def __init__(self, prefix_dir: str = None, outstream: TextIO = sys.stdout):
+    def __init__(self, prefix_dir: str = None, outstream: TextIO = sys.stdout,
+                 output_formats: Sequence[str] = ("xlsx",), num_workers: int = 1):
         """
         :param prefix_dir: prefix directory for output excels
         :param outstream: a stream for output log
+        :param output_formats: formats of the per category files and the summary: "csv" (fast) and / or "xlsx"
+        :param num_workers: number of processes writing the per category files
         """
+        for output_format in output_formats:
+            if output_format not in OUTPUT_FORMATS:
+                raise ValueError(f"Unsupported output format = {output_format}, expected one of {OUTPUT_FORMATS}")
+
         self.results_by_category: Dict[str, List[Result]] = {}
         self.prefix_dir = prefix_dir if prefix_dir else os.path.join(get_root(), "results", "per_category")
         self.na_statistics_path = f'{self.prefix_dir}/results/na_summary.csv'
         _create_directory_if_not_exist(self.na_statistics_path)
         self.outstream = outstream
         self.metrics_per_category: List[Dict[str, Any]] = []
+        self.output_formats = tuple(output_formats)
+        self.num_workers = num_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending_writes = []
 
     def _reset(self):
         self.results_by_category = {}
@@ -46,14 +79,32 @@ class HandlerMetricsPerCategory(InterfaceHandler):
         """
         self._group_by_category(questions, answers, more_info)
 
-        file = open(self.na_statistics_path, 'w')
-        for category in sorted(self.results_by_category.keys()):
-            self.handle_category(category)
-            self.handle_na_category(category, file)
-        file.close()
-
-        df = pandas.DataFrame(self.metrics_per_category)
-        df.to_excel(os.path.join(self.prefix_dir, "summary.xlsx"), engine="openpyxl")
+        if self.num_workers > 1:
+            self._executor = ProcessPoolExecutor(self.num_workers)
+        try:
+            with open(self.na_statistics_path, 'w') as file:
+                for category in sorted(self.results_by_category.keys()):
+                    results = self._get_results(category)
+                    self.handle_category(category, results)
+                    self.handle_na_category(category, file, results)
+
+            for pending_write in self._pending_writes:
+                pending_write.result()  # re-raises errors of the workers
+        finally:
+            self._pending_writes = []
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+
+        _write_table(self.metrics_per_category, os.path.join(self.prefix_dir, "summary"), self.output_formats)
+
+    def _write_table(self, rows: List[Dict[str, Any]], path_without_extension: str) -> None:
+        if self._executor:
+            self._pending_writes.append(
+                self._executor.submit(_write_table, rows, path_without_extension, self.output_formats)
+            )
+        else:
+            _write_table(rows, path_without_extension, self.output_formats)
 
     def _group_by_category(self, questions: List[QuestionAnswerRecipe], answers: List[PredictedAnswer],
                            more_info: Dict[str, Any]):
@@ -82,9 +133,13 @@ class HandlerMetricsPerCategory(InterfaceHandler):
         except Exception:
             return -1
 
-    def handle_category(self, category_name: str):
-
-        results = self._get_results(category_name)
+    def handle_category(self, category_name: str, results: List[Dict[str, Any]] = None):
+        """
+        :param category_name: category to be summarized
+        :param results: rows of the category (from _get_results) if already computed
+        """
+        if results is None:
+            results = self._get_results(category_name)
         results.sort(key=HandlerMetricsPerCategory.comparator_f1)
         sum_f1 = sum([x["F1"] if x["F1"] else 0.0 for x in results])
         sum_em = sum([x["Exact Match"] if x["Exact Match"] else 0.0 for x in results])
@@ -102,13 +157,18 @@ class HandlerMetricsPerCategory(InterfaceHandler):
             }
         )
 
-        as_df = pandas.DataFrame(results)
         pathlib.Path(self.prefix_dir).mkdir(parents=True, exist_ok=True)
-        as_df.to_excel(os.path.join(self.prefix_dir, f"results_category_{category_name}.xlsx"), engine="openpyxl")
+        self._write_table(results, os.path.join(self.prefix_dir, f"results_category_{category_name}"))
         return results
 
-    def handle_na_category(self, category_name: str, file: TextIO) -> None:
-        results = self._get_results(category_name)
+    def handle_na_category(self, category_name: str, file: TextIO, results: List[Dict[str, Any]] = None) -> None:
+        """
+        :param category_name: category to be summarized
+        :param file: output for the N/A statistics
+        :param results: rows of the category (from _get_results) if already computed
+        """
+        if results is None:
+            results = self._get_results(category_name)
         all_na_correct_answer = sum(1 for x in results if x['Actual Answer'] == 'N/A')
         pred_and_correct_na = sum(1 for x in results if x['Actual Answer'] == 'N/A' and x['Predicted Answer'] == None)
         pred_not_na_correct_na = sum(
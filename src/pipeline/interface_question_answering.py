@@ -51,6 +51,14 @@ class InterfaceQuestionAnswering(abc.ABC):
         """
         raise NotImplementedError("I must be implemented in a derived class")
 
+    def warm_up(self, questions: List[QuestionAnswerRecipe]) -> None:
+        """
+        Called with all the questions routed to the engine before answering them; can be overridden in a derived
+        class to prepare them in batch (e.g. POS tagging). Does nothing by default.
+        :param questions: questions which will be answered
+        """
+        pass
+
     @abc.abstractmethod
     def batch_answer_questions(self, questions: List[QuestionAnswerRecipe], categories: List[QuestionCategory],
                                more_info: Dict[str, Any] = {}) -> List[PredictedAnswer]:  # pragma: nocover
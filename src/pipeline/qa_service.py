@@ -0,0 +1,365 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src.pipeline.interface_question_answering import PredictedAnswer
+from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.pipeline.question_category import QuestionCategoryClassifier, GetCategoryFromQuestionStructure
+from src.unpack_data import Q_A, QuestionAnswerRecipe, Recipe
+
+
+def recipe_key(recipe_text: str) -> str:
+    """
+    :return: key of the recipe in the caches: hash of its text
+    """
+    return hashlib.sha1(recipe_text.encode("utf-8")).hexdigest()
+
+
+class RecipeCache:
+    """
+    Bounded LRU of the parsed recipes, keyed by recipe_key(); the follow-up questions on a recipe skip parsing
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 1:
+            raise ValueError(f"Incorrect cache size = {max_size}, expecting at least 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._recipes: "OrderedDict[str, Recipe]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def get(self, key: str, recipe_text: str) -> Recipe:
+        """
+        :param key: recipe_key(recipe_text)
+        :param recipe_text: the recipe in the dataset format, parsed if not in the cache
+        :return: the parsed recipe
+        """
+        recipe = self._recipes.get(key)
+        if recipe is not None:
+            self.hits += 1
+            self._recipes.move_to_end(key)
+            return recipe
+
+        self.misses += 1
+        recipe = Recipe(recipe_text.splitlines(keepends=True))
+        self._recipes[key] = recipe
+        if len(self._recipes) > self.max_size:
+            self._recipes.popitem(last=False)
+        return recipe
+
+
+def question_lines(recipe_text: str, questions: Optional[List[Dict[str, str]]] = None) -> List[str]:
+    """
+    :param recipe_text: the recipe in the dataset format
+    :param questions: [{"id": "0-1", "question": "How many ...?"}, ...]; None = the questions of the recipe
+    :return: the questions in the dataset format ("# question 0-1 = How many ...?")
+    """
+    if questions is None:
+        return [line.strip() for line in recipe_text.splitlines() if line.startswith("# question ")]
+
+    if not isinstance(questions, list) or not all(isinstance(question, dict) for question in questions):
+        raise ValueError(f"Incorrect questions = {questions}, expecting a list of {{\"id\": ..., \"question\": ...}}")
+
+    lines = []
+    for question in questions:
+        question_id, text = str(question.get("id", "")), question.get("question")
+        if "-" not in question_id or not text:
+            raise ValueError(f"Incorrect question = {question}, expecting an id like '0-1' and a question")
+        lines.append(f"# question {question_id} = {text}")
+    return lines
+
+
+def answer_to_dict(question: QuestionAnswerRecipe, answer: PredictedAnswer) -> Dict[str, Any]:
+    return {
+        "recipe_id": question.recipe.id,
+        "question_id": question.question_class,
+        "question": question.question,
+        "answer": answer.answer if answer.has_answer() else None,
+        "confidence": answer.confidence,
+        "more_info": answer.more_info,
+    }
+
+
+def answer_questions(dispatcher: QuestionAnsweringDispatcher,
+                     questions: List[QuestionAnswerRecipe]) -> List[Dict[str, Any]]:
+    """
+    Answers the questions one by one, after warming up the engines with all of them
+    :return: answer_to_dict() per question or {"error": message, ...} if it failed
+    """
+    categories = [dispatcher.question_category_classifier.predict_category(q) for q in questions]
+    try:
+        dispatcher.warm_up_engines(questions, categories)
+    except Exception:
+        pass  # only an optimization: the questions are answered (or fail) one by one below
+
+    results = []
+    for question, category in zip(questions, categories):
+        try:
+            results.append(answer_to_dict(question, dispatcher.predict_answer(question, category=category)))
+        except Exception as e:
+            results.append({"recipe_id": question.recipe.id, "question_id": question.question_class,
+                            "error": f"Cannot answer: {e!r}"})
+    return results
+
+
+def answer_batch(dispatcher: QuestionAnsweringDispatcher, recipes: RecipeCache,
+                 batch: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """
+    Answers a batch of questions (usually of the same category), the engines are warmed up with the whole batch
+    :param dispatcher: answering engine
+    :param recipes: cache of the parsed recipes
+    :param batch: (recipe key, recipe text, question line) per question
+    :return: answer_to_dict() per question or {"error": message} if it failed
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+    questions, positions = [], []
+    for position, (key, recipe_text, line) in enumerate(batch):
+        try:
+            questions.append(QuestionAnswerRecipe(Q_A(line), recipes.get(key, recipe_text)))
+            positions.append(position)
+        except Exception as e:
+            results[position] = {"error": f"Cannot parse the recipe or the question: {e!r}"}
+
+    for position, result in zip(positions, answer_questions(dispatcher, questions)):
+        results[position] = result
+    return results
+
+
+# state of a worker process of QuestionAnsweringService
+_worker_dispatcher: Optional[QuestionAnsweringDispatcher] = None
+_worker_recipes: Optional[RecipeCache] = None
+
+
+def _init_worker(dispatcher_factory: Callable[[], QuestionAnsweringDispatcher], cache_size: int) -> None:
+    global _worker_dispatcher, _worker_recipes
+    _worker_dispatcher = dispatcher_factory()
+    _worker_recipes = RecipeCache(cache_size)
+
+
+def _answer_batch_in_worker(batch: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    return answer_batch(_worker_dispatcher, _worker_recipes, batch)
+
+
+class _PendingQuestion(NamedTuple):
+    key: str
+    recipe_text: str
+    line: str
+    future: asyncio.Future
+
+
+class QuestionAnsweringService:
+    """
+    Answers questions on recipes sent by concurrent clients. The questions waiting at the same time are coalesced
+    into micro-batches per category (and per worker), answered in the background by the dispatcher: in a thread of
+    this process (num_workers = 0) or in worker processes, each with its own dispatcher. All the questions on a recipe
+    go to the same worker, whose LRU cache keeps the parsed recipe for the follow-up questions.
+    """
+
+    def __init__(self, dispatcher_factory: Callable[[], QuestionAnsweringDispatcher] = QuestionAnsweringDispatcher,
+                 num_workers: int = 0, cache_size: int = 128, max_batch_size: int = 32, max_wait: float = 0.005,
+                 question_classifier: QuestionCategoryClassifier = GetCategoryFromQuestionStructure()):
+        """
+        :param dispatcher_factory: builds the answering engine; must be picklable (e.g. a function) if num_workers > 0
+        :param num_workers: number of worker processes, 0 = answer in a thread of this process
+        :param cache_size: number of parsed recipes kept (per worker)
+        :param max_batch_size: a batch is answered as soon as it has that many questions
+        :param max_wait: ... or after that many seconds since its first question arrived
+        :param question_classifier: groups the questions into batches
+        """
+        if num_workers < 0:
+            raise ValueError(f"Incorrect number of workers = {num_workers}")
+        if max_batch_size < 1:
+            raise ValueError(f"Incorrect batch size = {max_batch_size}, expecting at least 1")
+
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.question_classifier = question_classifier
+        self.batches_answered = 0
+
+        if num_workers == 0:
+            self.recipes = RecipeCache(cache_size)
+            self._executors: List[Executor] = [ThreadPoolExecutor(1)]
+            self._answer_batch = partial(answer_batch, dispatcher_factory(), self.recipes)
+        else:
+            self.recipes = None
+            self._executors = [ProcessPoolExecutor(1, initializer=_init_worker,
+                                                   initargs=(dispatcher_factory, cache_size))
+                               for _ in range(num_workers)]
+            self._answer_batch = _answer_batch_in_worker
+
+        self._pending: Dict[Tuple[int, str], List[_PendingQuestion]] = defaultdict(list)
+        self._timers: Dict[Tuple[int, str], asyncio.TimerHandle] = {}
+
+    async def answer(self, recipe_text: str, questions: Optional[List[Dict[str, str]]] = None) \
+            -> List[Dict[str, Any]]:
+        """
+        :param recipe_text: the recipe in the dataset format (starting with "# newdoc id = ...")
+        :param questions: [{"id": "0-1", "question": "How many ...?"}, ...]; None = the questions of the recipe
+        :return: answer_to_dict() per question, in the order of the questions
+        """
+        if not recipe_text.startswith("# newdoc id = "):
+            raise ValueError("Incorrect recipe: expecting the dataset format, starting with '# newdoc id = '")
+
+        loop = asyncio.get_running_loop()
+        key = recipe_key(recipe_text)
+        worker = int(key, 16) % len(self._executors)
+        futures = []
+        for line in question_lines(recipe_text, questions):
+            pending = _PendingQuestion(key, recipe_text, line, loop.create_future())
+            category = self.question_classifier.predict_category(QuestionAnswerRecipe(Q_A(line), None))
+            self._enqueue((worker, category.category), pending)
+            futures.append(pending.future)
+        return list(await asyncio.gather(*futures))
+
+    def _enqueue(self, batch_id: Tuple[int, str], pending: _PendingQuestion) -> None:
+        batch = self._pending[batch_id]
+        batch.append(pending)
+        if len(batch) >= self.max_batch_size:
+            self._flush(batch_id)
+        elif len(batch) == 1:
+            self._timers[batch_id] = asyncio.get_running_loop().call_later(self.max_wait, self._flush, batch_id)
+
+    def _flush(self, batch_id: Tuple[int, str]) -> None:
+        timer = self._timers.pop(batch_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(batch_id, [])
+        if not batch:
+            return
+
+        self.batches_answered += 1
+        executor = self._executors[batch_id[0]]
+        answered = asyncio.get_running_loop().run_in_executor(
+            executor, self._answer_batch, [(p.key, p.recipe_text, p.line) for p in batch])
+
+        def distribute(done: asyncio.Future) -> None:
+            for i, pending in enumerate(batch):
+                if pending.future.done():  # cancelled by the client
+                    continue
+                if done.exception() is not None:
+                    pending.future.set_exception(done.exception())
+                else:
+                    pending.future.set_result(done.result()[i])
+
+        answered.add_done_callback(distribute)
+
+    def close(self) -> None:
+        for executor in self._executors:
+            executor.shutdown()
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class QuestionAnsweringHttpServer:
+    """
+    Minimal HTTP/1.1 JSON front of QuestionAnsweringService:
+
+    * POST /predict {"recipe": "# newdoc id = ...", "questions": [{"id": "0-1", "question": "..."}]}
+      ("questions" is optional, defaults to the questions of the recipe) -> {"answers": [...]}
+    * GET /health -> {"status": "ok", ...}
+    """
+
+    MAX_BODY_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, service: QuestionAnsweringService, host: str = "127.0.0.1", port: int = 8080):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """
+        Starts listening; with port = 0 a free port is chosen and stored in self.port
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                    if length > self.MAX_BODY_SIZE:
+                        keep_alive = False
+                        raise _HttpError(413, f"Body larger than {self.MAX_BODY_SIZE} bytes")
+                    body = await reader.readexactly(length) if length else b""
+                    status, response = 200, await self._route(method, path, body)
+                except _HttpError as e:
+                    status, response = e.status, {"error": str(e)}
+                except ValueError as e:
+                    status, response = 400, {"error": str(e)}
+
+                payload = json.dumps(response, ensure_ascii=False, default=str).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                             + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        if path == "/health":
+            if method != "GET":
+                raise _HttpError(405, f"{method} {path}: expecting GET")
+            recipes = self.service.recipes
+            return {"status": "ok", "batches_answered": self.service.batches_answered,
+                    "recipes_cached": len(recipes) if recipes is not None else None}
+
+        if path == "/predict":
+            if method != "POST":
+                raise _HttpError(405, f"{method} {path}: expecting POST")
+            request = json.loads(body.decode("utf-8"))
+            if not isinstance(request, dict) or not isinstance(request.get("recipe"), str):
+                raise ValueError('Incorrect request, expecting {"recipe": "...", "questions": [...]}')
+            try:
+                answers = await self.service.answer(request["recipe"], request.get("questions"))
+            except ValueError:
+                raise
+            except Exception as e:
+                raise _HttpError(500, f"Cannot answer: {e!r}")
+            return {"answers": answers}
+
+        raise _HttpError(404, f"Unknown path = {path}")
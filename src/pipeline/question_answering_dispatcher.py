@@ -1,6 +1,5 @@
-from typing import Any, Dict, List
-
-import tqdm
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
 
 from src.pipeline.answerers.bert_NA_answer import BertAnswerNA
 from src.pipeline.deterministic_qa_engine import QuestionAnswererNA
@@ -29,14 +28,16 @@ class QuestionAnsweringDispatcher:
         }
 
     def predict_answer(self, question: QuestionAnswerRecipe, more_info: Dict[str, Any] = {},
-                       bert_answer_na: BertAnswerNA = None) -> PredictedAnswer:
+                       bert_answer_na: BertAnswerNA = None, category: QuestionCategory = None) -> PredictedAnswer:
         """
         :param bert_answer_na: added if postprocessing with bert NA checker
         :param question: question to be answered
         :param more_info: Additional info to be handled (currently ignored)
+        :param category: category of the question if already predicted
         :return:
         """
-        category = self.question_category_classifier.predict_category(question)
+        if category is None:
+            category = self.question_category_classifier.predict_category(question)
         assert isinstance(category, QuestionCategory)
 
         engine = self.dispatching_table[category.category]
@@ -57,12 +58,40 @@ class QuestionAnsweringDispatcher:
         ret.more_info["answering_engine"] = engine.__class__.__name__
         return ret
 
+    def warm_up_engines(self, questions: List[QuestionAnswerRecipe], categories: List[QuestionCategory]) -> None:
+        """
+        Gives every engine all its questions at once before dispatching them (see InterfaceQuestionAnswering.warm_up)
+        """
+        questions_per_category = defaultdict(list)
+        for question, category in zip(questions, categories):
+            if isinstance(category, QuestionCategory) and category.category in self.dispatching_table:
+                questions_per_category[category.category].append(question)
+
+        for category, category_questions in questions_per_category.items():
+            self.dispatching_table[category].warm_up(category_questions)
+        if "RC" in self.dispatching_table:
+            self.dispatching_table["RC"].warm_up(questions)
+
     def predict_answers(self, which_dataset: str, with_postprocessing: bool, questions: List[QuestionAnswerRecipe],
-                        more_info: Dict[str, Any] = {}) -> List[PredictedAnswer]:
+                        more_info: Dict[str, Any] = {},
+                        on_answer: Callable[[QuestionAnswerRecipe, PredictedAnswer], None] = None) \
+            -> List[PredictedAnswer]:
+        """
+        :param on_answer: Optional: called with every question as soon as it is answered (e.g. for checkpoints)
+        """
         use_tqdm = more_info.get("use_tqdm", False)
-        iterator = tqdm.tqdm(questions, desc="answering") if use_tqdm else questions
-        if with_postprocessing:
-            bert_na_answer = BertAnswerNA(which_dataset)
-            return [self.predict_answer(q, more_info, bert_na_answer) for q in iterator]
+        categories = [self.question_category_classifier.predict_category(q) for q in questions]
+        self.warm_up_engines(questions, categories)
 
-        return [self.predict_answer(q, more_info) for q in iterator]
+        if use_tqdm:
+            from tqdm import tqdm
+            iterator = tqdm(questions, desc="answering")
+        else:
+            iterator = questions
+        bert_na_answer = BertAnswerNA(which_dataset) if with_postprocessing else None
+        answers = []
+        for q, category in zip(iterator, categories):
+            answers.append(self.predict_answer(q, more_info, bert_na_answer, category))
+            if on_answer is not None:
+                on_answer(q, answers[-1])
+        return answers
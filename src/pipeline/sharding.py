@@ -0,0 +1,111 @@
+import json
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from src.pipeline.handler_metrics import HandlerF1, HandlerExactMatch
+from src.pipeline.handlers import InterfaceHandler, PredictedAnswer, QuestionAnswerRecipe
+
+
+class HandlerMetricPartials(InterfaceHandler):
+    """
+    Stores what merge_metric_partials() needs to compute the metrics of several shards as if they were a single run:
+    the F1 / exact match and the category of every question, with its position in the dataset
+    """
+
+    def __init__(self, filename: str, shard_index: int = 0, num_shards: int = 1):
+        self.filename = filename
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+
+    def handle_questions_answers(self, questions: List[QuestionAnswerRecipe], answers: List[PredictedAnswer],
+                                 more_info: Dict[str, Any] = {}):
+        if len(questions) != len(answers):
+            raise ValueError(f"Mismatching questions vs answers = {len(questions)} vs {len(answers)}")
+
+        rows = []
+        question_index, previous_recipe = 0, None
+        for question, answer in zip(questions, answers):
+            question_index = question_index + 1 if question.recipe is previous_recipe else 0
+            previous_recipe = question.recipe
+
+            prediction = answer.answer if answer.has_answer() else ""
+            truth = question.answer if question.answer != "N/A" else ""
+            f1 = HandlerF1.compute_f1(prediction, truth) if question.answer is not None else None
+            em = HandlerExactMatch.compute_exact_match(prediction, truth) if question.answer is not None else None
+            rows.append([question.recipe.position, question.recipe.id, question_index, question.question_class,
+                         answer.more_info.get("predicted_category", "n/a"), f1, em])
+
+        with open(self.filename, "w", encoding="utf-8") as f:
+            json.dump({"shard_index": self.shard_index, "num_shards": self.num_shards, "questions": rows}, f)
+
+
+def _check_shards(partials: List[Dict[str, Any]]) -> None:
+    num_shards = {partial["num_shards"] for partial in partials}
+    shard_indices = sorted(partial["shard_index"] for partial in partials)
+    if len(num_shards) != 1 or shard_indices != list(range(num_shards.pop())):
+        raise ValueError(f"Expecting every shard exactly once, got shards {shard_indices} of {num_shards}")
+
+
+def recipe_order(partials: List[Dict[str, Any]]) -> List[str]:
+    """
+    :return: ids of the recipes of all the shards, in the order of the dataset
+    """
+    positions = {row[1]: row[0] for partial in partials for row in partial["questions"]}
+    return sorted(positions, key=positions.__getitem__)
+
+
+def merge_predictions(predictions: List[Dict[str, Dict[str, Optional[str]]]],
+                      order: List[str] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    :param predictions: contents of the prediction files of the shards (recipe id -> question id -> answer)
+    :param order: recipe ids in the order of the dataset (see recipe_order), default: in the order of the shards
+    :return: the predictions of all the shards, the same as written by a single run if the order is given
+    """
+    merged = {}
+    for shard_predictions in predictions:
+        for recipe_id, answers in shard_predictions.items():
+            if recipe_id in merged:
+                raise ValueError(f"Recipe {recipe_id} found in several shards")
+            merged[recipe_id] = answers
+
+    if order is None:
+        return merged
+    if set(order) != set(merged):
+        raise ValueError("The order does not match the predicted recipes")
+    return {recipe_id: merged[recipe_id] for recipe_id in order}
+
+
+def merge_metric_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Computes the metrics the same way (and in the same order, up to the last bit) as HandlerF1, HandlerExactMatch and
+    HandlerMetricsPerCategory do in a single run
+    :param partials: contents of the HandlerMetricPartials files of all the shards
+    :return: {"F1": ..., "Exact match": ..., "per_category": [{"Category", "Count", "F1", "Exact match"}, ...]}
+    """
+    _check_shards(partials)
+    rows = sorted((row for partial in partials for row in partial["questions"]), key=lambda row: (row[0], row[2]))
+
+    sum_f1, sum_em, count = 0.0, 0.0, 0
+    rows_by_category = defaultdict(list)
+    for _, _, _, _, category, f1, em in rows:
+        if f1 is not None:
+            sum_f1 += f1
+            sum_em += em
+            count += 1
+        rows_by_category[category].append((f1, em))
+
+    per_category = []
+    for category in sorted(rows_by_category):
+        category_rows = sorted(rows_by_category[category], key=lambda row: row[0] if row[0] is not None else -1)
+        category_sum_f1 = sum([f1 if f1 else 0.0 for f1, _ in category_rows])
+        category_sum_em = sum([em if em else 0.0 for _, em in category_rows])
+        category_count = len([f1 for f1, _ in category_rows if f1 is not None])
+        per_category.append({
+            "Category": category,
+            "Count": len(category_rows),
+            "F1": category_sum_f1 / category_count if category_count else None,
+            "Exact match": category_sum_em / category_count if category_count else None
+        })
+
+    return {"F1": sum_f1 / count if count else "N/A", "Exact match": sum_em / count if count else "N/A",
+            "per_category": per_category}
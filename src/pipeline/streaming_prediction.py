@@ -0,0 +1,86 @@
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+from src.pipeline.qa_service import answer_questions
+from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.unpack_data import Recipe, iter_raw_recipes, rewrite_to_list_of_questions
+
+
+def answer_recipe(dispatcher: QuestionAnsweringDispatcher, recipe_raw: List[str]) -> List[Dict[str, Any]]:
+    """
+    :param dispatcher: answering engine
+    :param recipe_raw: lines of a recipe in the dataset format (see iter_raw_recipes)
+    :return: answer_questions() of the recipe or [{"error": message, ...}] if the recipe cannot be parsed
+    """
+    try:
+        questions = rewrite_to_list_of_questions([Recipe(recipe_raw)])
+    except Exception as e:
+        return [{"recipe_header": recipe_raw[0].strip() if recipe_raw else "",
+                 "error": f"Cannot parse the recipe: {e!r}"}]
+
+    return answer_questions(dispatcher, questions)
+
+
+# dispatcher of a worker process of stream_predictions
+_worker_dispatcher: Optional[QuestionAnsweringDispatcher] = None
+
+
+def _init_worker(dispatcher_factory: Callable[[], QuestionAnsweringDispatcher]) -> None:
+    global _worker_dispatcher
+    _worker_dispatcher = dispatcher_factory()
+
+
+def _answer_recipe_in_worker(recipe_raw: List[str]) -> List[Dict[str, Any]]:
+    return answer_recipe(_worker_dispatcher, recipe_raw)
+
+
+def write_answers(answers: List[Dict[str, Any]], output: TextIO) -> None:
+    for answer in answers:
+        output.write(json.dumps(answer, ensure_ascii=False, default=str) + "\n")
+    output.flush()
+
+
+def stream_predictions(lines: Iterable[str], output: TextIO,
+                       dispatcher_factory: Callable[[], QuestionAnsweringDispatcher] = QuestionAnsweringDispatcher,
+                       num_workers: int = 0, max_pending_recipes: int = None) -> int:
+    """
+    Answers the questions of the recipes read from lines, writing one JSON line per question as soon as its recipe
+    is answered, in the input order. Only the recipes being answered are kept in memory.
+    :param lines: dataset in the recipe format (e.g. an open file or sys.stdin)
+    :param output: where the JSON lines go (flushed after every recipe)
+    :param dispatcher_factory: builds the answering engine; must be picklable (e.g. a function) if num_workers > 0
+    :param num_workers: number of worker processes, 0 = answer in this process
+    :param max_pending_recipes: recipes sent to the workers and not written yet (default: 4 per worker)
+    :return: number of lines written
+    """
+    if num_workers < 0:
+        raise ValueError(f"Incorrect number of workers = {num_workers}")
+
+    written = 0
+    if num_workers == 0:
+        dispatcher = dispatcher_factory()
+        for recipe_raw in iter_raw_recipes(lines):
+            answers = answer_recipe(dispatcher, recipe_raw)
+            write_answers(answers, output)
+            written += len(answers)
+        return written
+
+    max_pending_recipes = max_pending_recipes if max_pending_recipes else 4 * num_workers
+    if max_pending_recipes < 1:
+        raise ValueError(f"Incorrect number of pending recipes = {max_pending_recipes}")
+
+    with ProcessPoolExecutor(num_workers, initializer=_init_worker, initargs=(dispatcher_factory,)) as executor:
+        pending = deque()
+        for recipe_raw in iter_raw_recipes(lines):
+            pending.append(executor.submit(_answer_recipe_in_worker, recipe_raw))
+            if len(pending) >= max_pending_recipes:
+                answers = pending.popleft().result()
+                write_answers(answers, output)
+                written += len(answers)
+        while pending:
+            answers = pending.popleft().result()
+            write_answers(answers, output)
+            written += len(answers)
+    return written
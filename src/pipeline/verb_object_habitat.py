@@ -6,7 +6,7 @@ from src.unpack_data import QuestionAnswerRecipe
 
 
 class VerbPatientHabitat:
-    lemmatizer = PuttyLemmatizer()
+    lemmatizer = PuttyLemmatizer.get()
 
     def __init__(self, verb: str, patients: List[str], habitats: List[str] = [], type=None, sentence_id: int = None,
                  token_id: int = None, all_related_words: List[str] = None):
@@ -101,20 +101,14 @@ class VerbPatientHabitat:
         verb_position = verb_token.id
         verb_semantic_role_ids = [i for i, sr in enumerate(verb_token.semantic_roles) if sr in ["B-V", "D-V"]]
 
-        words = []
-        for token in sentence.annotated_tokens:
-            if token.is_equal_to_any_verb_id(verb_position) or \
-                    any(token.semantic_roles[i] for i in verb_semantic_role_ids):
-                words.append(token.raw_token.lower())
-        return words
+        return [token.raw_token.lower() for token in sentence.related_tokens(verb_position, verb_semantic_role_ids)]
 
     @staticmethod
     def get_objects(verb_token: AnnotatedToken, sentence: AnnotatedSentence) -> List[str]:
         objects = verb_token.get_entry_from_relation1("Drop") + verb_token.get_entry_from_relation1("Result")
-        for token in sentence.annotated_tokens:
+        for token in sentence.verb_dependents(verb_token.id):
             if token.relation2 and \
-                    token.role_in_recipe in ["B-EXPLICITINGREDIENT", "B-IMPLICITINGREDIENT"] and \
-                    token.is_equal_to_any_verb_id(verb_token.id):
+                    token.role_in_recipe in ["B-EXPLICITINGREDIENT", "B-IMPLICITINGREDIENT"]:
                 obj = token.relation2.split(".")[0]
                 if obj not in objects:
                     objects.append(obj.lower())
@@ -127,9 +121,8 @@ class VerbPatientHabitat:
     def get_habitats(verb_token: AnnotatedToken, sentence: AnnotatedSentence, also_add_from_raw_tokens: bool = True) -> \
             List[str]:
         habitats = []
-        for habitat_token in sentence.annotated_tokens:
+        for habitat_token in sentence.verb_dependents(verb_token.id):
             if habitat_token.role_in_recipe in {"B-HABITAT", "I-HABITAT"} and \
-                    habitat_token.is_equal_to_any_verb_id(verb_token.id) and \
                     all([x not in habitat_token.semantic_roles for x in {"I-Patient", "B-Patient"}]):
 
                 if also_add_from_raw_tokens and habitat_token.role_in_recipe == "B-HABITAT":
@@ -148,9 +141,8 @@ class VerbPatientHabitat:
                              also_add_from_raw_tokens: bool = True) -> \
             List[str]:
         habitats = []
-        for habitat_token in sentence.annotated_tokens:
+        for habitat_token in sentence.verb_dependents(verb_token.id):
             if habitat_token.role_in_recipe in {"B-HABITAT", "I-HABITAT"} and \
-                    habitat_token.is_equal_to_any_verb_id(verb_token.id) and \
                     all([x not in habitat_token.semantic_roles for x in {"I-Patient", "B-Patient"}]):
 
                 if also_add_from_raw_tokens and habitat_token.role_in_recipe == "B-HABITAT":
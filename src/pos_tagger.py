@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class PosTagger:
+    """
+    Process-wide part-of-speech tagger. nltk.pos_tag builds a new perceptron tagger (and loads its model) at every
+    call; here the model is loaded once, sentences can be tagged in batches and the tags of the recent sentences are
+    memoized by the tokens. Use PosTagger.get() rather than creating new instances.
+    """
+
+    _instance: Optional["PosTagger"] = None
+
+    def __init__(self, max_size: int = 50000):
+        """
+        :param max_size: number of sentences whose tags are memoized (the least recently used are forgotten first)
+        """
+        if max_size < 1:
+            raise ValueError(f"Incorrect memo size = {max_size}, expecting at least 1")
+        self.max_size = max_size
+        self._tagger = None
+        self._memo: "OrderedDict[Tuple[str, ...], List[Tuple[str, str]]]" = OrderedDict()
+
+    @staticmethod
+    def get() -> "PosTagger":
+        """
+        :return: the tagger shared by the whole process
+        """
+        if PosTagger._instance is None:
+            PosTagger._instance = PosTagger()
+        return PosTagger._instance
+
+    def _get_tagger(self) -> "nltk.tag.PerceptronTagger":
+        if self._tagger is None:
+            from nltk.tag import PerceptronTagger
+            self._tagger = PerceptronTagger()
+        return self._tagger
+
+    def tag(self, tokens: List[str]) -> List[Tuple[str, str]]:
+        """
+        Same as nltk.pos_tag(tokens)
+        :param tokens: tokenized sentence
+        :return: list of (token, tag)
+        """
+        return self.tag_sents([tokens])[0]
+
+    def tag_sents(self, sentences: List[List[str]]) -> List[List[Tuple[str, str]]]:
+        """
+        Same as nltk.pos_tag_sents(sentences); only the sentences not seen before go through the tagger
+        :param sentences: tokenized sentences
+        :return: list of (token, tag) per sentence
+        """
+        keys = []
+        for tokens in sentences:
+            if isinstance(tokens, str):
+                raise TypeError("tokens: expected a list of strings, got a string")
+            keys.append(tuple(tokens))
+
+        for key in dict.fromkeys(keys):
+            if key in self._memo:
+                self._memo.move_to_end(key)
+            else:
+                self._memo[key] = self._get_tagger().tag(list(key))
+
+        # copies: the callers are free to modify the results
+        ret = [list(self._memo[key]) for key in keys]
+        while len(self._memo) > self.max_size:
+            self._memo.popitem(last=False)
+        return ret
+
+    def clear(self) -> None:
+        """
+        Forgets the memoized tags (the model stays loaded)
+        """
+        self._memo.clear()
@@ -1,11 +1,14 @@
-import nltk
+from typing import Optional
 
 
 class PuttyLemmatizer:
     """
     a lemmatizer with putty-fallback
+    Use PuttyLemmatizer.get() to share one instance (and one loaded WordNet) in the process
     """
 
+    _instance: Optional["PuttyLemmatizer"] = None
+
     def __init__(self):
         """
         Please add known cases
@@ -50,7 +53,32 @@ class PuttyLemmatizer:
             "muffulettum": "muffuletta",
             "lumaconus": "lumaconi",
         }
-        self.lemmatizer = nltk.WordNetLemmatizer()
+        self._lemmatizer = None
+
+    @staticmethod
+    def get() -> "PuttyLemmatizer":
+        """
+        :return: the lemmatizer shared by the whole process
+        """
+        if PuttyLemmatizer._instance is None:
+            PuttyLemmatizer._instance = PuttyLemmatizer()
+        return PuttyLemmatizer._instance
+
+    @property
+    def lemmatizer(self) -> "nltk.WordNetLemmatizer":
+        """
+        nltk is imported at the first use
+        """
+        if self._lemmatizer is None:
+            from nltk import WordNetLemmatizer
+            self._lemmatizer = WordNetLemmatizer()
+        return self._lemmatizer
+
+    def warm_up(self) -> None:
+        """
+        WordNet is loaded at the first lemmatization; call it to load WordNet upfront
+        """
+        self.lemmatizer.lemmatize("pans", "n")
 
     def lemmatize_verb(self, verb: str) -> str:
         return self.verb_exceptions.get(verb, self.lemmatizer.lemmatize(verb, "v"))
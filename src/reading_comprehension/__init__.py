@@ -1,15 +1,21 @@
 from .processors import (
     SemEvalProcessor,
     convert_examples_to_features,
-    group_by_category
+    convert_examples_to_features_fast,
+    group_by_category,
+    supports_fast_features
 )
 from .utils import (
+    LengthGroupedSampler,
     Prediction,
     YamlConfig,
     get_logger,
     set_seed,
+    trim_padding_collate,
     Result
 )
 
-__all__ = ['SemEvalProcessor', 'convert_examples_to_features', 'group_by_category',
-           'Prediction', 'YamlConfig', 'get_logger', 'set_seed', 'Result']
+__all__ = ['SemEvalProcessor', 'convert_examples_to_features', 'convert_examples_to_features_fast', 'group_by_category',
+           'supports_fast_features',
+           'LengthGroupedSampler', 'Prediction', 'YamlConfig', 'get_logger', 'set_seed', 'trim_padding_collate',
+           'Result']
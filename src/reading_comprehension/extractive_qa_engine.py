@@ -1,12 +1,15 @@
 import argparse
+import copy
 import json
+import math
 import os
 import timeit
 from collections import OrderedDict, defaultdict
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Mapping
 from typing import List
 
+import numpy as np
 import torch
 from torch.utils.data import DataLoader, RandomSampler, SequentialSampler
 from torch.utils.data.distributed import DistributedSampler
@@ -14,16 +17,23 @@ from torch.utils.tensorboard import SummaryWriter
 from tqdm import tqdm, trange
 from transformers import AdamW, get_linear_schedule_with_warmup, \
     AutoConfig, AutoModelForQuestionAnswering, AutoTokenizer
-from transformers.data.metrics.squad_metrics import _get_best_indexes, get_final_text, _compute_softmax
+from transformers.data.metrics.squad_metrics import get_final_text, _compute_softmax
 
 from src.get_root import get_root
+from src.pipeline.handler_metrics import HandlerF1, HandlerExactMatch
 from src.reading_comprehension import *
+from src.reading_comprehension.feature_cache import FeatureCache
+from src.reading_comprehension.processors import SemEvalExample, SemEvalFeatures
 
 
 class ReadingComprehension:
 
     def __init__(self, config_path: str, model_name_or_path: str = "", output_dir: str = "results",
-                 include_ingredients: bool = True, run_end_to_end_prediction: bool = False) -> None:
+                 include_ingredients: bool = True, run_end_to_end_prediction: bool = False,
+                 load_datasets: bool = True) -> None:
+        """
+        :param load_datasets: set to False to only load the model and the tokenizer, e.g. to call predict_examples
+        """
         model_prefix = model_name_or_path[:model_name_or_path.find("/")]
         model_suffix = model_name_or_path[model_name_or_path.find("_"):]
         additional_args = {
@@ -38,7 +48,7 @@ class ReadingComprehension:
         assert self.args.set_type in ["train", "val", "test"]
 
         self.data_files = {
-            "train": "modules/recipe2video/data/train/crl_srl.csv"
+            "train": "modules/recipe2video/data/train/crl_srl.csv",
             "val": "modules/recipe2video/data/val/crl_srl.csv",
             "test": "./modules/recipe2video/data/test/crl_srl.csv"
         }
@@ -63,23 +73,30 @@ class ReadingComprehension:
 
         self.model, self.tokenizer = self.init_model_and_tokenizer()
 
-        if self.args.do_train:
+        if self.args.do_train and load_datasets:
             features_and_dataset = self.load_examples(evaluate=False)
             self.train_dataset = features_and_dataset["dataset"]
 
-        self.eval_examples = []
-        if self.args.do_eval:
-            features_and_dataset = self.load_examples(evaluate=True)
-            self.eval_features, self.eval_dataset, self.eval_recipes, self.eval_examples = (
-                features_and_dataset["features"],
-                features_and_dataset["dataset"],
-                features_and_dataset["recipes"],
-                features_and_dataset["examples"]
-            )
+        self.eval_data = {"recipes": [], "examples": []}
+        if self.args.do_eval and load_datasets:
+            self.eval_data = self.load_examples(evaluate=True)
+            self.eval_features, self.eval_dataset = self.eval_data["features"], self.eval_data["dataset"]
 
         self.optimizer = None
         self.scheduler = None
         self.tb_writer = None
+        self.inference_model = None
+
+    @property
+    def eval_recipes(self) -> List[Any]:
+        return self.eval_data["recipes"]
+
+    @property
+    def eval_examples(self) -> List[SemEvalExample]:
+        """
+        Examples of the eval set; loaded from the feature cache, they are only read when needed (after the inference)
+        """
+        return self.eval_data["examples"]
 
     def setup_cuda(self) -> None:
         if self.args.local_rank == -1 or self.args.no_cuda:
@@ -105,7 +122,7 @@ class ReadingComprehension:
             self.args.model_name_or_path,
             do_lower_case=self.args.do_lower_case,
             cache_dir=cache_dir,
-            use_fast=False,
+            use_fast=self.args.get("use_fast_tokenizer", False),
         )
         model = AutoModelForQuestionAnswering.from_pretrained(
             self.args.model_name_or_path,
@@ -117,41 +134,73 @@ class ReadingComprehension:
         model.to(self.args.device)
         return model, tokenizer
 
-    def load_examples(self, evaluate: bool = False) -> Dict[str, Any]:
-        cached_features_path = os.path.join(self.data_dir, "cache")
-        if not os.path.isdir(cached_features_path):
-            os.makedirs(cached_features_path)
+    def load_examples(self, evaluate: bool = False) -> Mapping[str, Any]:
+        """
+        Features of the set, read from the feature cache (data/cache) if it is valid, otherwise built and cached
+        :return: {"features", "dataset", "recipes", "examples"}; from the cache, every part is loaded on first access
+        """
+        split = "eval" if evaluate else "train"
+        filename = f"{self.model_path}_{self.args.set_type}_{self.args.max_seq_length}_{split}"
+        cache = FeatureCache(os.path.join(self.data_dir, "cache", filename), params={
+            "model_name_or_path": self.args.model_name_or_path,
+            "do_lower_case": self.args.do_lower_case,
+            "include_ingredients": self.args.include_ingredients,
+            "max_seq_length": self.args.max_seq_length,
+            "doc_stride": self.args.doc_stride,
+            "max_query_length": self.args.max_query_length,
+            "is_training": not evaluate,
+        })
+
+        def read_examples() -> (List[Any], List[SemEvalExample]):
+            processor = SemEvalProcessor()
+            return processor.get_examples(
+                data_dir=get_root(), filename=self.data_files[self.args.set_type], is_training=not evaluate
+            )
+
+        if cache.exists() and not self.args.overwrite_cache:
+            self.logger.info(f"Loading features from cache {cache.path}")
+            return cache.load(rebuild_examples=read_examples)
 
-        filename = f"{self.model_path}_{self.args.set_type}_{self.args.max_seq_length}"
-        cached_features_file = os.path.join(cached_features_path, filename)
+        self.logger.info(f"Creating features from dataset file {get_root()}/{self.data_files[self.args.set_type]}")
 
-        if os.path.exists(cached_features_file) and not self.args.overwrite_cache:
-            self.logger.info(f"Loading features from cached file {cached_features_file}")
-            return torch.load(cached_features_file)
+        recipes, examples = read_examples()
+        features, dataset = self.convert_examples(examples, is_training=not evaluate)
 
-        self.logger.info(f"Creating features from dataset file {self.get_root()}/{self.data_files[self.args.set_type]}")
+        if self.args.local_rank in [-1, 0]:
+            self.logger.info(f"Saving features into cache {cache.path}")
+            cache.save(features, dataset, recipes, examples)
 
-        processor = SemEvalProcessor()
-        recipes, examples = processor.get_examples(
-            data_dir=get_root(), filename=self.data_files[self.args.set_type], is_training=not evaluate
-        )
-        features, dataset = convert_examples_to_features(
+        return {"features": features, "dataset": dataset, "recipes": recipes, "examples": examples}
+
+    def convert_examples(self, examples: List[SemEvalExample], is_training: bool, tqdm_enabled: bool = True) \
+            -> (List[SemEvalFeatures], torch.utils.data.TensorDataset):
+        """
+        Features of the examples, built with the fast tokenizer's batch encoding if possible (use_fast_tokenizer)
+        """
+        if supports_fast_features(self.tokenizer):
+            return convert_examples_to_features_fast(
+                examples=examples,
+                tokenizer=self.tokenizer,
+                max_seq_length=self.args.max_seq_length,
+                doc_stride=self.args.doc_stride,
+                max_query_length=self.args.max_query_length,
+                is_training=is_training,
+                tqdm_enabled=tqdm_enabled,
+            )
+        if self.tokenizer.is_fast:
+            raise ValueError(f"Unsupported fast tokenizer {type(self.tokenizer).__name__}, "
+                             f"set use_fast_tokenizer: False")
+        return convert_examples_to_features(
             examples=examples,
             tokenizer=self.tokenizer,
             max_seq_length=self.args.max_seq_length,
             doc_stride=self.args.doc_stride,
             max_query_length=self.args.max_query_length,
-            is_training=not evaluate,
+            is_training=is_training,
             threads=self.args.threads,
+            tqdm_enabled=tqdm_enabled,
         )
 
-        if self.args.local_rank in [-1, 0]:
-            self.logger.info(f"Saving features into cached file {cached_features_file}")
-            cache = {"features": features, "dataset": dataset, "recipes": recipes, "examples": examples}
-            torch.save(cache, cached_features_file)
-
-        return {"features": features, "dataset": dataset, "recipes": recipes, "examples": examples}
-
     def save_model_and_tokenizer(self) -> None:
         self.logger.info(f"Saving model checkpoint to {self.output_dir}")
 
@@ -193,11 +242,22 @@ class ReadingComprehension:
 
     def setup_training(self) -> (DataLoader, int):
         self.args.train_batch_size = self.args.per_gpu_train_batch_size * max(1, self.args.n_gpu)
-        if self.args.local_rank == -1:
+        if self.args.local_rank == -1 and self.args.get("group_by_length", False):
+            lengths = self.train_dataset.tensors[1].sum(dim=1).tolist()  # attention mask
+            sampler = LengthGroupedSampler(lengths, self.args.train_batch_size)
+        elif self.args.local_rank == -1:
             sampler = RandomSampler(self.train_dataset)
         else:
             sampler = DistributedSampler(self.train_dataset)
-        dataloader = DataLoader(self.train_dataset, sampler=sampler, batch_size=self.args.train_batch_size)
+
+        collate_fn = None
+        if self.args.get("dynamic_padding", False):
+            if self.tokenizer.padding_side == "right":
+                collate_fn = trim_padding_collate
+            else:
+                self.logger.warning("Dynamic padding needs right padding, using the padded features as they are")
+        dataloader = DataLoader(self.train_dataset, sampler=sampler, batch_size=self.args.train_batch_size,
+                                collate_fn=collate_fn)
 
         if self.args.evaluate_every_training_epoch:
             self.args.evaluate_during_training = True
@@ -346,6 +406,8 @@ class ReadingComprehension:
         set_seed(self.args.n_gpu)
 
         for epoch in train_iterator:
+            epoch_start_time = timeit.default_timer()
+            epoch_examples = 0
             epoch_iterator = tqdm(dataloader, desc="Iteration", disable=self.args.local_rank not in [-1, 0])
             for step, batch in enumerate(epoch_iterator):
                 # Skip past any already trained steps if resuming training
@@ -353,6 +415,7 @@ class ReadingComprehension:
                     steps_trained_in_current_epoch -= 1
                     continue
 
+                epoch_examples += batch[0].size(0)
                 self.model.train()
                 batch = tuple(t.to(self.args.device) for t in batch)
 
@@ -370,6 +433,7 @@ class ReadingComprehension:
                     epoch_iterator.close()
                     break
 
+            self.log_throughput(epoch, epoch_examples, timeit.default_timer() - epoch_start_time, global_step)
             self.save_model_checkpoint(epoch + 1)
 
             if 0 < self.args.max_steps < global_step:
@@ -378,6 +442,78 @@ class ReadingComprehension:
 
         self.logger.info(f" global_step = {global_step}, average loss = {tr_loss}")
 
+    def log_throughput(self, epoch: int, num_examples: int, elapsed_time: float, global_step: int) -> None:
+        """
+        Logs the training examples per second of the epoch, also to TensorBoard (next to the loss)
+        """
+        examples_per_second = num_examples / elapsed_time if elapsed_time > 0 else 0.0
+        self.logger.info(f"  Epoch {epoch}: {num_examples} examples in {elapsed_time:.1f} secs "
+                         f"({examples_per_second:.2f} examples per second)")
+        if self.tb_writer is not None:
+            self.tb_writer.add_scalar("train_examples_per_second", examples_per_second, global_step)
+
+    @staticmethod
+    def _span_masks(features: List[SemEvalFeatures], seq_length: int) -> (np.ndarray, np.ndarray):
+        """
+        Positions allowed as the start and the end of an answer, one row per feature:
+        the token maps to the context and, for the start, the feature is its max context.
+        """
+        valid_starts = np.zeros((len(features), seq_length), dtype=bool)
+        valid_ends = np.zeros((len(features), seq_length), dtype=bool)
+        for row, feature in enumerate(features):
+            context_indexes = [idx for idx in feature.token_to_orig_map if idx < min(len(feature.tokens), seq_length)]
+            valid_ends[row, context_indexes] = True
+            valid_starts[row, [idx for idx in context_indexes if feature.token_is_max_context.get(idx, False)]] = True
+        return valid_starts, valid_ends
+
+    def _ranked_span_predictions(self, features: List[SemEvalFeatures], start_logits: np.ndarray,
+                                 end_logits: np.ndarray, null_prediction: Prediction) -> Iterator[Prediction]:
+        """
+        Scores the n_best_size x n_best_size best start and end positions of all the features of an example at once.
+        Predictions are built lazily, as the n-best list usually needs only the first few of them.
+        :param features: features of a single example
+        :param start_logits: (num_features, max_seq_length) start logits of the features
+        :param end_logits: (num_features, max_seq_length) end logits of the features
+        :param null_prediction: the null answer, ranked after the valid spans having the same or a better score
+        :return: valid span predictions and the null prediction, from the best to the worst score
+        """
+        n_best_size = min(self.args.n_best_size, start_logits.shape[1])
+        rows = np.arange(len(features))[:, None]
+        # stable sort: on ties the lower index comes first
+        start_indexes = np.argsort(-start_logits, axis=1, kind="stable")[:, :n_best_size]
+        end_indexes = np.argsort(-end_logits, axis=1, kind="stable")[:, :n_best_size]
+
+        valid_starts, valid_ends = self._span_masks(features, start_logits.shape[1])
+        starts = start_indexes[:, :, None]
+        ends = end_indexes[:, None, :]
+        valid = (valid_starts[rows, start_indexes][:, :, None] & valid_ends[rows, end_indexes][:, None, :]
+                 & (ends >= starts) & (ends - starts + 1 <= self.args.max_answer_length))
+
+        # candidates in (feature, start, end) order, then stable-sorted by score
+        feature_idx, start_rank, end_rank = np.nonzero(valid)
+        start_idx = start_indexes[feature_idx, start_rank]
+        end_idx = end_indexes[feature_idx, end_rank]
+        candidate_start_logits = start_logits[feature_idx, start_idx]
+        candidate_end_logits = end_logits[feature_idx, end_idx]
+        scores = candidate_start_logits + candidate_end_logits
+        order = np.argsort(-scores, kind="stable")
+
+        null_score = null_prediction.start_logit + null_prediction.end_logit
+        null_yielded = False
+        for i in order:
+            if not null_yielded and scores[i] < null_score:
+                null_yielded = True
+                yield null_prediction
+            yield Prediction(
+                feature_index=int(feature_idx[i]),
+                start_index=int(start_idx[i]),
+                end_index=int(end_idx[i]),
+                start_logit=float(candidate_start_logits[i]),
+                end_logit=float(candidate_end_logits[i]),
+            )
+        if not null_yielded:
+            yield null_prediction
+
     def compute_predictions_logits(self, all_results: List[Result]):
         example_index_to_features = defaultdict(list)
         for feature in self.eval_features:
@@ -390,92 +526,64 @@ class ReadingComprehension:
         all_predictions = OrderedDict()
         all_nbest = OrderedDict()
         scores_diff_json = OrderedDict()
+        final_texts = {}
 
         for (example_index, example) in enumerate(self.eval_examples):
             features = example_index_to_features[example_index]
 
-            prelim_predictions = []
+            # all the logits of the example's features, as a (num_features, max_seq_length) matrix
+            results = [unique_id_to_result[feature.unique_id] for feature in features]
+            start_logits = np.stack([result.start_logits for result in results]).astype(np.float64)
+            end_logits = np.stack([result.end_logits for result in results]).astype(np.float64)
+
             # keep track of the minimum score of null start+end of position 0
-            score_null = 1000000  # large and positive
-            min_null_feature_index = 0  # the paragraph slice with min null score
-            null_start_logit = 0  # the start logit at the slice with min null score
-            null_end_logit = 0  # the end logit at the slice with min null score
-
-            for (feature_index, feature) in enumerate(features):
-                result = unique_id_to_result[feature.unique_id]
-                start_indexes = _get_best_indexes(result.start_logits, self.args.n_best_size)
-                end_indexes = _get_best_indexes(result.end_logits, self.args.n_best_size)
-
-                # get the min score of irrelevant answers
-                feature_null_score = result.start_logits[0] + result.end_logits[0]
-                if feature_null_score < score_null:
-                    score_null = feature_null_score
-                    min_null_feature_index = feature_index
-                    null_start_logit = result.start_logits[0]
-                    null_end_logit = result.end_logits[0]
-
-                for start_idx in start_indexes:
-                    for end_idx in end_indexes:
-                        valid_start_idx = start_idx < len(feature.tokens) and start_idx in feature.token_to_orig_map
-                        is_max_start_idx = feature.token_is_max_context.get(start_idx, False)
-                        valid_end_idx = len(
-                            feature.tokens) > end_idx >= start_idx and end_idx in feature.token_to_orig_map
-                        answer_too_long = end_idx - start_idx + 1 > self.args.max_answer_length
-
-                        if valid_start_idx and is_max_start_idx and valid_end_idx and not answer_too_long:
-                            prelim_predictions.append(
-                                Prediction(
-                                    feature_index=feature_index,
-                                    start_index=start_idx,
-                                    end_index=end_idx,
-                                    start_logit=result.start_logits[start_idx],
-                                    end_logit=result.end_logits[end_idx],
-                                )
-                            )
-
-            prelim_predictions.append(
-                Prediction(
-                    feature_index=min_null_feature_index,
-                    start_index=0,
-                    end_index=0,
-                    start_logit=null_start_logit,
-                    end_logit=null_end_logit,
-                )
-            )
-            
-            prelim_predictions = sorted(
-                prelim_predictions,
-                key=lambda pred: (pred.start_logit + pred.end_logit),
-                reverse=True
+            feature_null_scores = start_logits[:, 0] + end_logits[:, 0]
+            min_null_feature_index = int(np.argmin(feature_null_scores))  # the paragraph slice with min null score
+            score_null = float(feature_null_scores[min_null_feature_index])
+            null_start_logit = float(start_logits[min_null_feature_index, 0])
+            null_end_logit = float(end_logits[min_null_feature_index, 0])
+
+            null_prediction = Prediction(
+                feature_index=min_null_feature_index,
+                start_index=0,
+                end_index=0,
+                start_logit=null_start_logit,
+                end_logit=null_end_logit,
             )
+            prelim_predictions = self._ranked_span_predictions(features, start_logits, end_logits, null_prediction)
 
             seen_predictions = set()
             nbest = []
             for pred in prelim_predictions:
-                if len(nbest) < self.args.n_best_size:
-                    feature = features[pred.feature_index]
-                    if pred.start_index > 0:  # this is a non-null prediction
-                        tok_tokens = feature.tokens[pred.start_index: (pred.end_index + 1)]
-                        orig_doc_start = feature.token_to_orig_map[pred.start_index]
-                        orig_doc_end = feature.token_to_orig_map[pred.end_index]
-                        orig_tokens = example.doc_tokens[orig_doc_start: (orig_doc_end + 1)]
-
-                        tok_text = self.tokenizer.convert_tokens_to_string(tok_tokens)
-
-                        tok_text = tok_text.strip()
-                        tok_text = " ".join(tok_text.split())
-                        orig_text = " ".join(orig_tokens)
-
-                        final_text = get_final_text(pred_text=tok_text, orig_text=orig_text,
-                                                    do_lower_case=self.args.do_lower_case,
-                                                    verbose_logging=self.args.verbose_logging)
-                    else:
-                        final_text = None
-
-                    if final_text not in seen_predictions:
-                        seen_predictions.add(final_text)
-                        nbest.append(
-                            Prediction(text=final_text, start_logit=pred.start_logit, end_logit=pred.end_logit))
+                if len(nbest) >= self.args.n_best_size:
+                    break
+                feature = features[pred.feature_index]
+                if pred.start_index > 0:  # this is a non-null prediction
+                    tok_tokens = feature.tokens[pred.start_index: (pred.end_index + 1)]
+                    orig_doc_start = feature.token_to_orig_map[pred.start_index]
+                    orig_doc_end = feature.token_to_orig_map[pred.end_index]
+                    orig_tokens = example.doc_tokens[orig_doc_start: (orig_doc_end + 1)]
+
+                    tok_text = self.tokenizer.convert_tokens_to_string(tok_tokens)
+
+                    tok_text = tok_text.strip()
+                    tok_text = " ".join(tok_text.split())
+                    orig_text = " ".join(orig_tokens)
+
+                    # overlapping features often propose the same span
+                    if (tok_text, orig_text) not in final_texts:
+                        final_texts[(tok_text, orig_text)] = get_final_text(
+                            pred_text=tok_text, orig_text=orig_text, do_lower_case=self.args.do_lower_case,
+                            verbose_logging=self.args.verbose_logging
+                        )
+                    final_text = final_texts[(tok_text, orig_text)]
+                else:
+                    final_text = None
+
+                if final_text not in seen_predictions:
+                    seen_predictions.add(final_text)
+                    nbest.append(
+                        Prediction(text=final_text, start_logit=pred.start_logit, end_logit=pred.end_logit))
 
             # if we didn't include the empty option in the n-best, include it
             if "" not in seen_predictions:
@@ -529,52 +637,134 @@ class ReadingComprehension:
             with open(output_file, "w") as writer:
                 writer.write(json.dumps(predictions, indent=4) + "\n")
 
-    def evaluate(self):
-        if not os.path.exists(self.output_dir) and self.args.local_rank in [-1, 0]:
-            os.makedirs(self.output_dir)
-
+    def _length_bucketed_batches(self, batch_size: int) -> List[List[int]]:
+        """
+        Batches of feature indexes, the features sorted by their real (not padded) length,
+        so that every batch holds features of similar length.
+        """
+        lengths = self.eval_dataset.tensors[1].sum(dim=1)  # attention mask
+        order = torch.argsort(lengths, stable=True).tolist()
+        return [order[i: i + batch_size] for i in range(0, len(order), batch_size)]
+
+    def _model_inputs(self, batch: List[torch.Tensor]) -> Dict[str, torch.Tensor]:
+        inputs = {
+            "input_ids": batch[0],
+            "attention_mask": batch[1],
+            "token_type_ids": batch[2],
+        }
+        if self.args.model_type in ["roberta", "distilbert", "camembert", "bart", "longformer"]:
+            del inputs["token_type_ids"]
+        return inputs
+
+    def build_inference_model(self, quantize: bool = False, torchscript: bool = False) -> torch.nn.Module:
+        """
+        CPU inference variant of the model; the model itself is left unchanged.
+        :param quantize: dynamic int8 quantization of the Linear layers (int8 weights, activations quantized on the fly)
+        :param torchscript: trace the model with TorchScript on the first batch of the eval dataset
+        :return: the model to run predict_logits with
+        """
+        if not quantize and not torchscript:
+            return self.model
+        if quantize and self.args.device.type != "cpu":
+            raise ValueError(f"Quantized inference runs on CPU only, got device {self.args.device} (set no_cuda)")
+
+        model = copy.deepcopy(self.model).eval()
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        if torchscript:
+            model.config.return_dict = False  # a traced model returns tuples
+            batch = tuple(t.to(self.args.device) for t in self.eval_dataset[:self.args.per_gpu_eval_batch_size])
+            with torch.no_grad():
+                model = torch.jit.trace(model, example_kwarg_inputs=self._model_inputs(batch))
+        return model
+
+    def get_inference_model(self) -> torch.nn.Module:
+        """
+        :return: the model as set by the quantize and torchscript options, built on first use
+        """
+        quantize, torchscript = self.args.get("quantize", False), self.args.get("torchscript", False)
+        if not quantize and not torchscript:
+            return self.model
+        if self.inference_model is None:
+            self.logger.info(f"Preparing the inference model: quantize = {quantize}, torchscript = {torchscript}")
+            self.inference_model = self.build_inference_model(quantize=quantize, torchscript=torchscript)
+        return self.inference_model
+
+    def predict_logits(self, dynamic_padding: bool = False, model: torch.nn.Module = None) -> List[Result]:
+        """
+        Runs the model over the eval dataset.
+        :param dynamic_padding: bucket the features by length and pad every batch only up to its longest feature.
+            Logits past the real length of a feature are set to -inf; results are returned in the dataset order.
+        :param model: model to run, default: get_inference_model()
+        :return: start and end logits, one Result per feature
+        """
         self.args.eval_batch_size = self.args.per_gpu_eval_batch_size * max(1, self.args.n_gpu)
+        if self.args.get("num_threads", 0) > 0:
+            torch.set_num_threads(self.args.num_threads)
 
-        eval_sampler = SequentialSampler(self.eval_dataset)
-        eval_dataloader = DataLoader(self.eval_dataset, sampler=eval_sampler, batch_size=self.args.eval_batch_size)
+        if dynamic_padding and self.tokenizer.padding_side != "right":
+            self.logger.warning("Dynamic padding needs right padding, using the padded features as they are")
+            dynamic_padding = False
 
-        if self.args.n_gpu > 1 and not isinstance(self.model, torch.nn.DataParallel):
-            self.model = torch.nn.DataParallel(self.model)
+        model = model if model is not None else self.get_inference_model()
+        if dynamic_padding and isinstance(model, torch.jit.ScriptModule):
+            self.logger.warning("A traced model may depend on the sequence length, using the padded features")
+            dynamic_padding = False
 
-        self.logger.info(f"***** Running evaluation on {self.args.set_type} set *****")
-        self.logger.info("  Num examples = %d", len(self.eval_dataset))
-        self.logger.info("  Batch size = %d", self.args.eval_batch_size)
+        if dynamic_padding:
+            eval_dataloader = DataLoader(self.eval_dataset,
+                                         batch_sampler=self._length_bucketed_batches(self.args.eval_batch_size))
+        else:
+            eval_sampler = SequentialSampler(self.eval_dataset)
+            eval_dataloader = DataLoader(self.eval_dataset, sampler=eval_sampler,
+                                         batch_size=self.args.eval_batch_size)
 
-        all_results = []
-        start_time = timeit.default_timer()
+        if model is self.model and self.args.n_gpu > 1 and not isinstance(self.model, torch.nn.DataParallel):
+            self.model = model = torch.nn.DataParallel(self.model)
+
+        grad_mode = torch.inference_mode if self.args.get("inference_mode", False) else torch.no_grad
+        all_results = [None] * len(self.eval_dataset)
 
         for batch in tqdm(eval_dataloader, desc="Evaluating"):
-            self.model.eval()
+            model.eval()
+            if dynamic_padding:
+                batch_length = int(batch[1].sum(dim=1).max())
+                batch = tuple(t[:, :batch_length] if t.dim() == 2 else t for t in batch)
             batch = tuple(t.to(self.args.device) for t in batch)
 
-            with torch.no_grad():
-                inputs = {
-                    "input_ids": batch[0],
-                    "attention_mask": batch[1],
-                    "token_type_ids": batch[2],
-                }
-
-                if self.args.model_type in ["roberta", "distilbert", "camembert", "bart", "longformer"]:
-                    del inputs["token_type_ids"]
-
+            with grad_mode():
+                inputs = self._model_inputs(batch)
                 feature_indices = batch[3]
-                outputs = self.model(**inputs)
+                outputs = model(**inputs)
+
+            # logits are kept as arrays, one transfer per batch
+            outputs = outputs if isinstance(outputs, tuple) else outputs.to_tuple()
+            batch_start_logits, batch_end_logits = [output.detach().cpu().numpy() for output in outputs]
+            if dynamic_padding:
+                batch_start_logits = self._pad_logits(batch_start_logits, batch[1])
+                batch_end_logits = self._pad_logits(batch_end_logits, batch[1])
+            for i, feature_index in enumerate(feature_indices.tolist()):
+                unique_id = int(self.eval_features[feature_index].unique_id)
+                all_results[feature_index] = Result(unique_id, batch_start_logits[i], batch_end_logits[i])
+
+        return all_results
+
+    def _pad_logits(self, logits: np.ndarray, attention_mask: torch.Tensor) -> np.ndarray:
+        padded = np.full((logits.shape[0], self.args.max_seq_length), -np.inf, dtype=logits.dtype)
+        for row, length in enumerate(attention_mask.sum(dim=1).tolist()):
+            padded[row, :length] = logits[row, :length]
+        return padded
 
-            for i, feature_index in enumerate(feature_indices):
-                eval_feature = self.eval_features[feature_index.item()]
-                unique_id = int(eval_feature.unique_id)
-
-                output = [output[i].detach().cpu().tolist() for output in outputs.to_tuple()]
+    def evaluate(self):
+        if not os.path.exists(self.output_dir) and self.args.local_rank in [-1, 0]:
+            os.makedirs(self.output_dir)
 
-                start_logits, end_logits = output
-                result = Result(unique_id, start_logits, end_logits)
+        self.logger.info(f"***** Running evaluation on {self.args.set_type} set *****")
+        self.logger.info("  Num examples = %d", len(self.eval_dataset))
+        self.logger.info("  Batch size = %d", self.args.per_gpu_eval_batch_size * max(1, self.args.n_gpu))
 
-                all_results.append(result)
+        start_time = timeit.default_timer()
+        all_results = self.predict_logits(dynamic_padding=self.args.get("dynamic_padding", False))
 
         eval_time = timeit.default_timer() - start_time
         self.logger.info(f"  Evaluation done in total {eval_time} secs "
@@ -583,6 +773,126 @@ class ReadingComprehension:
         predictions = self.compute_predictions_logits(all_results=all_results)
         self.save_predictions(predictions)
 
+    def predict_examples(self, examples: List[SemEvalExample]) -> Dict[str, List[Prediction]]:
+        """
+        Inference on examples given in memory, nothing is cached or saved. Replaces the current eval set.
+        :param examples: evaluation examples, e.g. from SemEvalProcessor.create_examples_for_questions
+        :return: n-best predictions per qas_id
+        """
+        self.eval_features, self.eval_dataset = self.convert_examples(examples, is_training=False, tqdm_enabled=False)
+        self.eval_data = {"recipes": [], "examples": examples}
+        all_results = self.predict_logits(dynamic_padding=self.args.get("dynamic_padding", False))
+        return self.compute_predictions_logits(all_results=all_results)
+
+    def benchmark_inference(self) -> Dict[str, float]:
+        """
+        Compares the throughput of the padded inference and the dynamic padding one on the eval dataset.
+        :return: examples (features) per second of both paths
+        """
+        throughput = {}
+        for name, dynamic_padding in [("padded", False), ("dynamic_padding", True)]:
+            start_time = timeit.default_timer()
+            self.predict_logits(dynamic_padding=dynamic_padding)
+            throughput[name] = len(self.eval_dataset) / (timeit.default_timer() - start_time)
+            self.logger.info(f"  {name}: {throughput[name]:.2f} examples per second")
+        self.logger.info(f"  Speedup: {throughput['dynamic_padding'] / throughput['padded']:.2f}x")
+        return throughput
+
+    def score_predictions(self, predictions: Dict[str, List[Prediction]]) -> (float, float):
+        """
+        Scores the best predictions (the first of the n-best, as the pipeline answers) against the answers of the eval
+        examples; questions without a known answer are skipped.
+        :return: F1, exact match
+        """
+        sum_f1, sum_em, count = 0.0, 0.0, 0
+        for example in self.eval_examples:
+            truth = "" if example.is_impossible else example.answers[0]["text"] if example.answers else None
+            if truth is None:
+                continue
+            prediction = predictions[example.qas_id][0].text or ""
+            sum_f1 += HandlerF1.compute_f1(prediction, truth)
+            sum_em += HandlerExactMatch.compute_exact_match(prediction, truth)
+            count += 1
+        if count == 0:
+            raise ValueError(f"No answers to score the predictions in the {self.args.set_type} set")
+        return sum_f1 / count, sum_em / count
+
+    def benchmark_quantization(self) -> Dict[str, Dict[str, float]]:
+        """
+        Compares the fp32 model with its int8 dynamic-quantized variants (eager and TorchScript-traced) on the eval set,
+        to decide whether the accuracy cost of quantization is acceptable. A traced model runs on the padded features,
+        so with dynamic_padding the traced variant is compared with an fp32 baseline run on the padded features too.
+        :return: per variant: padding (dynamic / padded), baseline (the fp32 variant with the same padding),
+            latency (ms per batch), throughput (features per second), F1, exact match, and the speedup and the F1 / EM
+            deltas against the baseline
+        """
+        dynamic_padding = self.args.get("dynamic_padding", False)
+        num_batches = math.ceil(len(self.eval_dataset) / (self.args.per_gpu_eval_batch_size * max(1, self.args.n_gpu)))
+        # name, quantize, torchscript, dynamic padding; the fp32 variants come first for their padding
+        variants = [("fp32", False, False, dynamic_padding), ("int8", True, False, dynamic_padding)]
+        if dynamic_padding:
+            variants.append(("fp32_padded", False, False, False))
+        variants.append(("int8_torchscript", True, True, False))
+
+        stats = {}
+        baselines = {}  # dynamic padding -> name of the fp32 variant
+        for name, quantize, torchscript, padding in variants:
+            model = self.build_inference_model(quantize=quantize, torchscript=torchscript)
+            start_time = timeit.default_timer()
+            all_results = self.predict_logits(dynamic_padding=padding, model=model)
+            elapsed_time = timeit.default_timer() - start_time
+
+            f1, exact_match = self.score_predictions(self.compute_predictions_logits(all_results=all_results))
+            stats[name] = {"padding": "dynamic" if padding else "padded",
+                           "baseline": baselines.setdefault(padding, name),
+                           "latency_ms": 1000 * elapsed_time / num_batches,
+                           "throughput": len(self.eval_dataset) / elapsed_time, "F1": f1, "Exact match": exact_match}
+            baseline = stats[stats[name]["baseline"]]
+            stats[name]["speedup"] = stats[name]["throughput"] / baseline["throughput"]
+            stats[name]["F1 delta"] = f1 - baseline["F1"]
+            stats[name]["Exact match delta"] = exact_match - baseline["Exact match"]
+
+        for name, variant_stats in stats.items():
+            self.logger.info(f"  {name} ({variant_stats['padding']} padding, against {variant_stats['baseline']}): "
+                             f"{variant_stats['latency_ms']:.1f} ms per batch, "
+                             f"{variant_stats['throughput']:.2f} examples per second "
+                             f"({variant_stats['speedup']:.2f}x), "
+                             f"F1 = {variant_stats['F1']:.4f} ({variant_stats['F1 delta']:+.4f}), "
+                             f"EM = {variant_stats['Exact match']:.4f} ({variant_stats['Exact match delta']:+.4f})")
+        return stats
+
+    def benchmark_feature_conversion(self) -> Dict[str, float]:
+        """
+        Compares the time of building the features of the set with the slow tokenizer (word by word) and with the fast
+        one (batch encoding), and checks that both give the same features.
+        :return: seconds taken by both builders
+        """
+        is_training = self.args.set_type == "train"
+        _, examples = SemEvalProcessor().get_examples(
+            data_dir=get_root(), filename=self.data_files[self.args.set_type], is_training=is_training
+        )
+        tokenizers = {
+            use_fast: AutoTokenizer.from_pretrained(self.args.model_name_or_path, do_lower_case=self.args.do_lower_case,
+                                                    use_fast=use_fast)
+            for use_fast in [False, True]
+        }
+
+        seconds, results = {}, {}
+        for name, use_fast in [("slow", False), ("fast", True)]:
+            self.tokenizer = tokenizers[use_fast]
+            start_time = timeit.default_timer()
+            results[name] = self.convert_examples(examples, is_training=is_training)
+            seconds[name] = timeit.default_timer() - start_time
+            self.logger.info(f"  {name} tokenizer: {len(results[name][0])} features in {seconds[name]:.1f} secs")
+
+        (slow_features, slow_dataset), (fast_features, fast_dataset) = results["slow"], results["fast"]
+        same = len(slow_features) == len(fast_features) \
+            and all(torch.equal(a, b) for a, b in zip(slow_dataset.tensors, fast_dataset.tensors)) \
+            and all(a.token_to_orig_map == b.token_to_orig_map and a.token_is_max_context == b.token_is_max_context
+                    and a.tokens == b.tokens for a, b in zip(slow_features, fast_features))
+        self.logger.info(f"  Speedup: {seconds['slow'] / seconds['fast']:.2f}x, same features: {same}")
+        return seconds
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -590,6 +900,12 @@ if __name__ == "__main__":
     parser.add_argument("--model_name_or_path", type=str)
     parser.add_argument("--include_ingredients", action="store_true")
     parser.add_argument("--run_end_to_end_prediction", action="store_true")
+    parser.add_argument("--benchmark_inference", action="store_true",
+                        help="compare padded and dynamic padding inference speed on the eval set")
+    parser.add_argument("--benchmark_features", action="store_true",
+                        help="compare the feature building time of the slow and the fast tokenizer on the set")
+    parser.add_argument("--benchmark_quantization", action="store_true",
+                        help="compare latency, throughput and F1 / EM of the fp32 and int8 models on the eval set")
     args = parser.parse_args()
 
     qa = ReadingComprehension(
@@ -597,10 +913,19 @@ if __name__ == "__main__":
         model_name_or_path=args.model_name_or_path,
         include_ingredients=args.include_ingredients,
         run_end_to_end_prediction=args.run_end_to_end_prediction,
+        load_datasets=not args.benchmark_features,
     )
 
-    if qa.args.do_train:
-        qa.train()
-
-    if qa.args.do_eval:
-        qa.evaluate()
+    if args.benchmark_features:
+        qa.benchmark_feature_conversion()
+    else:
+        if qa.args.do_train:
+            qa.train()
+
+        if qa.args.do_eval:
+            if args.benchmark_inference:
+                qa.benchmark_inference()
+            elif args.benchmark_quantization:
+                qa.benchmark_quantization()
+            else:
+                qa.evaluate()
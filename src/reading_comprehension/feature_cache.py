@@ -0,0 +1,227 @@
+import json
+import os
+import pickle
+import shutil
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, List, Tuple
+
+import torch
+from torch.utils.data import TensorDataset
+
+from .processors import SemEvalExample, SemEvalFeatures
+
+CACHE_VERSION = 1
+
+
+class CachedFeatures(Sequence):
+    """
+    Features of a FeatureCache, read shard by shard on first access. The input tensors are only kept in the dataset,
+    so input_ids, attention_mask, token_type_ids and p_mask of the features are None.
+    """
+
+    def __init__(self, cache: "FeatureCache", num_features: int, shard_size: int) -> None:
+        self.cache = cache
+        self.num_features = num_features
+        self.shard_size = shard_size
+        self.shards = {}
+
+    def __len__(self) -> int:
+        return self.num_features
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.num_features))]
+        if index < 0:
+            index += self.num_features
+        if not 0 <= index < self.num_features:
+            raise IndexError(f"Feature index {index} out of range")
+
+        shard_index = index // self.shard_size
+        if shard_index not in self.shards:
+            self.shards[shard_index] = self.cache.load_shard(shard_index)
+        return self.shards[shard_index][index % self.shard_size]
+
+
+class LazyMapping(Mapping):
+    """
+    Read-only dict whose values are computed by their loaders on first access
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]) -> None:
+        self.loaders = loaders
+        self.values = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.values:
+            self.values[key] = self.loaders[key]()
+        return self.values[key]
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+    def __len__(self) -> int:
+        return len(self.loaders)
+
+
+def encode_feature(feature: SemEvalFeatures) -> list:
+    """
+    :return: the feature without its input tensors, as a compact JSON row
+    """
+    positions = list(feature.token_to_orig_map)
+    first_position = positions[0] if positions else 0
+    if positions != list(range(first_position, first_position + len(positions))) \
+            or list(feature.token_is_max_context) != positions:
+        raise ValueError(f"Feature {feature.unique_id} does not map a single span of tokens")
+
+    return [feature.example_index, feature.unique_id, feature.paragraph_len, feature.cls_index,
+            feature.start_position, feature.end_position, feature.is_impossible, feature.qas_id, feature.length,
+            first_position, list(feature.token_to_orig_map.values()),
+            "".join("1" if is_max else "0" for is_max in feature.token_is_max_context.values()), feature.tokens]
+
+
+def decode_feature(row: list) -> SemEvalFeatures:
+    (example_index, unique_id, paragraph_len, cls_index, start_position, end_position, is_impossible, qas_id, length,
+     first_position, orig_indices, max_context, tokens) = row
+    feature = SemEvalFeatures(
+        input_ids=None,
+        attention_mask=None,
+        token_type_ids=None,
+        cls_index=cls_index,
+        p_mask=None,
+        example_index=example_index,
+        unique_id=unique_id,
+        paragraph_len=paragraph_len,
+        token_is_max_context={first_position + i: is_max == "1" for i, is_max in enumerate(max_context)},
+        tokens=tokens,
+        token_to_orig_map={first_position + i: orig_index for i, orig_index in enumerate(orig_indices)},
+        start_position=start_position,
+        end_position=end_position,
+        is_impossible=is_impossible,
+        qas_id=qas_id,
+    )
+    feature.length = length
+    return feature
+
+
+class FeatureCache:
+    """
+    Features of a set saved in a directory, so that every part is read only when needed:
+    - manifest.json: cache version, parameters of the features, dtypes and shapes of the dataset tensors
+    - tensor_<i>.bin: raw dataset tensors, memory-mapped on load (pages are read on first use)
+    - features_<shard>.json: the other fields of the features, by shards of shard_size features
+    - examples.pkl: recipes and examples, only unpickled when used
+
+    A cache of another version or built with other parameters is treated as missing.
+    """
+
+    def __init__(self, path: str, params: Dict[str, Any] = None, shard_size: int = 4096) -> None:
+        """
+        :param path: directory of the cache
+        :param params: everything the features depend on (e.g. tokenizer, lengths), stored in the manifest
+        :param shard_size: number of features per metadata shard
+        """
+        if shard_size <= 0:
+            raise ValueError(f"Incorrect shard size = {shard_size}")
+        self.path = path
+        self.params = params if params is not None else {}
+        self.shard_size = shard_size
+        self.examples = None
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        with open(self._manifest_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def exists(self) -> bool:
+        """
+        :return: True if the cache is complete, of the current version and built with the same parameters
+        """
+        if not os.path.exists(self._manifest_path()):
+            return False
+        manifest = self._read_manifest()
+        return manifest.get("version") == CACHE_VERSION and manifest.get("params") == self.params
+
+    def save(self, features: List[SemEvalFeatures], dataset: TensorDataset, recipes: List[Any],
+             examples: List[SemEvalExample]) -> None:
+        """
+        Replaces the cache; the manifest is written last, so an interrupted save leaves no valid cache
+        """
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path)
+
+        tensors = []
+        for i, tensor in enumerate(dataset.tensors):
+            tensor.contiguous().numpy().tofile(os.path.join(self.path, f"tensor_{i}.bin"))
+            tensors.append({"dtype": str(tensor.dtype).replace("torch.", ""), "shape": list(tensor.shape)})
+
+        num_shards = 0
+        for start in range(0, len(features), self.shard_size):
+            with open(os.path.join(self.path, f"features_{num_shards}.json"), "w", encoding="utf-8") as f:
+                json.dump([encode_feature(feature) for feature in features[start:start + self.shard_size]], f)
+            num_shards += 1
+
+        with open(os.path.join(self.path, "examples.pkl"), "wb") as f:
+            pickle.dump({"recipes": recipes, "examples": examples}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        manifest = {"version": CACHE_VERSION, "params": self.params, "num_features": len(features),
+                    "shard_size": self.shard_size, "tensors": tensors}
+        with open(self._manifest_path(), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    def load_dataset(self) -> TensorDataset:
+        """
+        :return: the dataset on top of memory-mapped tensors (copy-on-write, the files are never modified)
+        """
+        tensors = []
+        for i, tensor in enumerate(self._read_manifest()["tensors"]):
+            dtype, shape = getattr(torch, tensor["dtype"]), tensor["shape"]
+            size = 1
+            for dim in shape:
+                size *= dim
+            if size == 0:
+                tensors.append(torch.empty(shape, dtype=dtype))
+            else:
+                tensors.append(torch.from_file(os.path.join(self.path, f"tensor_{i}.bin"), shared=False, size=size,
+                                               dtype=dtype).view(shape))
+        return TensorDataset(*tensors)
+
+    def load_features(self) -> CachedFeatures:
+        manifest = self._read_manifest()
+        return CachedFeatures(self, manifest["num_features"], manifest["shard_size"])
+
+    def load_shard(self, shard_index: int) -> List[SemEvalFeatures]:
+        with open(os.path.join(self.path, f"features_{shard_index}.json"), "r", encoding="utf-8") as f:
+            return [decode_feature(row) for row in json.load(f)]
+
+    def load_examples(self, rebuild: Callable[[], Tuple[List[Any], List[SemEvalExample]]] = None) \
+            -> Tuple[List[Any], List[SemEvalExample]]:
+        """
+        :param rebuild: called to recreate the recipes and the examples if they cannot be unpickled any more
+            (e.g. after a change of their classes)
+        :return: recipes, examples
+        """
+        if self.examples is None:
+            try:
+                with open(os.path.join(self.path, "examples.pkl"), "rb") as f:
+                    cached = pickle.load(f)
+                self.examples = cached["recipes"], cached["examples"]
+            except (pickle.UnpicklingError, AttributeError, ImportError, TypeError, EOFError):
+                if rebuild is None:
+                    raise
+                self.examples = rebuild()
+        return self.examples
+
+    def load(self, rebuild_examples: Callable[[], Tuple[List[Any], List[SemEvalExample]]] = None) \
+            -> Mapping:
+        """
+        :return: {"features", "dataset", "recipes", "examples"}, each part loaded on first access
+        """
+        return LazyMapping({
+            "features": self.load_features,
+            "dataset": self.load_dataset,
+            "recipes": lambda: self.load_examples(rebuild_examples)[0],
+            "examples": lambda: self.load_examples(rebuild_examples)[1],
+        })
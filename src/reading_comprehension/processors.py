@@ -15,12 +15,15 @@
 import os
 import re
 from collections import OrderedDict
+from contextlib import contextmanager
+from bisect import bisect_left
 from functools import partial
-from multiprocessing import Pool, cpu_count
-from typing import List
+from multiprocessing import cpu_count
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
+from torch.multiprocessing import Pool
 from torch.utils.data import TensorDataset
 from tqdm import tqdm
 from transformers.models.bert.tokenization_bert import whitespace_tokenize
@@ -78,38 +81,47 @@ def _is_whitespace(c):
     return False
 
 
-def convert_example_to_features(
-    example, max_seq_length, doc_stride, max_query_length, padding_strategy, is_training, tokenizer
-):
-    features = []
+def _is_answer_in_text(example, is_training) -> bool:
+    """In training, examples whose answer cannot be found in the text are skipped."""
     if is_training and not example.is_impossible:
         # Get start and end position
         start_position = example.start_position
         end_position = example.end_position
 
-        # If the answer cannot be found in the text, then skip this example.
         actual_text = " ".join(example.doc_tokens[start_position : (end_position + 1)])
         cleaned_answer_text = " ".join(whitespace_tokenize(example.answer_text))
 
-        if actual_text.find(cleaned_answer_text) == -1:
-            return []
+        return actual_text.find(cleaned_answer_text) != -1
+    return True
+
+
+def _sub_tokenize(token, tokenizer):
+    if tokenizer.__class__.__name__ in [
+        "RobertaTokenizer",
+        "LongformerTokenizer",
+        "BartTokenizer",
+        "RobertaTokenizerFast",
+        "LongformerTokenizerFast",
+        "BartTokenizerFast",
+    ]:
+        return tokenizer.tokenize(token, add_prefix_space=True)
+    return tokenizer.tokenize(token)
+
+
+def convert_example_to_features(
+    example, max_seq_length, doc_stride, max_query_length, padding_strategy, is_training, tokenizer
+):
+    features = []
+    # If the answer cannot be found in the text, then skip this example.
+    if not _is_answer_in_text(example, is_training):
+        return []
 
     tok_to_orig_index = []
     orig_to_tok_index = []
     all_doc_tokens = []
     for (i, token) in enumerate(example.doc_tokens):
         orig_to_tok_index.append(len(all_doc_tokens))
-        if tokenizer.__class__.__name__ in [
-            "RobertaTokenizer",
-            "LongformerTokenizer",
-            "BartTokenizer",
-            "RobertaTokenizerFast",
-            "LongformerTokenizerFast",
-            "BartTokenizerFast",
-        ]:
-            sub_tokens = tokenizer.tokenize(token, add_prefix_space=True)
-        else:
-            sub_tokens = tokenizer.tokenize(token)
+        sub_tokens = _sub_tokenize(token, tokenizer)
         for sub_token in sub_tokens:
             tok_to_orig_index.append(i)
             all_doc_tokens.append(sub_token)
@@ -286,9 +298,99 @@ def convert_example_to_features(
     return features
 
 
-def convert_example_to_features_init(tokenizer_for_convert: PreTrainedTokenizerBase):
-    global tokenizer
+# Per-process memo: all the questions of a recipe share the same context
+_doc_sub_token_counts: Dict[str, int] = {}
+
+
+def convert_example_to_features_init(tokenizer_for_convert: PreTrainedTokenizerBase,
+                                     feature_tensors: Dict[str, torch.Tensor] = None):
+    global tokenizer, shared_feature_tensors
     tokenizer = tokenizer_for_convert
+    shared_feature_tensors = feature_tensors
+    _doc_sub_token_counts.clear()
+
+
+def _count_spans(num_doc_tokens: int, query_length: int, max_seq_length: int, doc_stride: int,
+                 sequence_pair_added_tokens: int) -> int:
+    """Number of doc spans produced by the sliding window in convert_example_to_features."""
+    paragraph_capacity = max_seq_length - query_length - sequence_pair_added_tokens
+    num_spans = 0
+    while num_spans * doc_stride < num_doc_tokens:
+        num_spans += 1
+        if num_doc_tokens - (num_spans - 1) * doc_stride <= paragraph_capacity:
+            break  # the remaining tokens fit, no overflow
+    return num_spans
+
+
+def count_example_features(example, max_seq_length, doc_stride, max_query_length, is_training, tokenizer) -> int:
+    """
+    First pass of convert_examples_to_features: the number of features convert_example_to_features will produce,
+    without encoding the spans. The document is sub-tokenized once per distinct context.
+    """
+    if not _is_answer_in_text(example, is_training):
+        return 0
+
+    if example.context_text not in _doc_sub_token_counts:
+        _doc_sub_token_counts[example.context_text] = sum(
+            len(_sub_tokenize(token, tokenizer)) for token in example.doc_tokens
+        )
+    num_doc_tokens = _doc_sub_token_counts[example.context_text]
+
+    query_length = len(tokenizer.encode(
+        example.question_text, add_special_tokens=False, truncation=True, max_length=max_query_length
+    ))
+    sequence_pair_added_tokens = tokenizer.model_max_length - tokenizer.max_len_sentences_pair
+    return _count_spans(num_doc_tokens, query_length, max_seq_length, doc_stride, sequence_pair_added_tokens)
+
+
+def convert_example_to_shared_features(example_and_rows: Tuple["SemEvalExample", int, int], **kwargs):
+    """
+    Second pass of convert_examples_to_features: converts the example and writes its model inputs straight into
+    the shared feature tensors, starting at the given row. Only the light-weight metadata is sent back.
+    """
+    example, first_row, expected_num_features = example_and_rows
+    features = convert_example_to_features(example, **kwargs)
+    if len(features) != expected_num_features:
+        raise ValueError(f"Example {example.qas_id}: expected {expected_num_features} features,"
+                         f" got {len(features)}")
+
+    _move_to_feature_tensors(features, shared_feature_tensors, first_row)
+    return features
+
+
+def _move_to_feature_tensors(features: List["SemEvalFeatures"], feature_tensors: Dict[str, torch.Tensor],
+                             first_row: int) -> None:
+    """Writes the model inputs of the features into their rows of the feature tensors, then drops them."""
+    for row, feature in enumerate(features, start=first_row):
+        for name in ["input_ids", "attention_mask", "token_type_ids", "p_mask"]:
+            values = getattr(feature, name)
+            feature_tensors[name][row, :len(values)] = torch.as_tensor(values)
+            setattr(feature, name, None)
+
+
+def _allocate_shared_feature_tensors(num_features: int, max_seq_length: int, pad_token_id: int) \
+        -> Dict[str, torch.Tensor]:
+    shape = (num_features, max_seq_length)
+    return {
+        "input_ids": torch.full(shape, pad_token_id, dtype=torch.long).share_memory_(),
+        "attention_mask": torch.zeros(shape, dtype=torch.long).share_memory_(),
+        "token_type_ids": torch.zeros(shape, dtype=torch.long).share_memory_(),
+        "p_mask": torch.ones(shape, dtype=torch.float).share_memory_(),
+    }
+
+
+@contextmanager
+def _worker_map(threads: int, initargs: tuple):
+    """
+    imap over a pool of initialized workers. With a single thread everything runs in-process,
+    which avoids starting a pool for small (e.g. online) batches.
+    """
+    if threads > 1:
+        with Pool(threads, initializer=convert_example_to_features_init, initargs=initargs) as p:
+            yield partial(p.imap, chunksize=32)
+    else:
+        convert_example_to_features_init(*initargs)
+        yield map
 
 
 def convert_examples_to_features(examples, tokenizer, max_seq_length, doc_stride, max_query_length,
@@ -297,6 +399,11 @@ def convert_examples_to_features(examples, tokenizer, max_seq_length, doc_stride
     Converts a list of examples into a list of features that can be directly given as input to a model. It is
     model-dependant and takes advantage of many of the tokenizer's features to create the model's inputs.
 
+    The conversion runs in two passes. The first one counts the features of every example, so that the input
+    tensors can be preallocated in shared memory. In the second one the workers write input_ids, attention_mask,
+    token_type_ids and p_mask directly into their rows of these tensors; the returned features keep only the
+    metadata needed for post-processing (those four fields are set to None).
+
     Args:
         examples: list of :class:`~transformers.data.processors.squad.SquadExample`
         tokenizer: an instance of a child of :class:`~transformers.PreTrainedTokenizer`
@@ -326,9 +433,30 @@ def convert_examples_to_features(examples, tokenizer, max_seq_length, doc_stride
     """
     # Defining helper methods
     threads = min(threads, cpu_count())
-    with Pool(threads, initializer=convert_example_to_features_init, initargs=(tokenizer,)) as p:
+    with _worker_map(threads, initargs=(tokenizer,)) as imap:
+        count_ = partial(
+            count_example_features,
+            max_seq_length=max_seq_length,
+            doc_stride=doc_stride,
+            max_query_length=max_query_length,
+            is_training=is_training,
+            tokenizer=tokenizer
+        )
+        num_features_per_example = list(
+            tqdm(
+                imap(count_, examples),
+                total=len(examples),
+                desc="count features per example",
+                disable=not tqdm_enabled,
+            )
+        )
+
+    first_rows = np.concatenate([[0], np.cumsum(num_features_per_example)]).tolist()
+    feature_tensors = _allocate_shared_feature_tensors(first_rows[-1], max_seq_length, tokenizer.pad_token_id)
+
+    with _worker_map(threads, initargs=(tokenizer, feature_tensors)) as imap:
         annotate_ = partial(
-            convert_example_to_features,
+            convert_example_to_shared_features,
             max_seq_length=max_seq_length,
             doc_stride=doc_stride,
             max_query_length=max_query_length,
@@ -338,18 +466,26 @@ def convert_examples_to_features(examples, tokenizer, max_seq_length, doc_stride
         )
         features = list(
             tqdm(
-                p.imap(annotate_, examples, chunksize=32),
+                imap(annotate_, zip(examples, first_rows, num_features_per_example)),
                 total=len(examples),
                 desc="convert squad examples to features",
                 disable=not tqdm_enabled,
             )
         )
 
+    features = _index_features(features, tqdm_enabled)
+    return features, _build_dataset(features, feature_tensors, is_training)
+
+
+def _index_features(features_per_example: List[List["SemEvalFeatures"]], tqdm_enabled: bool) \
+        -> List["SemEvalFeatures"]:
+    """Sets the example index (skipping the examples without features) and the unique id of the features."""
     new_features = []
     unique_id = 1000000000
     example_index = 0
     for example_features in tqdm(
-        features, total=len(features), desc="add example index and unique id", disable=not tqdm_enabled
+        features_per_example, total=len(features_per_example), desc="add example index and unique id",
+        disable=not tqdm_enabled
     ):
         if not example_features:
             continue
@@ -359,15 +495,17 @@ def convert_examples_to_features(examples, tokenizer, max_seq_length, doc_stride
             new_features.append(example_feature)
             unique_id += 1
         example_index += 1
-    features = new_features
-    del new_features
+    return new_features
 
-    # Convert to Tensors and build dataset
-    all_input_ids = torch.tensor([f.input_ids for f in features], dtype=torch.long)
-    all_attention_masks = torch.tensor([f.attention_mask for f in features], dtype=torch.long)
-    all_token_type_ids = torch.tensor([f.token_type_ids for f in features], dtype=torch.long)
+
+def _build_dataset(features: List["SemEvalFeatures"], feature_tensors: Dict[str, torch.Tensor],
+                   is_training: bool) -> TensorDataset:
+    # Build the dataset on top of the feature tensors (no copy)
+    all_input_ids = feature_tensors["input_ids"]
+    all_attention_masks = feature_tensors["attention_mask"]
+    all_token_type_ids = feature_tensors["token_type_ids"]
+    all_p_mask = feature_tensors["p_mask"]
     all_cls_index = torch.tensor([f.cls_index for f in features], dtype=torch.long)
-    all_p_mask = torch.tensor([f.p_mask for f in features], dtype=torch.float)
     all_is_impossible = torch.tensor([f.is_impossible for f in features], dtype=torch.float)
 
     if not is_training:
@@ -389,7 +527,227 @@ def convert_examples_to_features(examples, tokenizer, max_seq_length, doc_stride
             all_is_impossible,
         )
 
-    return features, dataset
+    return dataset
+
+
+def supports_fast_features(tokenizer: PreTrainedTokenizerBase) -> bool:
+    """
+    convert_examples_to_features_fast needs a fast WordPiece tokenizer (BERT, ELECTRA...) padding on the right:
+    for those, tokenizing the whole context gives the same tokens as tokenizing it word by word.
+    """
+    return getattr(tokenizer, "is_fast", False) and tokenizer.padding_side == "right" \
+        and type(tokenizer.backend_tokenizer.model).__name__ == "WordPiece"
+
+
+def _max_context_positions(spans: List[Dict[str, int]]) -> List[Dict[int, bool]]:
+    """_new_check_is_max_context for all the positions of all the spans, in one pass over the spans."""
+    best = {}
+    for span_index, span in enumerate(spans):
+        for j in range(span["length"]):
+            score = min(j, span["length"] - 1 - j) + 0.01 * span["length"]
+            position = span["start"] + j
+            if position not in best or score > best[position][0]:
+                best[position] = (score, span_index)
+    return [{j: best[span["start"] + j][1] == span_index for j in range(span["length"])}
+            for span_index, span in enumerate(spans)]
+
+
+def _fast_example_features(example, encoded: BatchEncoding, windows: List[int], query_ids: List[int],
+                           capacity: int, doc_stride: int, is_training: bool, tokenizer) -> List["SemEvalFeatures"]:
+    """
+    The features of convert_example_to_features, built from the overflowing windows of the fast tokenizer:
+    the offset mapping gives the original word of every context token.
+    """
+    sequence_added_tokens = tokenizer.model_max_length - tokenizer.max_len_single_sentence
+    query_offset = len(query_ids) + sequence_added_tokens
+
+    spans = []
+    for window in windows:
+        sequence_ids = encoded.sequence_ids(window)
+        context_positions = [i for i, sequence_id in enumerate(sequence_ids) if sequence_id == 1]
+        if [encoded["input_ids"][window][i] for i, sequence_id in enumerate(sequence_ids) if sequence_id == 0] \
+                != query_ids or (context_positions and context_positions[0] != query_offset):
+            raise ValueError(f"Example {example.qas_id}: the fast tokenizer encodes the question differently,"
+                             f" use the slow tokenizer")
+        spans.append({"start": len(spans) * doc_stride, "length": len(context_positions)})
+
+    num_doc_tokens = spans[-1]["start"] + spans[-1]["length"]
+    if num_doc_tokens == 0:
+        return []
+    if any(span["length"] != min(num_doc_tokens - span["start"], capacity) for span in spans):
+        raise ValueError(f"Example {example.qas_id}: unexpected windows of the fast tokenizer,"
+                         f" use the slow tokenizer")
+
+    # the sub-tokens of the whole document, as convert_example_to_features sees them
+    all_doc_tokens = [None] * num_doc_tokens
+    tok_to_orig_index = [0] * num_doc_tokens
+    for window, span in zip(windows, spans):
+        tokens = encoded.tokens(window)
+        offsets = encoded["offset_mapping"][window]
+        for j in range(span["length"]):
+            all_doc_tokens[span["start"] + j] = tokens[query_offset + j]
+            tok_to_orig_index[span["start"] + j] = example.char_to_word_offset[offsets[query_offset + j][0]]
+
+    if is_training and not example.is_impossible:
+        tok_start_position = bisect_left(tok_to_orig_index, example.start_position)
+        tok_end_position = bisect_left(tok_to_orig_index, example.end_position + 1) - 1
+        (tok_start_position, tok_end_position) = _improve_answer_span(
+            all_doc_tokens, tok_start_position, tok_end_position, tokenizer, example.answer_text
+        )
+
+    features = []
+    for window, span, token_is_max_context in zip(windows, spans, _max_context_positions(spans)):
+        input_ids = encoded["input_ids"][window]
+        token_type_ids = encoded["token_type_ids"][window]
+        attention_mask = encoded["attention_mask"][window]
+        cls_index = input_ids.index(tokenizer.cls_token_id)
+
+        p_mask = np.ones_like(token_type_ids)
+        p_mask[query_offset:] = 0
+        special_token_indices = np.asarray(
+            tokenizer.get_special_tokens_mask(input_ids, already_has_special_tokens=True)
+        ).nonzero()
+        p_mask[special_token_indices] = 1
+        p_mask[cls_index] = 0
+
+        span_is_impossible = example.is_impossible
+        start_position = 0
+        end_position = 0
+        if is_training and not span_is_impossible:
+            doc_start = span["start"]
+            doc_end = span["start"] + span["length"] - 1
+            if not (tok_start_position >= doc_start and tok_end_position <= doc_end):
+                start_position = cls_index
+                end_position = cls_index
+                span_is_impossible = True
+            else:
+                start_position = tok_start_position - doc_start + query_offset
+                end_position = tok_end_position - doc_start + query_offset
+
+        features.append(
+            SemEvalFeatures(
+                input_ids,
+                attention_mask,
+                token_type_ids,
+                cls_index,
+                p_mask.tolist(),
+                example_index=0,
+                unique_id=0,
+                paragraph_len=span["length"],
+                token_is_max_context={query_offset + j: value for j, value in token_is_max_context.items()},
+                tokens=encoded.tokens(window)[:sum(attention_mask)],
+                token_to_orig_map={query_offset + j: tok_to_orig_index[span["start"] + j]
+                                   for j in range(span["length"])},
+                start_position=start_position,
+                end_position=end_position,
+                is_impossible=span_is_impossible,
+                qas_id=example.qas_id,
+            )
+        )
+    return features
+
+
+def count_examples_features_fast(examples, tokenizer, max_seq_length, doc_stride, max_query_length, is_training,
+                                 batch_size=1024) -> List[int]:
+    """
+    First pass of convert_examples_to_features_fast: count_example_features of every example, with the questions and
+    the distinct contexts of a batch encoded at once.
+    """
+    sequence_pair_added_tokens = tokenizer.model_max_length - tokenizer.max_len_sentences_pair
+    doc_token_counts = {}
+    num_features_per_example = []
+    for batch_start in range(0, len(examples), batch_size):
+        batch = examples[batch_start: batch_start + batch_size]
+        contexts = list(dict.fromkeys(
+            example.context_text for example in batch if example.context_text not in doc_token_counts
+        ))
+        if contexts:
+            encoded_contexts = tokenizer(contexts, add_special_tokens=False)["input_ids"]
+            doc_token_counts.update(zip(contexts, [len(context_ids) for context_ids in encoded_contexts]))
+        queries = tokenizer([example.question_text for example in batch], add_special_tokens=False)["input_ids"]
+
+        for example, query_ids in zip(batch, queries):
+            num_features_per_example.append(_count_spans(
+                doc_token_counts[example.context_text], min(len(query_ids), max_query_length), max_seq_length,
+                doc_stride, sequence_pair_added_tokens
+            ) if _is_answer_in_text(example, is_training) else 0)
+    return num_features_per_example
+
+
+def convert_examples_to_features_fast(examples, tokenizer, max_seq_length, doc_stride, max_query_length,
+                                      is_training, batch_size=1024, tqdm_enabled=True):
+    """
+    Same features and dataset as convert_examples_to_features (with the default padding), built with a fast
+    tokenizer (see supports_fast_features): the questions and the contexts of a batch of examples are encoded at
+    once, with return_overflowing_tokens and a stride giving the doc_stride windows, and the offset mapping replaces
+    the word by word sub-tokenization of the contexts. The examples of a batch are grouped by the length of their
+    truncated question, which sets the stride. As in convert_examples_to_features, the features are counted first
+    and the model inputs of every batch are written into the preallocated feature tensors.
+
+    Args:
+        batch_size: number of examples encoded at once.
+    """
+    if not supports_fast_features(tokenizer):
+        raise ValueError(f"Fast features need a fast WordPiece tokenizer padding on the right, got {type(tokenizer)}")
+
+    num_features_per_example = count_examples_features_fast(
+        examples, tokenizer, max_seq_length, doc_stride, max_query_length, is_training, batch_size
+    )
+    feature_tensors = _allocate_shared_feature_tensors(sum(num_features_per_example), max_seq_length,
+                                                       tokenizer.pad_token_id)
+
+    sequence_pair_added_tokens = tokenizer.model_max_length - tokenizer.max_len_sentences_pair
+    features_per_example = []
+    row = 0
+    for batch_start in tqdm(range(0, len(examples), batch_size), desc="convert squad examples to features (fast)",
+                            disable=not tqdm_enabled):
+        batch = [example for example in examples[batch_start: batch_start + batch_size]
+                 if _is_answer_in_text(example, is_training)]
+        queries = tokenizer([example.question_text for example in batch], add_special_tokens=False,
+                            return_offsets_mapping=True)
+
+        by_query_length = OrderedDict()
+        for example, query_ids, offsets in zip(batch, queries["input_ids"], queries["offset_mapping"]):
+            question_text = example.question_text
+            if len(query_ids) > max_query_length:
+                query_ids = query_ids[:max_query_length]
+                question_text = question_text[:offsets[max_query_length - 1][1]]
+            by_query_length.setdefault(len(query_ids), []).append((example, question_text, query_ids))
+
+        batch_features = {}
+        for query_length, group in by_query_length.items():
+            capacity = max_seq_length - query_length - sequence_pair_added_tokens
+            encoded = tokenizer(
+                [question_text for _, question_text, _ in group],
+                [example.context_text for example, _, _ in group],
+                truncation=TruncationStrategy.ONLY_SECOND.value,
+                padding="max_length",
+                max_length=max_seq_length,
+                stride=capacity - doc_stride,
+                return_overflowing_tokens=True,
+                return_offsets_mapping=True,
+                return_token_type_ids=True,
+            )
+            windows_per_example = [[] for _ in group]
+            for window, example_in_group in enumerate(encoded["overflow_to_sample_mapping"]):
+                windows_per_example[example_in_group].append(window)
+            for (example, _, query_ids), windows in zip(group, windows_per_example):
+                batch_features[id(example)] = _fast_example_features(
+                    example, encoded, windows, query_ids, capacity, doc_stride, is_training, tokenizer
+                )
+
+        for example, expected_num_features in zip(examples[batch_start: batch_start + batch_size],
+                                                  num_features_per_example[batch_start: batch_start + batch_size]):
+            example_features = batch_features.get(id(example), [])
+            if len(example_features) != expected_num_features:
+                raise ValueError(f"Example {example.qas_id}: expected {expected_num_features} features,"
+                                 f" got {len(example_features)}")
+            _move_to_feature_tensors(example_features, feature_tensors, row)
+            features_per_example.append(example_features)
+            row += len(example_features)
+
+    features = _index_features(features_per_example, tqdm_enabled)
+    return features, _build_dataset(features, feature_tensors, is_training)
 
 
 class SemEvalExample:
@@ -480,6 +838,9 @@ class SemEvalFeatures:
         start_position: start of the answer token index
         end_position: end of the answer token index
         encoding: optionally store the BatchEncoding with the fast-tokenizer alignment methods.
+
+    The real (not padded) length of the inputs is kept in `length`, also when the inputs are moved to the shared
+    feature tensors.
     """
 
     def __init__(
@@ -506,6 +867,7 @@ class SemEvalFeatures:
         self.token_type_ids = token_type_ids
         self.cls_index = cls_index
         self.p_mask = p_mask
+        self.length = int(sum(attention_mask)) if attention_mask is not None else None
 
         self.example_index = example_index
         self.unique_id = unique_id
@@ -559,20 +921,59 @@ class SemEvalProcessor:
 
         return recipes, examples
 
+    @staticmethod
+    def _title(recipe: Recipe) -> str:
+        url = recipe.metadata["url"]
+        return url[url.rfind("/") + 1:].replace("-", " ")
+
+    @staticmethod
+    def _context_text(recipe: Recipe, include_ingredients: bool) -> str:
+        context_text = ""
+        if include_ingredients:
+            ingredients = [ingredient.metadata["text"] for ingredient in recipe.new_pars["ingredients"]]
+            context_text += "\n".join(ingredients) + "\n"
+        context_text += recipe.steps_str
+        return context_text
+
+    @staticmethod
+    def create_examples_for_questions(questions: List[QuestionAnswerRecipe], include_ingredients: bool = False,
+                                      qas_ids: Optional[List[str]] = None) -> List[SemEvalExample]:
+        """
+        Evaluation examples for single questions, e.g. asked online. The answers (if any) are ignored.
+        :param qas_ids: unique id of every question, by default f"{recipe.id}-{question_class}" (not unique if
+            different recipes have the same id)
+        """
+        if qas_ids is None:
+            qas_ids = [f"{question.recipe.id}-{question.question_class}" for question in questions]
+        if len(qas_ids) != len(questions):
+            raise ValueError(f"Mismatching questions vs qas_ids = {len(questions)} vs {len(qas_ids)}")
+
+        contexts = {}  # by recipe text, the recipe id may be reused for another text
+        examples = []
+        for question, qas_id in zip(questions, qas_ids):
+            recipe = question.recipe
+            if recipe.new_pars_str not in contexts:
+                contexts[recipe.new_pars_str] = SemEvalProcessor._context_text(recipe, include_ingredients)
+            examples.append(
+                SemEvalExample(
+                    qas_id=qas_id,
+                    question_text=question.question,
+                    context_text=contexts[recipe.new_pars_str],
+                    answer_text=None,
+                    start_position_character=None,
+                    title=SemEvalProcessor._title(recipe),
+                )
+            )
+        return examples
+
     @staticmethod
     def _create_examples(recipes: List[Recipe], use_tqdm: bool, is_training: bool = False,
                          include_ingredients: bool = False) -> List[SemEvalExample]:
         examples = []
         iterator = tqdm(recipes) if use_tqdm else recipes
         for recipe in iterator:
-            url = recipe.metadata["url"]
-            title = url[url.rfind("/") + 1:].replace("-", " ")
-
-            context_text = ""
-            if include_ingredients:
-                ingredients = [ingredient.metadata["text"] for ingredient in recipe.new_pars["ingredients"]]
-                context_text += "\n".join(ingredients) + "\n"
-            context_text += recipe.steps_str
+            title = SemEvalProcessor._title(recipe)
+            context_text = SemEvalProcessor._context_text(recipe, include_ingredients)
 
             for qa in recipe.q_a:
                 qas_id = f"{recipe.id}-{qa.id}"
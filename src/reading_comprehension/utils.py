@@ -6,6 +6,8 @@ from typing import List, Dict, Any, Optional
 import numpy as np
 import torch
 import yaml
+from torch.utils.data import Sampler
+from torch.utils.data.dataloader import default_collate
 
 from src.get_root import get_root
 
@@ -115,6 +117,44 @@ class Prediction:
         self.probability = value
 
 
+class LengthGroupedSampler(Sampler):
+    """
+    Random order of the features in which consecutive features have similar lengths: the shuffled features are cut
+    into mega-batches of mega_batch_size batches, and every mega-batch is sorted by length (the longest first).
+    Batches taken in this order need little padding (see trim_padding_collate).
+    """
+
+    def __init__(self, lengths: List[int], batch_size: int, mega_batch_size: int = 50):
+        """
+        :param lengths: real (not padded) length of every feature
+        :param batch_size: size of the batches taken from the sampler
+        :param mega_batch_size: batches per mega-batch, the larger the closer the lengths within a batch
+        """
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.mega_batch_size = mega_batch_size
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __iter__(self):
+        indices = torch.randperm(len(self.lengths)).tolist()
+        mega_batch_length = self.batch_size * self.mega_batch_size
+        for start in range(0, len(indices), mega_batch_length):
+            mega_batch = indices[start: start + mega_batch_length]
+            yield from sorted(mega_batch, key=self.lengths.__getitem__, reverse=True)
+
+
+def trim_padding_collate(batch: List[tuple], attention_mask_index: int = 1) -> tuple:
+    """
+    Collates like the default DataLoader, then cuts the 2-dimensional tensors (ids, masks) after the longest
+    sequence of the batch. For right-padded features only.
+    """
+    collated = default_collate(batch)
+    batch_length = int(collated[attention_mask_index].sum(dim=1).max())
+    return tuple(t[:, :batch_length] if t.dim() == 2 else t for t in collated)
+
+
 def set_seed(n_gpu, seed: int = 42):
     random.seed(seed)
     np.random.seed(seed)
@@ -0,0 +1,36 @@
+from typing import Dict
+
+from src.pos_tagger import PosTagger
+from src.putty_lemmatizer import PuttyLemmatizer
+
+_inflect_engines: Dict[bool, "inflect.engine"] = {}
+
+
+def get_inflect_engine(classical: bool = False) -> "inflect.engine":
+    """
+    inflect is slow to import (~2s), it is imported at the first call
+    :param classical: True for an engine in the classical mode (engine.classical())
+    :return: engine shared by the whole process, do not change its mode
+    """
+    if classical not in _inflect_engines:
+        import inflect
+
+        engine = inflect.engine()
+        if classical:
+            engine.classical()
+        _inflect_engines[classical] = engine
+    return _inflect_engines[classical]
+
+
+def warm_up_linguistic_resources() -> None:
+    """
+    Loads upfront what the answerers would otherwise load when answering the first question:
+    WordNet, the POS tagger model, the inflect engines and the pyinflect tables
+    """
+    PuttyLemmatizer.get().warm_up()
+    PosTagger.get().tag(["preheat", "the", "oven"])
+    get_inflect_engine().plural_noun("pan")
+    get_inflect_engine(classical=True).plural_noun("pan")
+
+    from pyinflect import getInflection
+    getInflection("bake", "VBG", inflect_oov=True)
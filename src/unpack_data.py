@@ -1,14 +1,18 @@
 import copy
+import os
+import zlib
+from functools import wraps
 from io import open
 from random import randint
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 from conllu import parse, TokenList
-from tqdm import tqdm
 
 from src.get_root import get_root
 from src.annotated_recipe import AnnotatedRecipe
 
+T = TypeVar("T")
+
 
 class Q_A:
     def __init__(self, question: str, answer: str = ''):
@@ -40,6 +44,17 @@ class Recipe:
         self.new_pars_str: str = ''.join(recipe_raw[id_new_pars_start:])
         self.steps_str: str = self.return_recipe_steps()
         self.annotated_recipe = AnnotatedRecipe.parse_recipe_from_lines(recipe_raw)
+        self.position: Optional[int] = None  # index of the recipe in its dataset file, set by convert_dataset
+        self._derived: Dict[Tuple[Callable, Tuple], Any] = {}  # see cached_per_recipe
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_derived"] = {}  # rebuilt on demand, not worth pickling
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_derived", {})
 
     @staticmethod
     def return_recipe_for_test():
@@ -133,39 +148,132 @@ class Recipe:
         return temp
 
 
-def convert_train_data(use_tqdm: bool = True, limit_recipes=None) -> List[Recipe]:
+def convert_train_data(use_tqdm: bool = True, limit_recipes=None, shard: Tuple[int, int] = None) -> List[Recipe]:
     data_path = f'{get_root()}/modules/recipe2video/data/train/crl_srl.csv'
-    return convert_dataset(data_path, use_tqdm, limit_recipes)
+    return convert_dataset(data_path, use_tqdm, limit_recipes, shard)
 
 
-def convert_val_data(use_tqdm: bool = True, limit_recipes=None) -> List[Recipe]:
+def convert_val_data(use_tqdm: bool = True, limit_recipes=None, shard: Tuple[int, int] = None) -> List[Recipe]:
     data_path = f'{get_root()}/modules/recipe2video/data/val/crl_srl.csv'
-    return convert_dataset(data_path, use_tqdm, limit_recipes)
+    return convert_dataset(data_path, use_tqdm, limit_recipes, shard)
 
 
-def convert_test_data(use_tqdm: bool = True, limit_recipes=None) -> List[Recipe]:
+def convert_test_data(use_tqdm: bool = True, limit_recipes=None, shard: Tuple[int, int] = None) -> List[Recipe]:
     data_path = f'{get_root()}/modules/recipe2video/data/test/test_WITH_ANSWERS.csv'
-    return convert_dataset(data_path, use_tqdm, limit_recipes)
+    return convert_dataset(data_path, use_tqdm, limit_recipes, shard)
 
 
-def convert_dataset(data_path: str, use_tqdm: bool, limit_recipes=None) -> List[Recipe]:
-    recipes = []
+def iter_raw_recipes(lines: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Splits the lines of a dataset file into recipes, lazily
+    :param lines: lines of the dataset (e.g. an open file or sys.stdin)
+    :return: the lines of each recipe, to be passed to Recipe()
+    """
     recipe = []
+    for line in lines:
+        if recipe and 'newdoc id' in line:
+            yield recipe
+            recipe = []
+        recipe.append(line)
+    if recipe:
+        yield recipe
+
+
+def recipe_shard(recipe_id: str, num_shards: int) -> int:
+    """
+    :return: the shard of the recipe, stable across processes and machines (unlike hash())
+    """
+    return zlib.crc32(recipe_id.encode("utf-8")) % num_shards
+
+
+# data path -> ((modification time, size) of the file, all its recipes), see load_recipes
+_parsed_datasets: Dict[str, Tuple[Tuple[int, int], List[Recipe]]] = {}
+
+
+def _file_version(data_path: str) -> Tuple[int, int]:
+    stat = os.stat(data_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached_recipes(data_path: str) -> Optional[List[Recipe]]:
+    cached = _parsed_datasets.get(data_path)
+    return cached[1] if cached is not None and cached[0] == _file_version(data_path) else None
+
+
+def load_recipes(data_path: str, use_tqdm: bool = False) -> List[Recipe]:
+    """
+    Parses the dataset file once per process: the next calls (e.g. the statistics tools and the prediction run)
+    share the same Recipe objects, until the file changes
+    :param data_path: dataset file
+    :param use_tqdm: show a progress bar if the file has to be parsed
+    :return: all the recipes of the file
+    """
+    recipes = _cached_recipes(data_path)
+    if recipes is None:
+        version = _file_version(data_path)
+        recipes = _parse_dataset(data_path, use_tqdm)
+        _parsed_datasets[data_path] = (version, recipes)
+    return list(recipes)
+
+
+def convert_dataset(data_path: str, use_tqdm: bool, limit_recipes=None, shard: Tuple[int, int] = None) -> List[Recipe]:
+    """
+    :param data_path: dataset file
+    :param use_tqdm: show a progress bar
+    :param limit_recipes: break after this recipe (default = None = no limit)
+    :param shard: (shard index, number of shards) - keep only the recipes of the shard (see recipe_shard)
+    :return: parsed recipes, shared with the other calls for the whole file (see load_recipes)
+    """
+    if shard is not None and not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Incorrect shard = {shard}, expecting (shard index, number of shards)")
+
+    if shard is None and not limit_recipes:
+        return load_recipes(data_path, use_tqdm)
+
+    cached = _cached_recipes(data_path)
+    if cached is None:
+        return _parse_dataset(data_path, use_tqdm, limit_recipes, shard)
+
+    recipes = [recipe for recipe in cached if shard is None or recipe_shard(recipe.id, shard[1]) == shard[0]]
+    return recipes[:limit_recipes] if limit_recipes else recipes
+
+
+def _parse_dataset(data_path: str, use_tqdm: bool, limit_recipes=None, shard: Tuple[int, int] = None) -> List[Recipe]:
+    recipes = []
     with open(data_path, 'r', encoding='utf-8') as f:
         data = list(f)
 
-    iterator = tqdm(data, desc="parsing") if use_tqdm else data
-    for d in iterator:
-        if recipe and 'newdoc id' in d:
-            recipes.append(Recipe(recipe))
-            recipe = []
-        recipe.append(d)
+    if use_tqdm:
+        from tqdm import tqdm
+        iterator = tqdm(data, desc="parsing")
+    else:
+        iterator = data
+    for position, recipe_raw in enumerate(iter_raw_recipes(iterator)):
+        if shard is not None and recipe_shard(recipe_raw[0].split(' = ')[1].strip(), shard[1]) != shard[0]:
+            continue
+        recipes.append(Recipe(recipe_raw))
+        recipes[-1].position = position
         if limit_recipes and len(recipes) >= limit_recipes:
-            return recipes
-    recipes.append(Recipe(recipe))
+            break
     return recipes
 
 
+def cached_per_recipe(build: Callable[..., T]) -> Callable[..., T]:
+    """
+    Decorator of functions of a recipe (and of hashable arguments), whose result is built on first use and then kept
+    in the recipe, so it is freed with the recipe
+    """
+
+    @wraps(build)
+    def wrapper(recipe: Recipe, *args) -> T:
+        key = (build, args)
+        if key not in recipe._derived:
+            recipe._derived[key] = build(recipe, *args)
+        return recipe._derived[key]
+
+    return wrapper
+
+
 class QuestionAnswerRecipe:
 
     def __init__(self, qa: Q_A, recipe: Recipe):
@@ -0,0 +1,272 @@
+import logging
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertForQuestionAnswering, BertTokenizerFast
+from transformers.data.metrics.squad_metrics import _get_best_indexes
+
+from src.reading_comprehension.extractive_qa_engine import ReadingComprehension
+from src.reading_comprehension.processors import SemEvalProcessor
+from src.reading_comprehension.utils import AttrDict, Prediction
+from src.unpack_data import Recipe
+
+MAX_SEQ_LENGTH = 64
+
+
+def random_features(rng: np.random.Generator, num_features: int, seq_length: int) -> List[SimpleNamespace]:
+    """
+    Features with a question of a few tokens, then a context of random length, whose max context is random
+    """
+    features = []
+    for _ in range(num_features):
+        num_tokens = int(rng.integers(seq_length // 2, seq_length + 1))
+        context = range(int(rng.integers(3, 8)), num_tokens - 1)
+        features.append(SimpleNamespace(
+            tokens=["tok"] * num_tokens,
+            token_to_orig_map={idx: idx for idx in context},
+            token_is_max_context={idx: bool(rng.random() < 0.8) for idx in context},
+        ))
+    return features
+
+
+def ranked_span_predictions_loop(features, start_logits, end_logits, null_prediction, n_best_size: int,
+                                 max_answer_length: int) -> List[Prediction]:
+    """
+    The original n-best loop over the start and end positions of every feature, then sorted by score
+    """
+    prelim_predictions = []
+    for feature_index, feature in enumerate(features):
+        start_indexes = _get_best_indexes(start_logits[feature_index].tolist(), n_best_size)
+        end_indexes = _get_best_indexes(end_logits[feature_index].tolist(), n_best_size)
+        for start_idx in start_indexes:
+            for end_idx in end_indexes:
+                valid_start_idx = start_idx < len(feature.tokens) and start_idx in feature.token_to_orig_map
+                is_max_start_idx = feature.token_is_max_context.get(start_idx, False)
+                valid_end_idx = len(feature.tokens) > end_idx >= start_idx and end_idx in feature.token_to_orig_map
+                answer_too_long = end_idx - start_idx + 1 > max_answer_length
+                if valid_start_idx and is_max_start_idx and valid_end_idx and not answer_too_long:
+                    prelim_predictions.append(Prediction(
+                        feature_index=feature_index,
+                        start_index=start_idx,
+                        end_index=end_idx,
+                        start_logit=float(start_logits[feature_index, start_idx]),
+                        end_logit=float(end_logits[feature_index, end_idx]),
+                    ))
+    prelim_predictions.append(null_prediction)
+    return sorted(prelim_predictions, key=lambda pred: pred.start_logit + pred.end_logit, reverse=True)
+
+
+def summary(predictions) -> list:
+    return [(p.feature_index, p.start_index, p.end_index, p.start_logit, p.end_logit) for p in predictions]
+
+
+class TestRankedSpanPredictions(unittest.TestCase):
+
+    def assert_same_ranking(self, seed: int, n_best_size: int, max_answer_length: int, decimals: int = None,
+                            null_shift: float = 0.0, num_features: int = 3, seq_length: int = 48) -> List[Prediction]:
+        rng = np.random.default_rng(seed)
+        features = random_features(rng, num_features, seq_length)
+        start_logits = rng.normal(size=(num_features, seq_length))
+        end_logits = rng.normal(size=(num_features, seq_length))
+        if decimals is not None:  # many ties
+            start_logits, end_logits = np.round(start_logits, decimals), np.round(end_logits, decimals)
+        start_logits[:, 0] += null_shift
+        end_logits[:, 0] += null_shift
+
+        feature_null_scores = start_logits[:, 0] + end_logits[:, 0]
+        null_index = int(np.argmin(feature_null_scores))
+        null_prediction = Prediction(feature_index=null_index, start_index=0, end_index=0,
+                                     start_logit=float(start_logits[null_index, 0]),
+                                     end_logit=float(end_logits[null_index, 0]))
+
+        engine = ReadingComprehension.__new__(ReadingComprehension)
+        engine.args = AttrDict(n_best_size=n_best_size, max_answer_length=max_answer_length)
+        actual = list(engine._ranked_span_predictions(features, start_logits, end_logits, null_prediction))
+        expected = ranked_span_predictions_loop(features, start_logits, end_logits, null_prediction, n_best_size,
+                                                max_answer_length)
+
+        self.assertEqual(summary(expected), summary(actual))
+        self.assertEqual(1, sum(prediction is null_prediction for prediction in actual))
+        return actual
+
+    def test_random_logits(self):
+        for seed in range(10):
+            self.assertGreater(len(self.assert_same_ranking(seed, n_best_size=20, max_answer_length=30)), 20)
+
+    def test_ties(self):
+        for seed in range(10):
+            self.assert_same_ranking(seed, n_best_size=20, max_answer_length=30, decimals=0)
+            self.assert_same_ranking(seed, n_best_size=10, max_answer_length=30, decimals=1)
+
+    def test_null_prediction_first_and_last(self):
+        for seed in range(5):
+            first = self.assert_same_ranking(seed, n_best_size=20, max_answer_length=30, null_shift=10.0)
+            self.assertEqual(0, first[0].start_index)
+            last = self.assert_same_ranking(seed, n_best_size=20, max_answer_length=30, null_shift=-10.0)
+            self.assertEqual(0, last[-1].start_index)
+
+    def test_max_answer_length_and_n_best_size(self):
+        for seed in range(5):
+            self.assert_same_ranking(seed, n_best_size=20, max_answer_length=1)
+            self.assert_same_ranking(seed, n_best_size=20, max_answer_length=3, decimals=0)
+            self.assert_same_ranking(seed, n_best_size=100, max_answer_length=30, seq_length=16)
+            self.assert_same_ranking(seed, n_best_size=5, max_answer_length=30, num_features=1)
+
+
+def tiny_engine(**args) -> ReadingComprehension:
+    """
+    Engine with a tiny randomly initialised BERT model and a character vocabulary, on the questions of the test recipe
+    (features of mixed lengths: the last window of every question is shorter)
+    """
+    recipe = Recipe.return_recipe_for_test()
+    examples = SemEvalProcessor._create_examples([recipe], use_tqdm=False, include_ingredients=True)
+    text = recipe.new_pars_str + " ".join(qa.q for qa in recipe.q_a)
+    chars = sorted({c for c in text.lower() if not c.isspace()})
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vocab_path = os.path.join(tmp_dir, "vocab.txt")
+        with open(vocab_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + ["##" + c for c in chars]))
+        tokenizer = BertTokenizerFast(vocab_path, do_lower_case=True)
+
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=tokenizer.vocab_size, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=MAX_SEQ_LENGTH)
+
+    engine = ReadingComprehension.__new__(ReadingComprehension)
+    engine.args = AttrDict(model_type="bert", max_seq_length=MAX_SEQ_LENGTH, doc_stride=32, max_query_length=24,
+                           per_gpu_eval_batch_size=4, n_gpu=0, device=torch.device("cpu"), local_rank=-1,
+                           n_best_size=20, max_answer_length=30, do_lower_case=True, verbose_logging=False,
+                           set_type="val", use_fast_tokenizer=True, **args)
+    engine.logger = logging.getLogger("test_extractive_qa_engine")
+    engine.model, engine.tokenizer = BertForQuestionAnswering(config).eval(), tokenizer
+    engine.inference_model = None
+    engine.eval_features, engine.eval_dataset = engine.convert_examples(examples, is_training=False,
+                                                                        tqdm_enabled=False)
+    engine.eval_data = {"recipes": [recipe], "examples": examples}
+    return engine
+
+
+class TestDynamicPadding(unittest.TestCase):
+
+    def test_same_results_as_padded(self):
+        engine = tiny_engine()
+        lengths = engine.eval_dataset.tensors[1].sum(dim=1).tolist()
+        self.assertGreater(len(set(lengths)), 2)
+        self.assertLess(min(lengths), MAX_SEQ_LENGTH)
+        self.assertNotEqual(lengths, sorted(lengths))  # the length buckets change the order
+
+        padded = engine.predict_logits(dynamic_padding=False)
+        dynamic = engine.predict_logits(dynamic_padding=True)
+
+        self.assertEqual([feature.unique_id for feature in engine.eval_features], [r.unique_id for r in dynamic])
+        self.assertEqual([r.unique_id for r in padded], [r.unique_id for r in dynamic])
+        for expected, actual, length in zip(padded, dynamic, lengths):
+            for expected_logits, actual_logits in [(expected.start_logits, actual.start_logits),
+                                                   (expected.end_logits, actual.end_logits)]:
+                self.assertEqual((MAX_SEQ_LENGTH,), actual_logits.shape)
+                np.testing.assert_allclose(expected_logits[:length], actual_logits[:length], rtol=1e-4, atol=1e-5)
+                self.assertTrue(np.all(np.isneginf(actual_logits[length:])))
+
+    def test_same_predictions_as_padded(self):
+        engine = tiny_engine()
+        padded = engine.compute_predictions_logits(engine.predict_logits(dynamic_padding=False))
+        dynamic = engine.compute_predictions_logits(engine.predict_logits(dynamic_padding=True))
+        self.assertEqual(list(padded), list(dynamic))
+        self.assertEqual([nbest[0].text for nbest in padded.values()], [nbest[0].text for nbest in dynamic.values()])
+
+
+class TestInferenceModel(unittest.TestCase):
+
+    def test_quantized_linear_layers(self):
+        engine = tiny_engine()
+        state = {name: tensor.clone() for name, tensor in engine.model.state_dict().items()}
+        model = engine.build_inference_model(quantize=True)
+
+        self.assertIsNot(engine.model, model)
+        quantized = [m for m in model.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+        self.assertEqual(len([m for m in engine.model.modules() if isinstance(m, torch.nn.Linear)]), len(quantized))
+        self.assertFalse(any(type(m) is torch.nn.Linear for m in model.modules()))
+
+        # the fp32 model is left unchanged
+        self.assertFalse(any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in engine.model.modules()))
+        self.assertEqual(list(state), list(engine.model.state_dict()))
+        for name, tensor in engine.model.state_dict().items():
+            self.assertTrue(torch.equal(state[name], tensor), name)
+        self.assertIs(engine.model, engine.build_inference_model())
+
+    def test_predict_with_quantized_models(self):
+        engine = tiny_engine()
+        expected = engine.predict_logits()
+        for torchscript in [False, True]:
+            model = engine.build_inference_model(quantize=True, torchscript=torchscript)
+            self.assertEqual(torchscript, isinstance(model, torch.jit.ScriptModule))
+            results = engine.predict_logits(model=model)
+            self.assertEqual([r.unique_id for r in expected], [r.unique_id for r in results])
+            for expected_result, result in zip(expected, results):
+                self.assertEqual((MAX_SEQ_LENGTH,), result.start_logits.shape)
+                self.assertTrue(np.all(np.isfinite(result.start_logits)) and np.all(np.isfinite(result.end_logits)))
+                np.testing.assert_allclose(expected_result.start_logits, result.start_logits, atol=0.05)
+
+        engine.args.dynamic_padding = True  # ignored by the traced model
+        traced = engine.build_inference_model(quantize=True, torchscript=True)
+        self.assertEqual(len(expected), len(engine.predict_logits(dynamic_padding=True, model=traced)))
+
+    def test_inference_model_built_once(self):
+        engine = tiny_engine()
+        self.assertIs(engine.model, engine.get_inference_model())
+        self.assertIsNone(engine.inference_model)
+
+        engine.args.quantize = True
+        model = engine.get_inference_model()
+        self.assertIsNot(engine.model, model)
+        self.assertIs(model, engine.get_inference_model())
+        self.assertIs(model, engine.inference_model)
+        self.assertTrue(any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules()))
+
+    def test_score_predictions(self):
+        engine = tiny_engine()
+        examples = engine.eval_examples
+        self.assertTrue(any(example.is_impossible for example in examples))
+        # impossible questions are answered right by the null prediction (no text)
+        predictions = {example.qas_id: [Prediction(0.0, 0.0, text=example.answers[0]["text"] if example.answers
+                                                   else None)] for example in examples}
+        self.assertEqual((1.0, 1.0), engine.score_predictions(predictions))
+
+        predictions[examples[0].qas_id] = [Prediction(0.0, 0.0, text=None)]
+        f1, exact_match = engine.score_predictions(predictions)
+        self.assertAlmostEqual(1 - 1 / len(examples), exact_match)
+        self.assertAlmostEqual(1 - 1 / len(examples), f1)
+
+        examples[0].answers = []  # no known answer: skipped
+        self.assertEqual((1.0, 1.0), engine.score_predictions(predictions))
+
+        engine.eval_data = {"recipes": [], "examples": []}
+        with self.assertRaises(ValueError):
+            engine.score_predictions({})
+
+
+class TestBenchmarkQuantization(unittest.TestCase):
+
+    def test_same_padding_as_the_baseline(self):
+        stats = tiny_engine(dynamic_padding=True).benchmark_quantization()
+        self.assertEqual(["fp32", "int8", "fp32_padded", "int8_torchscript"], list(stats))
+        self.assertEqual(["dynamic", "dynamic", "padded", "padded"], [row["padding"] for row in stats.values()])
+        self.assertEqual(["fp32", "fp32", "fp32_padded", "fp32_padded"], [row["baseline"] for row in stats.values()])
+        for row in stats.values():
+            self.assertEqual(row["padding"], stats[row["baseline"]]["padding"])
+        self.assertEqual(1.0, stats["fp32_padded"]["speedup"])
+        self.assertEqual(0.0, stats["fp32_padded"]["F1 delta"])
+
+    def test_padded(self):
+        stats = tiny_engine(dynamic_padding=False).benchmark_quantization()
+        self.assertEqual(["fp32", "int8", "int8_torchscript"], list(stats))
+        self.assertEqual({"padded"}, {row["padding"] for row in stats.values()})
+        self.assertEqual({"fp32"}, {row["baseline"] for row in stats.values()})
+        for row in stats.values():
+            self.assertGreater(row["latency_ms"], 0)
+            self.assertAlmostEqual(row["F1"] - stats["fp32"]["F1"], row["F1 delta"])
@@ -0,0 +1,163 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from typing import Dict
+
+import torch
+from torch.utils.data import TensorDataset
+
+from src.reading_comprehension.feature_cache import CACHE_VERSION, FeatureCache, encode_feature
+from src.reading_comprehension.processors import SemEvalExample, SemEvalFeatures
+from src.unpack_data import Recipe
+
+SEQ_LENGTH = 8
+
+
+def make_feature(index: int, token_to_orig_map: Dict[int, int] = None,
+                 token_is_max_context: Dict[int, bool] = None) -> SemEvalFeatures:
+    if token_to_orig_map is None:
+        token_to_orig_map = {3 + i: index + i for i in range(4)}
+    if token_is_max_context is None:
+        token_is_max_context = {position: position % 2 == index % 2 for position in token_to_orig_map}
+    attention_mask = [1] * (SEQ_LENGTH - index % 3) + [0] * (index % 3)
+    feature = SemEvalFeatures(input_ids=list(range(SEQ_LENGTH)), attention_mask=attention_mask,
+                              token_type_ids=[0] * SEQ_LENGTH, cls_index=0, p_mask=[1] * SEQ_LENGTH,
+                              example_index=index // 2, unique_id=1000000000 + index, paragraph_len=4,
+                              token_is_max_context=token_is_max_context, tokens=[f"tok{i}" for i in range(SEQ_LENGTH)],
+                              token_to_orig_map=token_to_orig_map, start_position=index, end_position=index + 1,
+                              is_impossible=index % 2 == 0, qas_id=f"q-{index // 2}")
+    return feature
+
+
+def make_dataset(num_features: int) -> TensorDataset:
+    input_ids = torch.arange(num_features * SEQ_LENGTH, dtype=torch.long).view(num_features, SEQ_LENGTH)
+    p_mask = torch.rand(num_features, SEQ_LENGTH)
+    is_impossible = torch.arange(num_features, dtype=torch.float) % 2
+    return TensorDataset(input_ids, p_mask, is_impossible)
+
+
+def features_summary(feature: SemEvalFeatures) -> tuple:
+    return (feature.example_index, feature.unique_id, feature.paragraph_len, feature.cls_index,
+            feature.token_is_max_context, feature.tokens, feature.token_to_orig_map, feature.start_position,
+            feature.end_position, feature.is_impossible, feature.qas_id, feature.length)
+
+
+class TestFeatureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache")
+        self.params = {"max_seq_length": SEQ_LENGTH, "is_training": False}
+        self.features = [make_feature(i) for i in range(5)]
+        self.dataset = make_dataset(len(self.features))
+        self.recipes = [Recipe.return_recipe_for_test()]
+        self.examples = [SemEvalExample("q-0", "How many pans?", "one pan and two pans", "one", 0, "title")]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def save(self) -> None:
+        FeatureCache(self.path, self.params, shard_size=2).save(self.features, self.dataset, self.recipes,
+                                                                self.examples)
+
+    def test_round_trip(self):
+        self.assertFalse(FeatureCache(self.path, self.params).exists())
+        self.save()
+        cache = FeatureCache(self.path, dict(self.params), shard_size=3)
+        self.assertTrue(cache.exists())
+        loaded = cache.load()
+
+        features = loaded["features"]
+        self.assertEqual(len(self.features), len(features))
+        self.assertEqual([features_summary(f) for f in self.features], [features_summary(f) for f in features])
+        self.assertEqual(features_summary(self.features[-1]), features_summary(features[-1]))
+        self.assertEqual([3, 4], [f.unique_id - 1000000000 for f in features[3:]])
+        self.assertIsNone(features[0].input_ids)
+        with self.assertRaises(IndexError):
+            features[len(self.features)]
+
+        for expected, actual in zip(self.dataset.tensors, loaded["dataset"].tensors):
+            self.assertEqual(expected.dtype, actual.dtype)
+            self.assertTrue(torch.equal(expected, actual))
+
+        self.assertEqual([recipe.id for recipe in self.recipes], [recipe.id for recipe in loaded["recipes"]])
+        self.assertEqual(self.examples[0].doc_tokens, loaded["examples"][0].doc_tokens)
+        self.assertEqual(self.examples[0].start_position, loaded["examples"][0].start_position)
+
+    def test_empty_dataset(self):
+        self.features, self.dataset = [], make_dataset(0)
+        self.save()
+        loaded = FeatureCache(self.path, self.params).load()
+        self.assertEqual(0, len(loaded["features"]))
+        self.assertEqual([(0, SEQ_LENGTH), (0, SEQ_LENGTH), (0,)],
+                         [tuple(tensor.shape) for tensor in loaded["dataset"].tensors])
+
+    def test_other_params_or_version(self):
+        self.save()
+        self.assertFalse(FeatureCache(self.path, dict(self.params, max_seq_length=16)).exists())
+        self.assertFalse(FeatureCache(self.path, {"max_seq_length": SEQ_LENGTH}).exists())
+
+        manifest_path = os.path.join(self.path, "manifest.json")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["version"] = CACHE_VERSION + 1
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        self.assertFalse(FeatureCache(self.path, self.params).exists())
+
+        self.save()  # the outdated cache is replaced
+        self.assertTrue(FeatureCache(self.path, self.params).exists())
+
+    def test_interrupted_save(self):
+        self.save()
+        os.remove(os.path.join(self.path, "manifest.json"))
+        self.assertFalse(FeatureCache(self.path, self.params).exists())
+
+    def test_rebuild_examples(self):
+        self.save()
+        with open(os.path.join(self.path, "examples.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+
+        rebuilt = []
+
+        def rebuild():
+            rebuilt.append(True)
+            return self.recipes, self.examples
+
+        with self.assertRaises(pickle.UnpicklingError):
+            FeatureCache(self.path, self.params).load()["examples"]
+
+        loaded = FeatureCache(self.path, self.params).load(rebuild_examples=rebuild)
+        self.assertIs(self.examples, loaded["examples"])
+        self.assertIs(self.recipes, loaded["recipes"])
+        self.assertEqual(1, len(rebuilt))
+        self.assertEqual(len(self.features), len(loaded["features"]))
+
+    def test_truncated_examples(self):
+        self.save()
+        examples_path = os.path.join(self.path, "examples.pkl")
+        with open(examples_path, "rb") as f:
+            data = f.read()
+        with open(examples_path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        loaded = FeatureCache(self.path, self.params).load(rebuild_examples=lambda: (["recipe"], ["example"]))
+        self.assertEqual(["example"], loaded["examples"])
+
+    def test_encode_non_contiguous_feature(self):
+        encode_feature(make_feature(0))
+        with self.assertRaises(ValueError):
+            encode_feature(make_feature(0, token_to_orig_map={3: 0, 5: 1}, token_is_max_context={3: True, 5: True}))
+        with self.assertRaises(ValueError):
+            encode_feature(make_feature(0, token_to_orig_map={4: 0, 3: 1}, token_is_max_context={4: True, 3: True}))
+        with self.assertRaises(ValueError):
+            encode_feature(make_feature(0, token_to_orig_map={3: 0, 4: 1}, token_is_max_context={3: True}))
+        with self.assertRaises(ValueError):
+            FeatureCache(self.path, self.params).save([make_feature(0, token_to_orig_map={3: 0, 5: 1})],
+                                                      make_dataset(1), [], [])
+
+    def test_incorrect_shard_size(self):
+        with self.assertRaises(ValueError):
+            FeatureCache(self.path, self.params, shard_size=0)
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from transformers import BertTokenizer, BertTokenizerFast
+from transformers.models.bert.tokenization_bert import BasicTokenizer
+
+from src.reading_comprehension.processors import SemEvalProcessor, convert_examples_to_features, \
+    convert_examples_to_features_fast, supports_fast_features
+from src.unpack_data import Recipe
+
+
+def write_word_piece_vocab(path: str, recipe: Recipe) -> None:
+    """
+    Small vocabulary of the recipe: every character (with its ## form), every other word; words with 'q' become [UNK]
+    """
+    text = recipe.steps_str + " ".join(qa.q + " " + (qa.a or "") for qa in recipe.q_a)
+    words = sorted(set(BasicTokenizer(do_lower_case=True).tokenize(text)))
+    chars = sorted(set("".join(words)) - {"q"})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + ["##" + c for c in chars] + words[::2]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(dict.fromkeys(vocab)) + "\n")
+
+
+def features_summary(features, dataset):
+    return [(f.example_index, f.unique_id, f.cls_index, f.paragraph_len, f.token_is_max_context, f.tokens,
+             f.token_to_orig_map, f.start_position, f.end_position, f.is_impossible, f.qas_id, f.length,
+             tuple(t[i].tolist() for t in dataset.tensors))
+            for i, f in enumerate(features)]
+
+
+class TestFastFeatures(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.recipe = Recipe.return_recipe_for_test()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            vocab_path = os.path.join(tmp_dir, "vocab.txt")
+            write_word_piece_vocab(vocab_path, cls.recipe)
+            cls.slow_tokenizer = BertTokenizer(vocab_path, do_lower_case=True)
+            cls.fast_tokenizer = BertTokenizerFast(vocab_path, do_lower_case=True)
+
+    def assert_same_features(self, is_training: bool, max_seq_length: int, doc_stride: int, max_query_length: int):
+        examples = SemEvalProcessor._create_examples([self.recipe] * 2, use_tqdm=False, is_training=is_training,
+                                                     include_ingredients=True)
+        expected = convert_examples_to_features(examples, self.slow_tokenizer, max_seq_length, doc_stride,
+                                                max_query_length, is_training, tqdm_enabled=False)
+        actual = convert_examples_to_features_fast(examples, self.fast_tokenizer, max_seq_length, doc_stride,
+                                                   max_query_length, is_training, batch_size=10, tqdm_enabled=False)
+        self.assertGreater(len(expected[0]), len(examples))  # several windows per example
+        self.assertEqual(features_summary(*expected), features_summary(*actual))
+
+    def test_same_features_for_evaluation(self):
+        self.assert_same_features(is_training=False, max_seq_length=64, doc_stride=16, max_query_length=24)
+
+    def test_same_features_for_training(self):
+        self.assert_same_features(is_training=True, max_seq_length=64, doc_stride=16, max_query_length=24)
+
+    def test_truncated_questions_and_overlapping_windows(self):
+        self.assert_same_features(is_training=False, max_seq_length=40, doc_stride=8, max_query_length=4)
+        self.assert_same_features(is_training=True, max_seq_length=48, doc_stride=24, max_query_length=6)
+
+    def test_unsupported_tokenizer(self):
+        self.assertTrue(supports_fast_features(self.fast_tokenizer))
+        self.assertFalse(supports_fast_features(self.slow_tokenizer))
+        with self.assertRaises(ValueError):
+            convert_examples_to_features_fast([], self.slow_tokenizer, 64, 16, 64, is_training=False)
@@ -0,0 +1,87 @@
+import unittest
+
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from src.reading_comprehension.utils import LengthGroupedSampler, trim_padding_collate
+
+SEQ_LENGTH = 16
+
+
+def padded_dataset(lengths) -> TensorDataset:
+    """
+    Right-padded features of the given lengths, with 1-D labels (start, end, is_impossible)
+    """
+    num_features = len(lengths)
+    attention_mask = (torch.arange(SEQ_LENGTH)[None, :] < torch.tensor(lengths)[:, None]).long()
+    input_ids = (torch.arange(num_features * SEQ_LENGTH).view(num_features, SEQ_LENGTH) + 1) * attention_mask
+    token_type_ids = attention_mask.clone()
+    start_positions = torch.arange(num_features)
+    end_positions = torch.arange(num_features) + SEQ_LENGTH
+    is_impossible = torch.arange(num_features, dtype=torch.float) % 2
+    return TensorDataset(input_ids, attention_mask, token_type_ids, start_positions, end_positions, is_impossible)
+
+
+class TestLengthGroupedSampler(unittest.TestCase):
+
+    def test_sorted_permutation(self):
+        lengths = torch.randint(1, SEQ_LENGTH + 1, (50,), generator=torch.Generator().manual_seed(0)).tolist()
+        sampler = LengthGroupedSampler(lengths, batch_size=4, mega_batch_size=3)
+        self.assertEqual(50, len(sampler))
+
+        orders = []
+        for seed in range(3):
+            torch.manual_seed(seed)
+            order = list(sampler)
+            self.assertEqual(list(range(50)), sorted(order))
+            for start in range(0, 50, 12):  # the last mega-batch has only 2 features
+                mega_batch = [lengths[i] for i in order[start: start + 12]]
+                self.assertEqual(sorted(mega_batch, reverse=True), mega_batch)
+            orders.append(order)
+        self.assertNotEqual(orders[0], orders[1])
+
+    def test_larger_mega_batch_than_features(self):
+        lengths = [3, 7, 1, 7, 5]
+        order = list(LengthGroupedSampler(lengths, batch_size=2))
+        self.assertEqual([7, 7, 5, 3, 1], [lengths[i] for i in order])
+        self.assertEqual([], list(LengthGroupedSampler([], batch_size=2)))
+
+
+class TestTrimPaddingCollate(unittest.TestCase):
+
+    def test_trimmed_to_longest_attention_mask(self):
+        dataset = padded_dataset([5, 3, 9, 2])
+        collated = trim_padding_collate([dataset[i] for i in range(len(dataset))])
+
+        self.assertEqual(len(dataset.tensors), len(collated))
+        for full, trimmed in zip(dataset.tensors[:3], collated[:3]):
+            self.assertEqual((4, 9), tuple(trimmed.shape))
+            self.assertTrue(torch.equal(full[:, :9], trimmed))
+            self.assertEqual(0, int(full[:, 9:].sum()))  # only padding removed
+        for labels, collated_labels in zip(dataset.tensors[3:], collated[3:]):
+            self.assertTrue(torch.equal(labels, collated_labels))
+
+    def test_labels_not_trimmed(self):
+        # the labels are longer than the batch: only the 2-dimensional tensors are cut
+        dataset = padded_dataset([2] * 6)
+        collated = trim_padding_collate([dataset[i] for i in range(len(dataset))])
+        self.assertEqual([(6, 2), (6, 2), (6, 2), (6,), (6,), (6,)], [tuple(t.shape) for t in collated])
+        self.assertEqual(list(range(6)), collated[3].tolist())
+
+    def test_other_attention_mask_index(self):
+        dataset = padded_dataset([4, 6])
+        batch = [(mask, ids) for ids, mask, *_ in (dataset[0], dataset[1])]
+        collated = trim_padding_collate(batch, attention_mask_index=0)
+        self.assertEqual([(2, 6), (2, 6)], [tuple(t.shape) for t in collated])
+
+    def test_data_loader(self):
+        lengths = torch.randint(1, SEQ_LENGTH + 1, (30,), generator=torch.Generator().manual_seed(1)).tolist()
+        dataset = padded_dataset(lengths)
+        loader = DataLoader(dataset, sampler=LengthGroupedSampler(lengths, batch_size=4), batch_size=4,
+                            collate_fn=trim_padding_collate)
+
+        seen = []
+        for input_ids, attention_mask, _, start_positions, _, _ in loader:
+            self.assertEqual(int(attention_mask.sum(dim=1).max()), input_ids.shape[1])
+            seen.extend(start_positions.tolist())
+        self.assertEqual(list(range(30)), sorted(seen))
@@ -63,6 +63,50 @@ class TestAnnotatedSentence(unittest.TestCase):
         self.assertEqual("the", res.annotated_tokens[1].raw_token)
         self.assertEqual("DET", res.annotated_tokens[1].part_of_speech)
 
+    def test_srl_spans(self):
+        lines = [
+            "# sent_id = f-6VWP66LZ::step02::sent01",
+            "# text = Saute the Onions in olive oil",
+            "1\tSaute\tsaute\tVERB\tB-EVENT\t_\t_\t_\t_\tCOOK\tB-V\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "2\tthe\tthe\tDET\tO\t_\t_\t_\t_\t_\tB-Patient\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "3\tOnions\tonion\tNOUN\tB-EXPLICITINGREDIENT\t1\t_\t_\t_\t_\tI-Patient\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "4\tin\tin\tADP\tO\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "5\tolive\tolive\tNOUN\tB-EXPLICITINGREDIENT\t1\t_\t_\t_\t_\tI-Patient\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "6\toil\toil\tNOUN\tI-IMPLICITINGREDIENT\t1\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+        ]
+        res = AnnotatedSentence.parse_sentence_from_lines(lines)
+
+        spans = res.srl_spans(0, "Patient")
+        self.assertEqual(1, len(spans))
+        self.assertEqual(1, spans[0].position)
+        self.assertEqual(2, spans[0].token.id)
+        self.assertEqual("the onions olive", spans[0].raw)
+        self.assertEqual(("the", "onion", "olive"), spans[0].normalized_words)
+        self.assertIs(spans, res.srl_spans(0, "Patient"))
+
+        self.assertEqual(["saute"], [span.normalized for span in res.srl_spans(0, "V")])
+        self.assertEqual([], res.srl_spans(1, "V"))
+        self.assertEqual(["onions", "olive"], [span.raw for span in res.srl_spans(None, "EXPLICITINGREDIENT")])
+        self.assertEqual(["onions", "olive oil"],
+                         [span.raw for span in res.srl_spans(None, ("EXPLICITINGREDIENT", "IMPLICITINGREDIENT"))])
+
+    def test_verb_dependents(self):
+        lines = [
+            "# sent_id = f-6VWP66LZ::step02::sent01",
+            "# text = Saute onion in a pan",
+            "1\tSaute\tsaute\tVERB\tB-EVENT\t_\t_\tHabitat=pan.2.1.5\t_\tCOOK\tB-V\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "2\tonion\tonion\tNOUN\tB-EXPLICITINGREDIENT\t1\t_\t_\tonion.2.1.2\t_\tB-Patient\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "3\tin\tin\tADP\tO\t_\t_\t_\t_\t_\tB-Location\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+            "4\ta\ta\tDET\tO\t_\t_\t_\t_\t_\t_\tB-V\t_\t_\t_\t_\t_\t_\t_\t_",
+            "5\tpan\tpan\tNOUN\tB-HABITAT\t_\t1\t_\tpan.2.1.5\t_\tI-Location\t_\t_\t_\t_\t_\t_\t_\t_\t_",
+        ]
+        res = AnnotatedSentence.parse_sentence_from_lines(lines)
+
+        self.assertEqual(["onion", "pan"], [t.raw_token for t in res.verb_dependents(1)])
+        self.assertEqual([], res.verb_dependents(2))
+        self.assertEqual(["Saute", "onion", "in", "pan"], [t.raw_token for t in res.related_tokens(1, [0])])
+        self.assertEqual(["onion", "a", "pan"], [t.raw_token for t in res.related_tokens(1, [1])])
+
 
 class TestAnnotatedRecipe(unittest.TestCase):
 
@@ -118,6 +162,14 @@ class TestAnnotatedRecipe(unittest.TestCase):
         self.assertEqual("Heat", res.annotated_sentences[2].annotated_tokens[0].raw_token)
         self.assertEqual(4, res.annotated_sentences[2].annotated_tokens[0].position_in_the_whole_recipe)
 
+        self.assertIs(res.annotated_sentences[1], res.sentences_by_id["f-GGX2LSGX::step01::sent01"])
+        self.assertEqual([res.annotated_sentences[2]], res.sentences_by_paragraph["f-GGX2LSGX::step02"])
+        self.assertEqual([res.annotated_sentences[0], res.annotated_sentences[2]],
+                         res.sentences_in(["f-GGX2LSGX::step02::sent01", "f-GGX2LSGX::ingredients::sent01", "x"]))
+        self.assertEqual(res.annotated_sentences[1:],
+                         res.sentences_in({"f-GGX2LSGX::step02", "f-GGX2LSGX::step01"}, by_paragraph=True))
+        self.assertEqual([], res.sentences_in([]))
+
     def test_parsing_from_actual_resource(self):
         file = f"{get_root()}/modules/recipe2video/data/train/crl_srl.csv"
         with open(file) as f:
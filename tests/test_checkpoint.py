@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import List
+
+from src.pipeline.checkpoint import PredictionCheckpoint
+from src.pipeline.deterministic_qa_engine import QuestionAnswererConstantAnswer
+from src.pipeline.end_to_end_prediction import EndToEndQuestionAnsweringPrediction
+from src.pipeline.interface_question_answering import PredictedAnswer
+from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.pipeline.question_category import QuestionCategory
+from src.unpack_data import Recipe, QuestionAnswerRecipe, rewrite_to_list_of_questions
+
+RUN = {"which": "val", "with_postprocessing": False}
+
+
+class CountingConstantAnswer(QuestionAnswererConstantAnswer):
+
+    def __init__(self, answer_to_be_returned: str):
+        super().__init__(answer_to_be_returned)
+        self.answered = 0
+
+    def answer_a_question(self, question, question_category, more_info={}) -> PredictedAnswer:
+        self.answered += 1
+        return super().answer_a_question(question, question_category, more_info)
+
+
+class SmallDataPrediction(EndToEndQuestionAnsweringPrediction):
+
+    def load_dataset(self, limit_recipes: int = None) -> List[QuestionAnswerRecipe]:
+        return rewrite_to_list_of_questions([Recipe.return_recipe_for_test()])
+
+
+class TestPredictionCheckpoint(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "checkpoint.jsonl")
+        self.questions = rewrite_to_list_of_questions([Recipe.return_recipe_for_test()])
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_resume(self):
+        checkpoint = PredictionCheckpoint(self.path, RUN)
+        checkpoint.record(self.questions[0], PredictedAnswer("1", "Q?", 0.5, {"source": "test"}))
+        checkpoint.record(self.questions[1], PredictedAnswer(None, "Q2?"))
+        checkpoint.close()
+
+        resumed = PredictionCheckpoint(self.path, RUN, resume=True)
+        resumed.close()
+        self.assertEqual(2, len(resumed.completed))
+        answer = resumed.get(self.questions[0])
+        self.assertEqual(("1", "Q?", 0.5, {"source": "test"}),
+                         (answer.answer, answer.raw_question, answer.confidence, answer.more_info))
+        self.assertFalse(resumed.get(self.questions[1]).has_answer())
+        self.assertIsNone(resumed.get(self.questions[2]))
+
+        self.assertEqual({}, PredictionCheckpoint(self.path, RUN).completed)  # not resuming: a new log
+
+    def test_truncated_last_line(self):
+        checkpoint = PredictionCheckpoint(self.path, RUN)
+        checkpoint.record(self.questions[0], PredictedAnswer("1"))
+        checkpoint.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"recipe_id": "f-6VWP66LZ", "quest')
+
+        resumed = PredictionCheckpoint(self.path, RUN, resume=True)
+        resumed.record(self.questions[1], PredictedAnswer("2"))
+        resumed.close()
+        self.assertEqual(2, len(PredictionCheckpoint(self.path, RUN, resume=True).completed))
+
+    def test_another_run(self):
+        PredictionCheckpoint(self.path, RUN).close()
+        with self.assertRaises(ValueError):
+            PredictionCheckpoint(self.path, {"which": "test", "with_postprocessing": False}, resume=True)
+
+    def test_end_to_end_resume(self):
+        engine = CountingConstantAnswer("1")
+        dispatcher = QuestionAnsweringDispatcher({x: engine for x in QuestionCategory.CATEGORIES if x != "RC"})
+        output = os.path.join(self.directory.name, "predictions.json")
+        prediction = SmallDataPrediction("val", False, dispatcher, output_json_filename=output)
+        prediction.checkpoint_path = self.path
+
+        questions, _ = prediction.run_prediction()
+        self.assertEqual(len(questions), engine.answered)
+        with open(output, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+
+        # the run was killed after 10 answers
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.writelines(lines[:11])
+        os.remove(output)
+
+        engine.answered = 0
+        prediction.resume = True
+        prediction.run_prediction()
+        self.assertEqual(len(questions) - 10, engine.answered)
+        with open(output, "r", encoding="utf-8") as f:
+            self.assertEqual(expected, json.load(f))
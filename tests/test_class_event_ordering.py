@@ -1,6 +1,8 @@
 import unittest
 
 from src.fetch_resources import fetch_linguistic_resources
+from src.pipeline.answerers.event_ordering_v1 import _distance_scores, _distance_scores_to_all, \
+    _cleaned_recipe_steps
 from src.pipeline.answerers.event_ordering_v2 import QuestionAnswererEventOrdering, PredictedAnswer, EoEvent
 from src.pipeline.question_category import QuestionCategory
 from src.unpack_data import Recipe, Q_A, QuestionAnswerRecipe
@@ -111,3 +113,14 @@ class TestQAClassEventOrdering(unittest.TestCase):
         self.assertIn("minced_meat", res.objects)
         self.assertIn("in", res.all_words)
         self.assertIn("pan", res.all_words)
+
+    def test_batched_distance_scores(self):
+        recipe = Recipe.return_recipe_for_test()
+        steps = [v[0].metadata['text'] for k, v in recipe.new_pars.items() if 'step' in k]
+        query = "Sauting minced meat in a separate pan"
+
+        res = _distance_scores_to_all(query, _cleaned_recipe_steps(recipe))
+        self.assertEqual(len(steps), len(res))
+        for step, score in zip(steps, res):
+            self.assertAlmostEqual(_distance_scores(query, step), score)
+        self.assertIs(_cleaned_recipe_steps(recipe), _cleaned_recipe_steps(recipe))
@@ -1,7 +1,7 @@
 import unittest
 
 from src.fetch_resources import fetch_linguistic_resources
-from src.pipeline.answerers.counting_times import QuestionAnswererCountingTimes, PredictedAnswer
+from src.pipeline.answerers.counting_times import QuestionAnswererCountingTimes, PredictedAnswer, coref_index
 from src.pipeline.question_category import QuestionCategory
 from src.unpack_data import Recipe, Q_A, QuestionAnswerRecipe
 
@@ -29,3 +29,16 @@ class TestQAClass0HowManyTimes(unittest.TestCase):
         res = QuestionAnswererCountingTimes().answer_a_question(question, QuestionCategory("question_id"))
         self.assertIsInstance(res, PredictedAnswer)
         self.assertFalse(res.has_answer())
+
+    def test_coref_index(self):
+        recipe = Recipe.return_recipe_for_test()
+        index = coref_index(recipe)
+        self.assertIs(index, coref_index(recipe))
+        self.assertIs(index, recipe._derived[(coref_index.__wrapped__, ())])
+
+        self.assertEqual(["pan.2.1.1", "pan.2.1.1", "pan.3.1.4", "pan.5.1.6"], index.alias_candidates("pan"))
+        self.assertEqual(["olive_oil.2.1.7"], index.alias_candidates("olive_oil"))
+        self.assertEqual([], index.alias_candidates("invalid_something"))
+
+        tokens = index.tokens_with_coref_id("2.1.1")
+        self.assertEqual(["Saute", "add"], [t.raw_token for t in tokens])
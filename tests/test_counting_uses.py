@@ -1,7 +1,7 @@
 import unittest
 
 from src.fetch_resources import fetch_linguistic_resources
-from src.pipeline.answerers.counting_uses import QuestionAnswererCountingUses, PredictedAnswer
+from src.pipeline.answerers.counting_uses import QuestionAnswererCountingUses, PredictedAnswer, occurrences_index
 from src.pipeline.question_category import QuestionCategory
 from src.unpack_data import Recipe, Q_A, QuestionAnswerRecipe
 
@@ -29,3 +29,11 @@ class TestQAClassCountingTimes(unittest.TestCase):
         res = QuestionAnswererCountingUses().answer_a_question(question, QuestionCategory("question_id"))
         self.assertIsInstance(res, PredictedAnswer)
         self.assertFalse(res.has_answer())
+
+    def test_occurrences_index_kept_in_recipe(self):
+        recipe = Recipe.return_recipe_for_test()
+        tools = occurrences_index(recipe, "Tool", "TOOL")
+        self.assertIs(tools, occurrences_index(recipe, "Tool", "TOOL"))
+        self.assertIsNot(tools, occurrences_index(recipe, "Habitat", "HABITAT"))
+        self.assertIsNot(tools, occurrences_index(Recipe.return_recipe_for_test(), "Tool", "TOOL"))
+        self.assertEqual(2, len(recipe._derived))
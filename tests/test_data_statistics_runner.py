@@ -0,0 +1,76 @@
+import io
+import unittest
+from typing import List
+
+from src.data_question_class_statistics import QuestionClassStatistics
+from src.data_statistics import PassageStatsCalculator, QuestionsAnswersMinMaxAvgStats, DataStatistics
+from src.data_statistics_closed_set_answers import ClosedSetAnswerChecker
+from src.data_statistics_extractive_answer import ExtractiveAnswerChecker, RecoverableAnswerChecker, AppendHandler
+from src.data_statistics_runner import run_statistics, group_by_passage, split_by_passage
+from src.datafile_parser import DatafileParser, DataItem
+from src.get_root import get_root
+
+
+def read_dataset() -> List[DataItem]:
+    with open(f"{get_root()}/data/small_data/recipe.csv", "r", encoding="utf-8") as f:
+        recipe = f.read()
+    recipes = [recipe.replace("f-6VWP66LZ", f"f-{i}").replace("minced meat", f"meat {i}") for i in range(5)]
+    return DatafileParser().parse_from_stream(io.StringIO("\n".join(recipes)))
+
+
+def build_checkers() -> List[DataStatistics]:
+    rec = RecoverableAnswerChecker()
+    rec.handler_on_non_recoverable_items.append(AppendHandler())
+    return [PassageStatsCalculator(), QuestionsAnswersMinMaxAvgStats(), ExtractiveAnswerChecker(), rec,
+            ClosedSetAnswerChecker(), QuestionClassStatistics()]
+
+
+class TestDataStatisticsRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = read_dataset()
+        self.expected = {}
+        for checker in build_checkers():
+            self.expected.update(checker.calc_statistics(self.dataset))
+
+    def test_single_pass(self):
+        self.assertEqual(self.expected, run_statistics(build_checkers(), self.dataset))
+
+    def test_workers(self):
+        checkers = build_checkers()
+        self.assertEqual(self.expected, run_statistics(checkers, self.dataset, num_workers=2))
+
+        expected_checkers = build_checkers()
+        for checker in expected_checkers:
+            checker.calc_statistics(self.dataset)
+        expected_handler, handler = expected_checkers[3].handler_on_non_recoverable_items[0], \
+            checkers[3].handler_on_non_recoverable_items[0]
+        self.assertEqual([item.question for item in expected_handler.append_items],
+                         [item.question for item in handler.append_items])
+        self.assertEqual([item.subid for item in expected_checkers[5].questions["0"]],
+                         [item.subid for item in checkers[5].questions["0"]])
+
+    def test_passages_are_normalized_once(self):
+        checkers = build_checkers()
+        run_statistics(checkers, self.dataset)
+        self.assertIs(checkers[2].passage_normalizer, checkers[3].passage_normalizer)
+        self.assertEqual(5, len(checkers[2].passage_normalizer.passages))
+
+    def test_incorrect_arguments(self):
+        with self.assertRaises(ValueError):
+            run_statistics(build_checkers(), self.dataset, num_workers=-1)
+        checker = PassageStatsCalculator()
+        with self.assertRaises(ValueError):
+            run_statistics([checker, checker], self.dataset)
+
+
+class TestSplitByPassage(unittest.TestCase):
+
+    def test_passages_stay_together(self):
+        dataset = read_dataset()
+        self.assertEqual([27] * 5, [len(group) for group in group_by_passage(dataset)])
+
+        chunks = split_by_passage(dataset, 2)
+        self.assertEqual(dataset, [item for chunk in chunks for item in chunk])
+        self.assertEqual([81, 54], [len(chunk) for chunk in chunks])
+        self.assertEqual(5, len(split_by_passage(dataset, 10)))
@@ -1,8 +1,10 @@
+import pickle
 import unittest
 from io import StringIO
 
 from src.datafile_parser import DataItem, DatafileParser
 from src.get_root import get_root
+from src.unpack_data import Recipe
 
 
 class TestDatafileParser(unittest.TestCase):
@@ -101,6 +103,18 @@ class TestDatafileParser(unittest.TestCase):
         self.assertEqual("What should be baked in the oven?", last.question)
         self.assertEqual("the pie crust", last.answer)
 
+    def test_items_of_recipes(self):
+        parsed = DatafileParser().parse_from_file(f"{get_root()}/data/small_data/recipe.csv")
+        views = DatafileParser.items_of_recipes([Recipe.return_recipe_for_test()])
+        self.assertEqual(27, len(views))
+        self.assertEqual([str(item) for item in parsed], [str(item) for item in views])
+        self.assertEqual([item.subid for item in parsed], [item.subid for item in views])
+        self.assertIs(views[0].passage, views[-1].passage)
+
+        copied = pickle.loads(pickle.dumps(views[0]))
+        self.assertIs(DataItem, type(copied))
+        self.assertEqual(views[0].to_dataframe_dict(), copied.to_dataframe_dict())
+
     def test_get_resource_val(self):
         res = DatafileParser.get_resource("val")
         self.assertGreaterEqual(len(res), 3000)
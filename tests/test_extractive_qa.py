@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Dict, List
+
+from src.get_root import get_root
+from src.pipeline.extractive_qa import OnlineExtractiveQuestionAnswerer, ExtractiveQuestionAnswerer
+from src.pipeline.question_category import QuestionCategory
+from src.reading_comprehension.processors import SemEvalProcessor
+from src.unpack_data import Recipe, rewrite_to_list_of_questions
+
+
+class PredictionStub:
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __iter__(self):
+        yield "text", self.text
+        yield "probability", 0.9
+
+
+def read_recipe_lines() -> List[str]:
+    with open(f"{get_root()}/data/small_data/recipe.csv", "r", encoding="utf-8") as f:
+        return list(f)
+
+
+class EngineStub:
+    """
+    Answers every question with the length of its passage, keeping the ids of the predicted examples
+    """
+
+    def __init__(self):
+        self.predicted: List[str] = []
+
+    def predict_examples(self, examples) -> Dict[str, List[PredictionStub]]:
+        self.predicted.extend(example.qas_id for example in examples)
+        return {example.qas_id: [PredictionStub(str(len(example.context_text)))] for example in examples}
+
+
+def build_answerer(engine: EngineStub, model_name: str = "stub", **kwargs) -> OnlineExtractiveQuestionAnswerer:
+    OnlineExtractiveQuestionAnswerer._engines[(model_name, "stub_config")] = engine
+    return OnlineExtractiveQuestionAnswerer(model_name, config_path="stub_config", predictions_path=None, **kwargs)
+
+
+class TestOnlineExtractiveQuestionAnswerer(unittest.TestCase):
+
+    def setUp(self):
+        OnlineExtractiveQuestionAnswerer._engines.clear()
+        self.questions = rewrite_to_list_of_questions([Recipe.return_recipe_for_test()])[:3]
+        self.categories = [QuestionCategory("not_recognized")] * len(self.questions)
+
+    def tearDown(self):
+        OnlineExtractiveQuestionAnswerer._engines.clear()
+
+    def test_predicted_once(self):
+        engine = EngineStub()
+        answerer = build_answerer(engine)
+        answerer.warm_up(self.questions)
+        answers = answerer.batch_answer_questions(self.questions, self.categories)
+
+        self.assertEqual(3, len(engine.predicted))
+        self.assertEqual(1, len({answer.answer for answer in answers}))
+
+    def test_same_recipe_id_with_another_text(self):
+        engine = EngineStub()
+        answerer = build_answerer(engine)
+        answer = answerer.answer_a_question(self.questions[0], self.categories[0]).answer
+
+        changed = Recipe([line.replace("minced meat", "beef") for line in read_recipe_lines()])
+        changed_question = rewrite_to_list_of_questions([changed])[0]
+        self.assertEqual(self.questions[0].recipe.id, changed_question.recipe.id)
+        self.assertNotEqual(answer, answerer.answer_a_question(changed_question, self.categories[0]).answer)
+        self.assertEqual(2, len(engine.predicted))
+
+    def test_recipes_with_the_same_id_in_one_batch(self):
+        engine = EngineStub()
+        answerer = build_answerer(engine)
+        changed = Recipe([line.replace("minced meat", "beef") for line in read_recipe_lines()])
+        questions = [self.questions[0], rewrite_to_list_of_questions([changed])[0], self.questions[0]]
+        self.assertEqual(questions[0].recipe.id, questions[1].recipe.id)
+        self.assertEqual(questions[0].question_class, questions[1].question_class)
+
+        answerer.warm_up(questions)
+        self.assertEqual(2, len(engine.predicted))
+        self.assertEqual(2, len(set(engine.predicted)))
+
+        answers = [answer.answer for answer in answerer.batch_answer_questions(questions, self.categories)]
+        contexts = [SemEvalProcessor._context_text(question.recipe, True) for question in questions]
+        self.assertEqual([str(len(context)) for context in contexts], answers)  # the stub answers the context length
+        self.assertNotEqual(answers[0], answers[1])
+        self.assertEqual(2, len(engine.predicted))
+
+    def test_precomputed_predictions_only_for_dataset_recipes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            predictions_path = os.path.join(tmp_dir, "predictions.json")
+            with open(predictions_path, "w") as f:
+                json.dump({"f-6VWP66LZ-0-1": [{"text": "precomputed", "probability": 0.5}]}, f)
+            engine = EngineStub()
+            OnlineExtractiveQuestionAnswerer._engines[("stub", "stub_config")] = engine
+            answerer = OnlineExtractiveQuestionAnswerer("stub", config_path="stub_config",
+                                                        predictions_path=predictions_path)
+
+        self.assertNotEqual("precomputed", answerer.answer_a_question(self.questions[0], self.categories[0]).answer)
+        self.questions[0].recipe.position = 0  # as read by convert_dataset
+        self.assertEqual("precomputed", answerer.answer_a_question(self.questions[0], self.categories[0]).answer)
+        self.assertEqual(1, len(engine.predicted))
+
+    def test_bounded_predictions(self):
+        engine = EngineStub()
+        answerer = build_answerer(engine, max_online_predictions=2)
+        answerer.batch_answer_questions(self.questions, self.categories)
+        self.assertEqual(2, len(answerer.online_predictions))
+
+        answerer.answer_a_question(self.questions[0], self.categories[0])  # evicted, predicted again
+        self.assertEqual(4, len(engine.predicted))
+
+    def test_bounded_engines(self):
+        for model_name in ["first", "second", "third"]:
+            engine = EngineStub()
+            self.assertIs(engine, build_answerer(engine, model_name)._get_engine())
+        self.assertEqual(OnlineExtractiveQuestionAnswerer.max_engines, len(OnlineExtractiveQuestionAnswerer._engines))
+        self.assertNotIn(("first", "stub_config"), OnlineExtractiveQuestionAnswerer._engines)
+
+    def test_incorrect_arguments(self):
+        answerer = build_answerer(EngineStub())
+        with self.assertRaisesRegex(ValueError, "Mismatching questions vs categories = 3 vs 1"):
+            answerer.batch_answer_questions(self.questions, self.categories[:1])
+        with self.assertRaises(ValueError):
+            build_answerer(EngineStub(), max_online_predictions=0)
+
+
+class TestExtractiveQuestionAnswerer(unittest.TestCase):
+
+    def test_recipe_without_precomputed_predictions(self):
+        question = rewrite_to_list_of_questions([Recipe.return_recipe_for_test()])[0]
+        answer = ExtractiveQuestionAnswerer("val").answer_a_question(question, QuestionCategory("not_recognized"))
+        self.assertIsNone(answer.answer)
+        self.assertIsNone(answer.confidence)
@@ -0,0 +1,50 @@
+import random
+import unittest
+
+import nltk
+
+from src.pipeline.fuzzy_index import FuzzyKeyIndex
+
+
+def brute_force(occurrences, word):
+    return [(key, value) for key, value in occurrences.items() if nltk.edit_distance(key.split(".")[0], word) <= 1]
+
+
+class TestFuzzyKeyIndex(unittest.TestCase):
+
+    def test_simple(self):
+        occurrences = {"pan.1.3": 2, "pans.2.1": 1, "bowl.3.5": 4, "oven": 1, "pot.4.2": 3}
+        index = FuzzyKeyIndex(occurrences)
+        self.assertEqual([("pan.1.3", 2), ("pans.2.1", 1)], index.find("pan"))
+        self.assertEqual([("pan.1.3", 2), ("pans.2.1", 1)], index.find("pans"))
+        self.assertEqual([("pan.1.3", 2), ("pot.4.2", 3)], index.find("pat"))
+        self.assertEqual([("bowl.3.5", 4)], index.find("bowls"))
+        self.assertEqual([], index.find("skillet"))
+        self.assertEqual([("pan.1.3", 2)], index.find("pan", max_distance=0))
+
+    def test_transposition_is_two_edits(self):
+        index = FuzzyKeyIndex({"ab": 1, "ba.1.1": 1})
+        self.assertEqual([("ab", 1)], index.find("ab"))
+        self.assertEqual([("ba.1.1", 1)], index.find("ba"))
+
+    def test_empty_words(self):
+        occurrences = {"": 1, "a.1.1": 2, "ab": 3, ".2.2": 4}
+        index = FuzzyKeyIndex(occurrences)
+        for word in ["", "a", "b", "ab", "abc"]:
+            self.assertEqual(brute_force(occurrences, word), index.find(word))
+
+    def test_same_as_brute_force(self):
+        rnd = random.Random(0)
+        letters = "abcde_"
+        occurrences = {}
+        for i in range(300):
+            stem = "".join(rnd.choice(letters) for _ in range(rnd.randint(0, 6)))
+            occurrences[f"{stem}.{i}.{rnd.randint(1, 9)}" if i % 3 else stem] = rnd.randint(1, 5)
+        index = FuzzyKeyIndex(occurrences)
+        for _ in range(300):
+            word = "".join(rnd.choice(letters) for _ in range(rnd.randint(0, 7)))
+            self.assertEqual(brute_force(occurrences, word), index.find(word))
+
+    def test_bad_distance(self):
+        with self.assertRaises(ValueError):
+            FuzzyKeyIndex({}).find("pan", max_distance=2)
@@ -1,7 +1,10 @@
+import csv
 import pathlib
 import tempfile
 import unittest
 from io import StringIO
+from unittest import mock
+
 from src.pipeline.handler_metrics_per_category import HandlerMetricsPerCategory, PredictedAnswer, Result
 from src.unpack_data import Q_A, QuestionAnswerRecipe
 
@@ -117,3 +120,37 @@ class TestHandlerMetricsPerCategory(unittest.TestCase):
             log = sink.getvalue()
             self.assertRegex(log, "EM = None")
             self.assertRegex(log, "F1 = None")
+
+    def test_bad_output_format(self):
+        with self.assertRaises(ValueError):
+            HandlerMetricsPerCategory(output_formats=["xls"])
+
+    def test_csv_output_in_parallel(self):
+        questions = [QuestionAnswerRecipe(Q_A.build_dummy_qa("Q?", str(i), "good answer"), recipe=None)
+                     for i in range(4)]
+        answers = [PredictedAnswer("good answer", more_info={"predicted_category": f"cat{i % 2}"}) for i in range(4)]
+
+        with tempfile.TemporaryDirectory() as dir:
+            engine = HandlerMetricsPerCategory(prefix_dir=dir, outstream=StringIO(), output_formats=["csv"],
+                                               num_workers=2)
+            engine.handle_questions_answers(questions, answers, more_info={})
+
+            for name in ["results_category_cat0", "results_category_cat1", "summary"]:
+                self.assertTrue(pathlib.Path(f"{dir}/{name}.csv").exists())
+                self.assertFalse(pathlib.Path(f"{dir}/{name}.xlsx").exists())
+
+            with open(f"{dir}/results_category_cat1.csv") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(2, len(rows))
+            self.assertEqual("good answer", rows[0]["Predicted Answer"])
+            self.assertEqual("1.0", rows[0]["F1"])
+
+    def test_rows_computed_once_per_category(self):
+        question = QuestionAnswerRecipe(Q_A.build_dummy_qa("Q?", "1", "answer"), recipe=None)
+        answer = PredictedAnswer("answer", more_info={"predicted_category": "cat"})
+
+        with tempfile.TemporaryDirectory() as dir:
+            engine = HandlerMetricsPerCategory(prefix_dir=dir, outstream=StringIO(), output_formats=["csv"])
+            with mock.patch.object(engine, "_get_results", wraps=engine._get_results) as get_results:
+                engine.handle_questions_answers([question], [answer], more_info={})
+            self.assertEqual(1, get_results.call_count)
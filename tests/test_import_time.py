@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from src.get_root import get_root
+
+# imports every module of src.pipeline, then reports which heavy dependencies came along
+# (bin/benchmark_pipeline_import.py measures the import time)
+IMPORT_ALL_PIPELINE_MODULES = """
+import importlib, pkgutil, sys
+import src.pipeline, src.pipeline.answerers
+for package in (src.pipeline, src.pipeline.answerers):
+    for module in pkgutil.iter_modules(package.__path__):
+        importlib.import_module(f"{package.__name__}.{module.name}")
+print(" ".join(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+HEAVY_DEPENDENCIES = ["inflect", "nltk", "numpy", "pandas", "pyinflect", "torch", "tqdm", "transformers"]
+
+
+def heavy_dependencies_imported_by_pipeline():
+    """
+    :return: the heavy dependencies imported along with all the modules of src.pipeline, in a fresh interpreter
+    """
+    env = dict(os.environ, PYTHONPATH=get_root())
+    completed = subprocess.run([sys.executable, "-c", IMPORT_ALL_PIPELINE_MODULES] + HEAVY_DEPENDENCIES,
+                               cwd=get_root(), env=env, capture_output=True, text=True, check=True)
+    return completed.stdout.split()
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_pipeline_imports_no_heavy_dependencies(self):
+        self.assertEqual([], heavy_dependencies_imported_by_pipeline())
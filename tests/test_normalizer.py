@@ -0,0 +1,37 @@
+import unittest
+
+from src.normalizer import Normalizer, PassageNormalizer
+
+
+class TestNormalizer(unittest.TestCase):
+
+    def test_normalize(self):
+        normalizer = Normalizer()
+        self.assertEqual("place in a buttered dish ", normalizer.normalize("Place in a\nbuttered (dish)."))
+        self.assertEqual(" a b c d ", normalizer.normalize("  a, - b...c_d?!"))
+        self.assertEqual("tab\tstays ", normalizer.normalize("Tab\tstays\n\n\n"))
+        self.assertEqual("", normalizer.normalize(""))
+        self.assertEqual("äö ü", normalizer.normalize("ÄÖ:Ü"))
+
+
+class TestPassageNormalizer(unittest.TestCase):
+
+    def test_cached_per_passage_id(self):
+        calls = []
+
+        def normalize(text: str) -> str:
+            calls.append(text)
+            return text.lower()
+
+        normalizer = PassageNormalizer(normalize)
+        passage = "A Passage"
+        self.assertEqual("a passage", normalizer.normalize("id-1", passage))
+        self.assertEqual("a passage", normalizer.normalize("id-1", passage))
+        self.assertEqual(1, len(calls))
+
+        self.assertEqual("other", normalizer.normalize("id-1", "Other"))
+        self.assertEqual("a passage", normalizer.normalize("id-2", passage))
+        self.assertEqual(3, len(calls))
+
+    def test_default_normalizer(self):
+        self.assertEqual("a passage ", PassageNormalizer().normalize(None, "A passage."))
@@ -0,0 +1,61 @@
+import unittest
+
+import nltk
+
+from src.fetch_resources import fetch_linguistic_resources
+from src.pos_tagger import PosTagger
+
+
+class TaggerStub:
+
+    def __init__(self):
+        self.calls = 0
+
+    def tag(self, tokens):
+        self.calls += 1
+        return [(token, "NN") for token in tokens]
+
+
+class TestPosTagger(unittest.TestCase):
+
+    def setUp(self) -> None:
+        fetch_linguistic_resources()
+
+    def test_same_tags_as_nltk(self):
+        tokens = ["cutting", "the", "stem", "into", "bite", "-", "size", "pieces"]
+        tagger = PosTagger()
+        self.assertEqual(nltk.pos_tag(tokens), tagger.tag(tokens))
+
+    def test_tag_sents(self):
+        sentences = [["sauting", "minced", "meat"], [], ["adding", "the", "tinned", "tomatoes"],
+                     ["sauting", "minced", "meat"]]
+        tagger = PosTagger()
+        res = tagger.tag_sents(sentences)
+        self.assertEqual(nltk.pos_tag_sents(sentences), res)
+        self.assertEqual(3, len(tagger._memo))
+
+    def test_results_are_copies(self):
+        tagger = PosTagger()
+        res = tagger.tag(["heat", "the", "oil"])
+        res.append(("x", "NN"))
+        self.assertEqual(3, len(tagger.tag(["heat", "the", "oil"])))
+
+    def test_shared_instance(self):
+        self.assertIs(PosTagger.get(), PosTagger.get())
+        with self.assertRaises(TypeError):
+            PosTagger.get().tag("heat the oil")
+
+    def test_bounded_memo(self):
+        tagger = PosTagger(max_size=2)
+        tagger._tagger = TaggerStub()
+        self.assertEqual([[("heat", "NN")], [("oil", "NN")], [("pan", "NN")]],
+                         tagger.tag_sents([["heat"], ["oil"], ["pan"]]))
+        self.assertEqual([("oil",), ("pan",)], list(tagger._memo))
+
+        tagger.tag(["oil"])
+        tagger.tag(["heat"])
+        self.assertEqual([("oil",), ("heat",)], list(tagger._memo))
+        self.assertEqual(4, tagger._tagger.calls)
+
+        with self.assertRaises(ValueError):
+            PosTagger(max_size=0)
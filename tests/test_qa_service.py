@@ -0,0 +1,204 @@
+import asyncio
+import json
+import unittest
+from typing import Any, Dict, List
+
+from src.get_root import get_root
+from src.pipeline.deterministic_qa_engine import QuestionAnswererConstantAnswer, QuestionAnswererNA
+from src.pipeline.extractive_qa import ExtractiveQuestionAnswerer
+from src.pipeline.qa_service import RecipeCache, QuestionAnsweringService, QuestionAnsweringHttpServer, recipe_key, \
+    question_lines
+from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.pipeline.question_category import QuestionCategory
+from src.unpack_data import QuestionAnswerRecipe
+
+
+def read_test_recipe() -> str:
+    with open(f"{get_root()}/data/small_data/recipe.csv", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class RecordingConstantAnswer(QuestionAnswererConstantAnswer):
+
+    def __init__(self, answer_to_be_returned: str):
+        super().__init__(answer_to_be_returned)
+        self.warmed_up_with: List[List[str]] = []
+
+    def warm_up(self, questions: List[QuestionAnswerRecipe]) -> None:
+        self.warmed_up_with.append([q.question for q in questions])
+
+
+def build_dispatcher() -> QuestionAnsweringDispatcher:
+    dispatching_rules = {x: QuestionAnswererNA() for x in QuestionCategory.CATEGORIES}
+    dispatching_rules["counting_actions"] = QuestionAnswererConstantAnswer("1")
+    return QuestionAnsweringDispatcher(dispatching_rules)
+
+
+def build_dispatcher_with_precomputed_rc() -> QuestionAnsweringDispatcher:
+    dispatcher = build_dispatcher()
+    dispatcher.dispatching_table["not_recognized"] = ExtractiveQuestionAnswerer("val")
+    dispatcher.dispatching_table["RC"] = ExtractiveQuestionAnswerer("val")
+    return dispatcher
+
+
+async def http_request(port: int, method: str, path: str, body: Dict[str, Any] = None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                 f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body.decode("utf-8"))
+
+
+class TestRecipeCache(unittest.TestCase):
+
+    def test_lru(self):
+        recipe_text = read_test_recipe()
+        other_text = recipe_text.replace("f-6VWP66LZ", "f-OTHER")
+        cache = RecipeCache(max_size=1)
+
+        recipe = cache.get(recipe_key(recipe_text), recipe_text)
+        self.assertEqual("f-6VWP66LZ", recipe.id)
+        self.assertIs(recipe, cache.get(recipe_key(recipe_text), recipe_text))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        self.assertEqual("f-OTHER", cache.get(recipe_key(other_text), other_text).id)
+        self.assertEqual(1, len(cache))
+        self.assertIsNot(recipe, cache.get(recipe_key(recipe_text), recipe_text))
+        self.assertEqual(3, cache.misses)
+
+    def test_incorrect_size(self):
+        with self.assertRaises(ValueError):
+            RecipeCache(max_size=0)
+
+
+class TestQuestionLines(unittest.TestCase):
+
+    def test_questions_of_the_recipe(self):
+        lines = question_lines(read_test_recipe())
+        self.assertEqual("# question 0-1 = How many actions does it take to process the minced meat?", lines[0])
+
+    def test_custom_questions(self):
+        self.assertEqual(["# question 3-2 = Where?"], question_lines("", [{"id": "3-2", "question": "Where?"}]))
+        with self.assertRaises(ValueError):
+            question_lines("", [{"question": "Where?"}])
+        with self.assertRaises(ValueError):
+            question_lines("", ["How many actions does it take to process the minced meat?"])
+        with self.assertRaises(ValueError):
+            question_lines("", {"id": "3-2", "question": "Where?"})
+
+
+class TestQuestionAnsweringService(unittest.TestCase):
+
+    def test_answers_in_order(self):
+        async def run():
+            service = QuestionAnsweringService(build_dispatcher)
+            try:
+                return await service.answer(read_test_recipe())
+            finally:
+                service.close()
+
+        answers = asyncio.run(run())
+        expected = [line.split(" = ")[0].split(" ")[-1] for line in question_lines(read_test_recipe())]
+        self.assertEqual(expected, [a["question_id"] for a in answers])
+        self.assertEqual("1", answers[0]["answer"])
+        self.assertEqual("f-6VWP66LZ", answers[0]["recipe_id"])
+        self.assertEqual("counting_actions", answers[0]["more_info"]["predicted_category"])
+
+    def test_concurrent_requests_are_batched_per_category(self):
+        engine = RecordingConstantAnswer("1")
+        dispatching_rules = {x: QuestionAnswererNA() for x in QuestionCategory.CATEGORIES}
+        dispatching_rules["counting_actions"] = engine
+        question = {"id": "0-1", "question": "How many actions does it take to process the minced meat?"}
+
+        async def run():
+            service = QuestionAnsweringService(lambda: QuestionAnsweringDispatcher(dispatching_rules), max_wait=0.05)
+            try:
+                answers = await asyncio.gather(*[service.answer(read_test_recipe(), [question]) for _ in range(5)])
+                return answers, service.recipes
+            finally:
+                service.close()
+
+        answers, recipes = asyncio.run(run())
+        self.assertEqual(["1"] * 5, [a[0]["answer"] for a in answers])
+        self.assertEqual([[question["question"]] * 5], engine.warmed_up_with)
+        self.assertEqual((4, 1), (recipes.hits, recipes.misses))
+
+    def test_max_batch_size(self):
+        async def run():
+            service = QuestionAnsweringService(build_dispatcher, max_batch_size=2, max_wait=10)
+            try:
+                questions = [{"id": f"0-{i}", "question": "How many actions does it take to process the meat?"}
+                             for i in range(4)]
+                await service.answer(read_test_recipe(), questions)
+                return service.batches_answered
+            finally:
+                service.close()
+
+        self.assertEqual(2, asyncio.run(run()))
+
+    def test_worker_processes(self):
+        async def run():
+            service = QuestionAnsweringService(build_dispatcher, num_workers=2)
+            try:
+                return await service.answer(read_test_recipe())
+            finally:
+                service.close()
+
+        answers = asyncio.run(run())
+        self.assertEqual(len(question_lines(read_test_recipe())), len(answers))
+        self.assertEqual("1", answers[0]["answer"])
+
+    def test_recipe_without_precomputed_rc_predictions(self):
+        async def run():
+            service = QuestionAnsweringService(build_dispatcher_with_precomputed_rc)
+            try:
+                return await service.answer(read_test_recipe().replace("f-6VWP66LZ", "f-NEW"))
+            finally:
+                service.close()
+
+        answers = asyncio.run(run())
+        self.assertEqual(len(question_lines(read_test_recipe())), len(answers))
+        self.assertEqual([], [answer for answer in answers if "error" in answer])
+        self.assertEqual("1", answers[0]["answer"])
+
+    def test_incorrect_recipe(self):
+        service = QuestionAnsweringService(build_dispatcher)
+        with self.assertRaises(ValueError):
+            asyncio.run(service.answer("not a recipe"))
+        service.close()
+
+
+class TestQuestionAnsweringHttpServer(unittest.TestCase):
+
+    def test_http_round_trip(self):
+        async def run():
+            service = QuestionAnsweringService(build_dispatcher)
+            server = QuestionAnsweringHttpServer(service, port=0)
+            await server.start()
+            try:
+                question = {"id": "0-1", "question": "How many actions does it take to process the minced meat?"}
+                return [await http_request(server.port, "POST", "/predict",
+                                           {"recipe": read_test_recipe(), "questions": [question]}),
+                        await http_request(server.port, "GET", "/health"),
+                        await http_request(server.port, "POST", "/predict", {"questions": []}),
+                        await http_request(server.port, "POST", "/predict",
+                                           {"recipe": read_test_recipe(), "questions": [question["question"]]}),
+                        await http_request(server.port, "GET", "/predict"),
+                        await http_request(server.port, "GET", "/nowhere")]
+            finally:
+                await server.stop()
+                service.close()
+
+        predicted, health, bad_request, bad_questions, bad_method, not_found = asyncio.run(run())
+        self.assertEqual(200, predicted[0])
+        self.assertEqual("1", predicted[1]["answers"][0]["answer"])
+        self.assertEqual((200, "ok", 1), (health[0], health[1]["status"], health[1]["recipes_cached"]))
+        self.assertEqual(400, bad_request[0])
+        self.assertEqual(400, bad_questions[0])
+        self.assertIn("Incorrect questions", bad_questions[1]["error"])
+        self.assertEqual(405, bad_method[0])
+        self.assertEqual(404, not_found[0])
@@ -0,0 +1,97 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.get_root import get_root
+from src.pipeline.deterministic_qa_engine import QuestionAnswererConstantAnswer, QuestionAnswererNA
+from src.pipeline.handler_metrics import HandlerF1, HandlerExactMatch
+from src.pipeline.handler_metrics_per_category import HandlerMetricsPerCategory
+from src.pipeline.handlers import HandlerSaveToJson
+from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.pipeline.question_category import QuestionCategory
+from src.pipeline.sharding import HandlerMetricPartials, merge_metric_partials, merge_predictions, recipe_order
+from src.unpack_data import convert_dataset, recipe_shard, rewrite_to_list_of_questions
+
+NUM_RECIPES = 12
+
+
+def build_dispatcher() -> QuestionAnsweringDispatcher:
+    dispatching_rules = {x: QuestionAnswererNA() for x in QuestionCategory.CATEGORIES if x != "RC"}
+    dispatching_rules["counting_actions"] = QuestionAnswererConstantAnswer("1")
+    dispatching_rules["counting_times"] = QuestionAnswererConstantAnswer("2")
+    dispatching_rules["event_ordering"] = QuestionAnswererConstantAnswer("the first event")
+    dispatching_rules["method"] = QuestionAnswererConstantAnswer("by using a knife")
+    return QuestionAnsweringDispatcher(dispatching_rules)
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.dataset_path = os.path.join(self.directory.name, "dataset.csv")
+        with open(f"{get_root()}/data/small_data/recipe.csv", "r", encoding="utf-8") as f:
+            lines = list(f)
+        with open(self.dataset_path, "w", encoding="utf-8") as f:
+            for i in range(NUM_RECIPES):
+                f.writelines(line.replace("f-6VWP66LZ", f"f-{i}") for line in lines)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def predict(self, shard=None, num_shards: int = 1):
+        recipes = convert_dataset(self.dataset_path, use_tqdm=False, shard=shard)
+        questions = rewrite_to_list_of_questions(recipes)
+        answers = build_dispatcher().predict_answers("val", False, questions)
+        name = f"shard-{shard[0]}" if shard else "single"
+        predictions_path = os.path.join(self.directory.name, f"{name}.json")
+        partials_path = os.path.join(self.directory.name, f"{name}.metrics.json")
+        HandlerSaveToJson(predictions_path).handle_questions_answers(questions, answers)
+        HandlerMetricPartials(partials_path, shard[0] if shard else 0, num_shards).handle_questions_answers(
+            questions, answers)
+        with open(predictions_path, "r", encoding="utf-8") as f, open(partials_path, "r", encoding="utf-8") as g:
+            return recipes, questions, answers, json.load(f), json.load(g)
+
+    def test_shards_partition_the_recipes(self):
+        all_ids = [recipe.id for recipe in convert_dataset(self.dataset_path, use_tqdm=False)]
+        sharded = [convert_dataset(self.dataset_path, use_tqdm=False, shard=(i, 3)) for i in range(3)]
+
+        self.assertEqual(sorted(all_ids), sorted(recipe.id for shard in sharded for recipe in shard))
+        for i, shard in enumerate(sharded):
+            for recipe in shard:
+                self.assertEqual(i, recipe_shard(recipe.id, 3))
+                self.assertEqual(all_ids.index(recipe.id), recipe.position)
+
+    def test_incorrect_shard(self):
+        with self.assertRaises(ValueError):
+            convert_dataset(self.dataset_path, use_tqdm=False, shard=(3, 3))
+
+    def test_merge_is_the_same_as_single_run(self):
+        _, questions, answers, single_predictions, single_partials = self.predict()
+        shards = [self.predict((i, 3), 3) for i in range(3)]
+        partials = [shard[4] for shard in shards]
+
+        merged_predictions = merge_predictions([shard[3] for shard in shards], recipe_order(partials))
+        self.assertEqual(list(single_predictions.items()), list(merged_predictions.items()))
+
+        handler_f1, handler_em = HandlerF1(io.StringIO()), HandlerExactMatch(io.StringIO())
+        handler_per_category = HandlerMetricsPerCategory(os.path.join(self.directory.name, "per_category"),
+                                                         io.StringIO(), output_formats=("csv",))
+        for handler in [handler_f1, handler_em, handler_per_category]:
+            handler.handle_questions_answers(questions, answers)
+
+        merged = merge_metric_partials(partials)
+        self.assertEqual(handler_f1.last_stored_f1, merged["F1"])
+        self.assertEqual(handler_em.last_result, merged["Exact match"])
+        self.assertEqual(handler_per_category.metrics_per_category, merged["per_category"])
+        self.assertEqual(merged, merge_metric_partials([single_partials]))
+
+    def test_missing_shard(self):
+        partials = [self.predict((i, 3), 3)[4] for i in range(2)]
+        with self.assertRaises(ValueError):
+            merge_metric_partials(partials)
+
+    def test_recipe_in_several_shards(self):
+        with self.assertRaises(ValueError):
+            merge_predictions([{"f-1": {"0-1": "1"}}, {"f-1": {"0-2": "2"}}])
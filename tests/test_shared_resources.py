@@ -0,0 +1,19 @@
+import unittest
+
+from src.putty_lemmatizer import PuttyLemmatizer
+from src.shared_resources import get_inflect_engine
+
+
+class TestSharedResources(unittest.TestCase):
+
+    def test_inflect_engines_are_shared(self):
+        self.assertIs(get_inflect_engine(), get_inflect_engine())
+        self.assertIs(get_inflect_engine(classical=True), get_inflect_engine(classical=True))
+        self.assertIsNot(get_inflect_engine(), get_inflect_engine(classical=True))
+
+    def test_classical_mode(self):
+        self.assertEqual("formulas", get_inflect_engine().plural_noun("formula"))
+        self.assertEqual("formulae", get_inflect_engine(classical=True).plural_noun("formula"))
+
+    def test_lemmatizer_is_shared(self):
+        self.assertIs(PuttyLemmatizer.get(), PuttyLemmatizer.get())
@@ -0,0 +1,68 @@
+import io
+import json
+import unittest
+
+from src.get_root import get_root
+from src.pipeline.deterministic_qa_engine import QuestionAnswererConstantAnswer, QuestionAnswererNA
+from src.pipeline.extractive_qa import ExtractiveQuestionAnswerer
+from src.pipeline.question_answering_dispatcher import QuestionAnsweringDispatcher
+from src.pipeline.question_category import QuestionCategory
+from src.pipeline.streaming_prediction import stream_predictions
+
+
+def build_dispatcher() -> QuestionAnsweringDispatcher:
+    dispatching_rules = {x: QuestionAnswererNA() for x in QuestionCategory.CATEGORIES}
+    dispatching_rules["counting_actions"] = QuestionAnswererConstantAnswer("1")
+    return QuestionAnsweringDispatcher(dispatching_rules)
+
+
+def build_dispatcher_with_precomputed_rc() -> QuestionAnsweringDispatcher:
+    dispatcher = build_dispatcher()
+    dispatcher.dispatching_table["not_recognized"] = ExtractiveQuestionAnswerer("val")
+    dispatcher.dispatching_table["RC"] = ExtractiveQuestionAnswerer("val")
+    return dispatcher
+
+
+def read_test_dataset(num_recipes: int):
+    with open(f"{get_root()}/data/small_data/recipe.csv", "r", encoding="utf-8") as f:
+        lines = list(f)
+    return [line.replace("f-6VWP66LZ", f"f-{i}") for i in range(num_recipes) for line in lines]
+
+
+class TestStreamPredictions(unittest.TestCase):
+
+    def test_one_line_per_question(self):
+        output = io.StringIO()
+        written = stream_predictions(read_test_dataset(2), output, build_dispatcher)
+
+        answers = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(54, written)
+        self.assertEqual(54, len(answers))
+        self.assertEqual(["f-0"] * 27 + ["f-1"] * 27, [a["recipe_id"] for a in answers])
+        self.assertEqual({"recipe_id": "f-0", "question_id": "0-1", "answer": "1"},
+                         {key: answers[0][key] for key in ["recipe_id", "question_id", "answer"]})
+
+    def test_workers_keep_the_order(self):
+        dataset = read_test_dataset(5)
+        sequential, parallel = io.StringIO(), io.StringIO()
+        stream_predictions(dataset, sequential, build_dispatcher)
+        stream_predictions(iter(dataset), parallel, build_dispatcher, num_workers=2, max_pending_recipes=2)
+        self.assertEqual(sequential.getvalue(), parallel.getvalue())
+
+    def test_recipe_without_precomputed_rc_predictions(self):
+        output = io.StringIO()
+        stream_predictions(read_test_dataset(1), output, build_dispatcher_with_precomputed_rc)
+
+        answers = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(27, len(answers))
+        self.assertEqual([], [answer for answer in answers if "error" in answer])
+        self.assertEqual("1", answers[0]["answer"])
+
+    def test_unparsable_recipe(self):
+        output = io.StringIO()
+        stream_predictions(["# newdoc id = broken\n", "# question 0-1 = ?\n"], output, build_dispatcher)
+        self.assertIn("error", json.loads(output.getvalue()))
+
+    def test_incorrect_workers(self):
+        with self.assertRaises(ValueError):
+            stream_predictions([], io.StringIO(), build_dispatcher, num_workers=-1)
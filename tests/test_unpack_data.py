@@ -1,7 +1,14 @@
+import gc
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+import weakref
 
 from src.get_root import get_root
-from src.unpack_data import Recipe, Q_A, convert_dataset, rewrite_to_list_of_questions, QuestionAnswerRecipe
+from src.unpack_data import Recipe, Q_A, convert_dataset, rewrite_to_list_of_questions, QuestionAnswerRecipe, \
+    iter_raw_recipes, load_recipes, cached_per_recipe
 
 
 class UnpackData(unittest.TestCase):
@@ -39,3 +46,53 @@ class UnpackData(unittest.TestCase):
 
         self.assertIsInstance(first.qa_copy, Q_A)
         self.assertIsInstance(first.recipe, Recipe)
+
+    def test_iter_raw_recipes(self):
+        with open(f"{get_root()}/data/small_data/recipe.csv", "r", encoding="utf-8") as f:
+            lines = list(f)
+        other_lines = [line.replace("f-6VWP66LZ", "f-OTHER") for line in lines]
+
+        recipes = list(iter_raw_recipes(iter(lines + other_lines)))
+        self.assertEqual([lines, other_lines], recipes)
+        self.assertEqual(["f-6VWP66LZ", "f-OTHER"], [Recipe(recipe).id for recipe in recipes])
+        self.assertEqual([], list(iter_raw_recipes([])))
+
+    def test_load_recipes_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "recipe.csv")
+            shutil.copy(f"{get_root()}/data/small_data/recipe.csv", filename)
+
+            recipes = load_recipes(filename)
+            self.assertEqual(["f-6VWP66LZ"], [recipe.id for recipe in recipes])
+            self.assertIs(recipes[0], load_recipes(filename)[0])
+            self.assertIs(recipes[0], convert_dataset(filename, use_tqdm=False, limit_recipes=1)[0])
+            self.assertIs(recipes[0], convert_dataset(filename, use_tqdm=False, shard=(0, 1))[0])
+
+            with open(filename, "a", encoding="utf-8") as f:
+                f.write("\n")
+            self.assertIsNot(recipes[0], load_recipes(filename)[0])
+
+    def test_cached_per_recipe(self):
+        calls = []
+
+        class Steps(list):
+            pass
+
+        @cached_per_recipe
+        def steps_with(recipe: Recipe, word: str) -> Steps:
+            calls.append(word)
+            return Steps(step for step in recipe.steps_str.split("\n") if word in step)
+
+        recipe = Recipe.return_recipe_for_test()
+        self.assertIs(steps_with(recipe, "meat"), steps_with(recipe, "meat"))
+        self.assertNotEqual(steps_with(recipe, "meat"), steps_with(recipe, "zucchini"))
+        self.assertEqual(["meat", "zucchini"], calls)
+
+        copied = pickle.loads(pickle.dumps(recipe))
+        self.assertEqual({}, copied._derived)
+        self.assertEqual(steps_with(recipe, "meat"), steps_with(copied, "meat"))
+
+        freed = weakref.ref(steps_with(recipe, "meat"))
+        del recipe
+        gc.collect()
+        self.assertIsNone(freed())